@@ -1,12 +1,13 @@
-import pandas as pd
-import networkx as nx
 from collections import defaultdict
 
+from source.data_readers import readAuthorsTable, readProposalsTable
+from source.network_store import prefer_binary, read_network
+
 # 1) Ajuste aqui o nome do arquivo GEXF que você quer testar
 GEXF_PATH = "data/networks/coauthorship-network-2025-12-05.gexf"
 
 print("Carregando grafo...")
-G = nx.read_gexf(GEXF_PATH)
+G = read_network(prefer_binary(GEXF_PATH), node_type=str, compact=True)
 print(f"Nós no grafo: {G.number_of_nodes()}")
 print(f"Arestas no grafo: {G.number_of_edges()}")
 
@@ -15,17 +16,17 @@ graph_nodes = set(G.nodes())
 print(f"Exemplo de nós no grafo: {list(graph_nodes)[:5]}")
 
 print("\nCarregando authors_info.csv...")
-authors = pd.read_csv("data/authors_info.csv")
+authors = readAuthorsTable("data")
 
 # 3) Garantir tipos das colunas
 authors["idAutor"] = authors["idAutor"].astype(int)
 authors["idProposicao"] = authors["idProposicao"].astype(int)
 
 print("Carregando proposals_info.csv...")
-proposals = pd.read_csv("data/proposals_info.csv", encoding="utf-8")
+proposals = readProposalsTable("data")
 
 # Vamos usar apenas as proposições que aparecem no proposals_info
-valid_proposals = set(proposals["id"].astype(int))
+valid_proposals = set(proposals.index.astype(int))
 print(f"Total de proposições em proposals_info: {len(valid_proposals)}")
 
 # 4) Construir mapa: proposicao -> lista de autores
@@ -99,15 +100,16 @@ if only_in_real:
             break
 
 print("\nTeste concluído.")
-import pandas as pd
-import networkx as nx
 from collections import defaultdict
 
+from source.data_readers import readAuthorsTable, readProposalsTable
+from source.network_store import prefer_binary, read_network
+
 # 1) Ajuste aqui o nome do arquivo GEXF que você quer testar
 GEXF_PATH = "data/networks/coauthorship-network-2025-12-05.gexf"
 
 print("Carregando grafo...")
-G = nx.read_gexf(GEXF_PATH)
+G = read_network(prefer_binary(GEXF_PATH), node_type=str, compact=True)
 print(f"Nós no grafo: {G.number_of_nodes()}")
 print(f"Arestas no grafo: {G.number_of_edges()}")
 
@@ -116,17 +118,17 @@ graph_nodes = set(G.nodes())
 print(f"Exemplo de nós no grafo: {list(graph_nodes)[:5]}")
 
 print("\nCarregando authors_info.csv...")
-authors = pd.read_csv("data/authors_info.csv")
+authors = readAuthorsTable("data")
 
 # 3) Garantir tipos das colunas
 authors["idAutor"] = authors["idAutor"].astype(int)
 authors["idProposicao"] = authors["idProposicao"].astype(int)
 
 print("Carregando proposals_info.csv...")
-proposals = pd.read_csv("data/proposals_info.csv", encoding="utf-8")
+proposals = readProposalsTable("data")
 
 # Vamos usar apenas as proposições que aparecem no proposals_info
-valid_proposals = set(proposals["id"].astype(int))
+valid_proposals = set(proposals.index.astype(int))
 print(f"Total de proposições em proposals_info: {len(valid_proposals)}")
 
 # 4) Construir mapa: proposicao -> lista de autores
@@ -1,7 +1,7 @@
-import networkx as nx
+from source.network_store import prefer_binary, read_network
 
-# ajuste o nome do arquivo para o .gexf mais recente
-G = nx.read_gexf("data/networks/coauthorship-network-2025-12-05.gexf")
+# ajuste o nome do arquivo para a rede mais recente; usa o .cgraph se existir
+G = read_network(prefer_binary("data/networks/coauthorship-network-2025-12-05.gexf"), node_type=str, compact=True)
 
 print("N nós:", G.number_of_nodes())
 print("M arestas:", G.number_of_edges())
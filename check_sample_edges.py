@@ -1,18 +1,19 @@
-import pandas as pd
-import networkx as nx
 import random
 
+from source.data_readers import readAuthorsTable, readProposalsTable
+from source.network_store import prefer_binary, read_network
+
 GEXF_PATH = "data/networks/coauthorship-network-2025-12-05.gexf"
 
 print("Carregando grafo...")
-G = nx.read_gexf(GEXF_PATH)
+G = read_network(prefer_binary(GEXF_PATH), node_type=str, compact=True)
 
-authors = pd.read_csv("data/authors_info.csv")
+authors = readAuthorsTable("data")
 authors["idAutor"] = authors["idAutor"].astype(int)
 authors["idProposicao"] = authors["idProposicao"].astype(int)
 
-proposals = pd.read_csv("data/proposals_info.csv", encoding="utf-8")
-valid_proposals = set(proposals["id"].astype(int))
+proposals = readProposalsTable("data")
+valid_proposals = set(proposals.index.astype(int))
 
 def coauthored_count(dep1, dep2):
     d1 = int(dep1)
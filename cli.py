@@ -2,8 +2,13 @@ import click
 import ast
 from miners import MinerFactory
 from source import NetworkBuilder
+from source import model_parameters
+from source.coauthorship_components import reweight_network
 import os
 
+# Caminhos de entrada e saída são relativos à raiz do projeto (pasta deste script)
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
 # Mapa oficial ano - legislatura (Câmara dos Deputados)
 LEGISLATURE_PERIODS = {
     54: range(2011, 2015),
@@ -70,7 +75,47 @@ VotesMiner -> votações e votos nominais por deputado (para rede de covotação
     type=click.Choice(['weighted', 'not_weighted']),
     help='Constrói a rede de coautoria de projetos. Pode ou não considerar arestas com peso.'
 )
-def exec_task(extract_data, build_network):
+@click.option(
+    '--weighting',
+    type=click.Choice(['count', 'newman', 'hyperbolic', 'jaccard']),
+    default='count',
+    show_default=True,
+    help='Ponderação da projeção das coautorias (usada com --build_network).'
+)
+@click.option(
+    '--state_path',
+    type=str,
+    default=None,
+    help='Arquivo .npz com os acumuladores da rede de coautoria; reconstruções aplicam só as proposições alteradas.'
+)
+@click.option(
+    '--save_components',
+    is_flag=True,
+    default=False,
+    help='Com --build_network, grava ao lado da rede as contagens por tipo de proposição e por cargo.'
+)
+@click.option(
+    '--format',
+    'network_format',
+    type=click.Choice(['gexf', 'binary', 'both']),
+    default='gexf',
+    show_default=True,
+    help='Formato da rede salva com --build_network: GEXF, binário (.cgraph, memory-mappable) ou os dois.'
+)
+@click.option(
+    '--compress',
+    is_flag=True,
+    default=False,
+    help='Grava o GEXF comprimido com gzip (.gexf.gz).'
+)
+@click.option(
+    '--reweight',
+    type=str,
+    default=None,
+    help='Caminho de uma rede (.gexf ou .cgraph, relativo à raiz do projeto) salva com --save_components; recalcula os pesos com os valores atuais de model_parameters.'
+)
+def exec_task(extract_data, build_network, weighting, state_path, save_components, network_format, compress,
+              reweight):
     if extract_data:
         miners = ast.literal_eval(extract_data[0])
         years = ast.literal_eval(extract_data[1])
@@ -83,13 +128,21 @@ def exec_task(extract_data, build_network):
         mf.buildAll()
 
     if build_network:
-        os.chdir('./source')
+        os.chdir(os.path.join(ROOT, 'source'))
         nb = NetworkBuilder.NetworkBuilder()
         if build_network == 'weighted':
-            nb.buildNetwork(True)
+            nb.buildNetwork(True, weighting, state_path=state_path)
         else:
-            nb.buildNetwork(False)
-        nb.saveNetWork()
+            nb.buildNetwork(False, weighting, state_path=state_path)
+        nb.saveNetWork(components=save_components, fmt=network_format, compress=compress)
+
+    if reweight:
+        reweight_network(
+            os.path.join(ROOT, reweight),
+            model_parameters.proposal_weight,
+            model_parameters.role_weights,
+            model_parameters.node_parameters,
+        )
 
 if __name__ == '__main__':
     exec_task()
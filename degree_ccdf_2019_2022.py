@@ -1,10 +1,11 @@
 import sys
 import os
-import networkx as nx
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from source.network_store import prefer_binary, read_network
+
 
 def compute_ccdf_from_degrees(degrees_array):
     """
@@ -36,21 +37,23 @@ def analyze_network(gexf_path, output_prefix=None):
         base = os.path.basename(gexf_path)
         output_prefix = os.path.splitext(base)[0]
 
+    # Só graus: lê compacto (arrays mapeados do .cgraph, se existir)
+    gexf_path = prefer_binary(gexf_path)
     print(f"Lendo rede de: {gexf_path}")
-    G = nx.read_gexf(gexf_path)
+    G = read_network(gexf_path, node_type=str, compact=True)
 
     print(f"N nós: {G.number_of_nodes()}")
     print(f"N arestas: {G.number_of_edges()}")
 
     # graus não ponderados
-    deg_unweighted = np.array([d for _, d in G.degree()])
+    deg_unweighted = G.degree()
     print("\n=== Grau NÃO ponderado ===")
     print(f"min: {deg_unweighted.min()}")
     print(f"max: {deg_unweighted.max()}")
     print(f"médio: {deg_unweighted.mean():.3f}")
 
     # graus ponderados (usando atributo 'weight')
-    deg_weighted = np.array([d for _, d in G.degree(weight="weight")])
+    deg_weighted = G.degree(weight="weight")
     print("\n=== Grau ponderado (weight) ===")
     print(f"min: {deg_weighted.min()}")
     print(f"max: {deg_weighted.max()}")
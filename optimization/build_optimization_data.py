@@ -14,8 +14,8 @@ def build_optimization_data(
       - nodes_df: id, c, v
       - edges_df: u, v, w_vote, w_auth, w_comb
 
-    G_vote: grafo de covotação (nx.Graph) com atributo 'weight' nas arestas
-    G_auth: grafo de coautoria (nx.Graph) com atributo 'weight' nas arestas
+    G_vote: grafo de covotação (nx.Graph ou CompactGraph) com atributo 'weight' nas arestas
+    G_auth: grafo de coautoria (nx.Graph ou CompactGraph) com atributo 'weight' nas arestas
     alpha: peso da covotação no grau combinado (para custo)
     gamma: peso da covotação no peso combinado de aresta (para coesão)
     """
@@ -1,9 +1,14 @@
 # build_data.py
-import networkx as nx
+import os
+import sys
+
 from build_optimization_data import build_optimization_data   # a função que fiz para você
 
-G_vote = nx.read_gexf("../data/networks/covoting-2019_2020_2021_2022-20251208-051415.gexf")
-G_auth = nx.read_gexf("../data/networks/coauthorship-network-2019_2020_2021_2022-20251208-051609.gexf")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from source.network_store import prefer_binary, read_network
+
+G_vote = read_network(prefer_binary("../data/networks/covoting-2019_2020_2021_2022-20251208-051415.gexf"), node_type=str, compact=True)
+G_auth = read_network(prefer_binary("../data/networks/coauthorship-network-2019_2020_2021_2022-20251208-051609.gexf"), node_type=str, compact=True)
 
 nodes_df, edges_df = build_optimization_data(G_vote, G_auth)
 
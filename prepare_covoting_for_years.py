@@ -3,8 +3,12 @@ import os
 import sys
 from datetime import datetime
 
+from miners.VotesMiner import VotesMiner
 from source.CovotingNetworkBuilder import CovotingNetworkBuilder
 
+# Shards anuais de covotação (um .npz por ano e por filtro do VotesMiner)
+COVOTE_CACHE_DIR = "../data/covoting_cache"
+
 
 def parse_list_arg(arg_str, name="anos"):
     """
@@ -36,7 +40,8 @@ def main():
             "  python prepare_covoting_for_years.py \"[2019,2020]\"\n\n"
             "ATENÇÃO: este script NÃO roda o VotesMiner.\n"
             "Ele usa o arquivo data/votes_detail_info.csv que você já tiver preparado\n"
-            "antes com o cli.py (VotesMiner) para os anos desejados."
+            "antes com o cli.py (VotesMiner) para os anos desejados.\n"
+            "As contagens de cada ano ficam em cache em data/covoting_cache."
         )
         sys.exit(1)
 
@@ -45,6 +50,12 @@ def main():
 
     print(f"Construindo rede de covotação para anos já presentes em votes_detail_info.csv: {years_str}")
 
+    # Parâmetros do filtro de votação divisiva usados ao gerar votes_detail_info.csv
+    filter_params = {
+        "division_threshold": VotesMiner.division_threshold,
+        "min_total_votes": VotesMiner.min_total_votes,
+    }
+
     # 1) Muda cwd para ./source, como no build_covoting_network.py
     original_cwd = os.getcwd()
     try:
@@ -54,9 +65,14 @@ def main():
             votes_detail_path="../data/votes_detail_info.csv",
             min_common_votes=1,
             consider_votes=("Sim", "Não"),
+            streaming=True,
         )
 
-        builder.build_network()
+        builder.build_network(
+            years=years,
+            cache_dir=COVOTE_CACHE_DIR,
+            filter_params=filter_params,
+        )
 
         # 2) Monta nome do arquivo com anos + timestamp, controlando diretamente
         timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
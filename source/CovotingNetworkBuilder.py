@@ -1,10 +1,25 @@
 import networkx as nx
+import numpy as np
 import pandas as pd
 import os
+from scipy import sparse
 from datetime import datetime
 
-from .data_readers import getDeputies
-from .utils import calculateAge, getAgeRange, getUfRegion
+from .backbone import disparity_filter
+from .compact_graph import CompactGraph
+from .bipartite import (PROJECTION_WEIGHTINGS, collapse_columns, encode_incidence, project,
+                        project_parallel, upper_pairs, weighted_projection)
+from .covote_sketch import MinHashLSH
+from .covote_shards import data_signature, load_shard, save_shard, shard_path, sum_shards
+from .covote_stream import CovoteAccumulator, CovoteProjection, NonContiguousVotes
+from .covote_windows import save_windows, sliding_sums
+from .network_store import NETWORK_FORMATS, write_network
+from .data_readers import getDeputies, readCachedCSV
+from .deputy_table import build_deputy_table, node_columns, node_records
+
+
+def _read_votes_csv(path):
+    return pd.read_csv(path, sep=",")
 
 
 class CovotingNetworkBuilder:
@@ -13,6 +28,49 @@ class CovotingNetworkBuilder:
         - nós: deputados
         - arestas: peso = número de votações divisivas em que votaram igual
 
+    Motores de cálculo das arestas (build_network(engine=...)):
+      - "sparse": matriz de incidência deputado × (votação, voto) e um único
+        produto esparso B·Bᵀ (padrão)
+      - "loop": laço original par a par por votação (referência, lento)
+
+    Com build_network(weighting=...), o peso da projeção pode ser "count" (padrão),
+    "newman" (1/(k-1) por (votação, voto) com k deputados), "hyperbolic" (1/k) ou
+    "jaccard" (votos iguais / união das participações).
+
+    Com build_network(agreement=True), calcula na mesma passada:
+      - weight: votações em que votaram igual
+      - disagreement: votações em comum em que votaram diferente
+      - common_votes: votações em que ambos votaram (Sim/Não)
+      - agreement: weight / common_votes
+    e mantém apenas pares com common_votes >= min_common_votes (inclusive pares
+    que nunca votaram igual, com weight 0).
+
+    Com build_network(cache_dir=...), as contagens vêm de shards anuais
+    (coluna ano_votacao) persistidos em disco; years restringe os anos usados.
+
+    Com build_network(workers=N), os produtos B·Bᵀ são divididos por votação entre
+    N processos (ver project_parallel); o resultado é idêntico ao serial.
+
+    Com build_windows(window, step), gera uma série de redes em janelas
+    deslizantes (por mês ou por ano), atualizadas incrementalmente.
+
+    Com build_approximate(), as arestas vêm de um índice MinHash/LSH (Jaccard
+    estimado, sem calcular todos os pares); top_similar(deputado, k) consulta o
+    mesmo índice.
+
+    Com compact=True (build_network / build_approximate), a rede é montada direto
+    em arrays (self.compact, ver CompactGraph) em vez de self.G; save_network
+    converte para networkx só na hora de gravar.
+
+    Com streaming=True, votes_detail_info.csv não é carregado inteiro: é lido em
+    blocos (chunksize linhas), só com as colunas usadas. Em build_network, cada
+    votação completa é projetada e somada à covotação (CovoteProjection), então a
+    memória não cresce com o número de votos; workers é ignorado nesse caminho.
+    Isso exige as linhas de cada votação contíguas no arquivo; se não estiverem,
+    o arquivo é relido com CovoteAccumulator. Com
+    agreement, cache_dir, build_windows ou build_approximate, os votos ficam em
+    códigos compactos (CovoteAccumulator): só os tipos encolhem.
+
     Depende de:
       - ./data/votes_detail_info.csv (gerado pelo VotesMiner, já com filtro de 60%)
       - ./data/deputies_info.csv (lido via getDeputies)
@@ -21,11 +79,15 @@ class CovotingNetworkBuilder:
     def __init__(self,
                  votes_detail_path: str = "./data/votes_detail_info.csv",
                  min_common_votes: int = 1,
-                 consider_votes=("Sim", "Não")):
+                 consider_votes=("Sim", "Não"),
+                 streaming: bool = False,
+                 chunksize: int = 200_000):
 
         self.votes_detail_path = votes_detail_path
         self.min_common_votes = min_common_votes
         self.consider_votes = set(consider_votes)
+        self.streaming = streaming
+        self.chunksize = chunksize
 
         # Carrega deputados (funciona pois build_covoting_network faz chdir("./source"))
         print("Carregando informações de deputados...")
@@ -39,33 +101,52 @@ class CovotingNetworkBuilder:
                 f"Arquivo de votos detalhados não encontrado: {self.votes_detail_path}"
             )
 
-        self.votes_detail = pd.read_csv(self.votes_detail_path, sep=",")
-        print(f"Linhas de votos carregadas: {len(self.votes_detail)}")
+        if self.streaming:
+            # Só o cabeçalho; os votos são lidos em blocos em build_network
+            self.votes_detail = None
+            columns = pd.read_csv(self.votes_detail_path, sep=",", nrows=0).columns
+            print(f"Leitura em blocos de {self.chunksize} linhas (streaming=True)")
+        else:
+            # Reaproveita o cache Parquet enquanto o CSV não mudar (ver readCachedCSV)
+            self.votes_detail = readCachedCSV(self.votes_detail_path, "votes", _read_votes_csv)
+            columns = self.votes_detail.columns
+            print(f"Linhas de votos carregadas: {len(self.votes_detail)}")
 
         self.G = nx.Graph()
+        self.compact = None
+        self._compact_parts = None
+        self.workers = 1
+        self.weighting = "count"
 
         self.col_vote_id = "idVotacao"
         self.col_deputy_id = "deputado_id"
         self.col_vote_type = "voto"
+        self.col_year = "ano_votacao"
+        self.col_date = "dataHoraVoto"
+        # Colunas usadas como fallback de atributos de nós fora de deputies_info.csv
+        self.cols_deputy_info = ["deputado_nome", "deputado_siglaPartido", "deputado_siglaUf"]
 
-        self._fix_column_names()
+        self._fix_column_names(columns)
 
-    def _fix_column_names(self):
+    def _fix_column_names(self, columns):
         # Compatibilidade com colunas antigas se existirem
         rename_map = {}
-        if "id votação" in self.votes_detail.columns:
+        if "id votação" in columns:
             rename_map["id votação"] = self.col_vote_id
-        if "id deputado" in self.votes_detail.columns:
+        if "id deputado" in columns:
             rename_map["id deputado"] = self.col_deputy_id
-        if "tipo voto" in self.votes_detail.columns:
+        if "tipo voto" in columns:
             rename_map["tipo voto"] = self.col_vote_type
 
-        if rename_map:
+        if rename_map and self.votes_detail is not None:
             self.votes_detail.rename(columns=rename_map, inplace=True)
 
+        self._rename_map = rename_map
+        self._columns = [rename_map.get(c, c) for c in columns]
+
         # Garante que as colunas necessárias existam
         missing = [c for c in [self.col_vote_id, self.col_deputy_id, self.col_vote_type]
-                   if c not in self.votes_detail.columns]
+                   if c not in self._columns]
         if missing:
             raise ValueError(f"Colunas ausentes em votes_detail_info.csv: {missing}")
 
@@ -79,36 +160,212 @@ class CovotingNetworkBuilder:
             self.votes_detail[self.col_vote_type].astype(str).str.strip()
         )
 
-    def build_network(self):
-        self._normalize_columns()
+    def build_network(self,
+                      engine: str = "sparse",
+                      agreement: bool = False,
+                      years=None,
+                      cache_dir: str = None,
+                      filter_params: dict = None,
+                      workers: int = 1,
+                      weighting: str = "count",
+                      compact: bool = False):
+        if engine not in ("sparse", "loop"):
+            raise ValueError(f"engine inválido: {engine!r}. Use 'sparse' ou 'loop'.")
+        if engine == "loop" and (agreement or cache_dir is not None or self.streaming or workers > 1):
+            raise ValueError("engine='loop' não suporta agreement, cache_dir, streaming nem workers.")
+        if engine == "loop" and compact:
+            raise ValueError("engine='loop' não suporta compact=True.")
+        if workers < 1:
+            raise ValueError(f"workers deve ser >= 1, recebido {workers}.")
+        if weighting not in PROJECTION_WEIGHTINGS:
+            raise ValueError(f"weighting inválido: {weighting!r}. Use um de {PROJECTION_WEIGHTINGS}.")
+        if weighting != "count" and (engine == "loop" or agreement):
+            raise ValueError("weighting diferente de 'count' não suporta engine='loop' nem agreement.")
+        if weighting == "jaccard" and cache_dir is not None:
+            raise ValueError("weighting='jaccard' não é aditivo entre anos; não use com cache_dir.")
+        self.workers = workers
+        self.weighting = weighting
+        if cache_dir is not None and agreement:
+            raise ValueError("cache_dir não está disponível com agreement=True.")
+        if (years is not None or cache_dir is not None) and self.col_year not in self._columns:
+            raise ValueError(f"Coluna {self.col_year} ausente em votes_detail_info.csv.")
+
+        if years is not None:
+            years = sorted(int(y) for y in years)
+            print(f"Votações restritas aos anos: {years}")
 
         # 1) Universo completo de nós:
         #    - todos os deputados em deputies_info.csv
         #    - mais todos que aparecem no votes_detail_info.csv (qualquer tipo de voto)
-        df_all = self.votes_detail.copy()
-        df_all[self.col_vote_type] = df_all[self.col_vote_type].astype(str).str.strip()
+        # 2) Arestas continuam restritas a Sim/Não
+        # Streaming sem agreement/cache_dir: a covotação é somada votação a votação
+        # durante a leitura (CovoteProjection), sem guardar os votos
+        projected = self.streaming and not agreement and cache_dir is None
+        if projected:
+            try:
+                df_nodes, votes = self._stream_votes(years, CovoteProjection(sorted(self.consider_votes), weighting))
+            except NonContiguousVotes:
+                print("Aviso: linhas de uma mesma votação não estão contíguas no arquivo; "
+                      "relendo com os votos em memória (CovoteAccumulator).")
+                projected = False
+        if not projected:
+            if self.streaming:
+                df_nodes, votes = self._stream_votes(years)
+            else:
+                df_nodes, votes = self._load_votes(years)
+
+        self._begin_graph(compact)
+        print("Adicionando nós (incluindo grau 0)...")
+        self._add_nodes_universe(df_nodes)
+
+        print(f"Votos após filtro: {len(votes)}")
+
+        print(f"Calculando pares de covotação (engine={engine})...")
+        if projected:
+            self._add_pair_edges(*votes.result())
+        elif agreement:
+            self._add_edges_agreement(votes)
+        elif cache_dir is not None:
+            self._add_edges_from_shards(votes, cache_dir, filter_params)
+        elif engine == "sparse":
+            self._add_edges_sparse(votes)
+        else:
+            self._add_edges(votes)
+        self._finish_graph()
+
+        print("Rede construída.")
+        print(f"Nós: {self.number_of_nodes()}, arestas: {self.number_of_edges()}")
+
+    def _begin_graph(self, compact):
+        # Com compact=True, nós e arestas são acumulados em arrays até _finish_graph
+        self.compact = None
+        self._compact_parts = {"nodes": [], "edges": []} if compact else None
+
+    def _finish_graph(self):
+        parts, self._compact_parts = self._compact_parts, None
+        if parts is None:
+            return
+
+        node_ids, node_data = [], {}
+        for ids, data in parts["nodes"]:
+            node_ids.extend(ids)
+            for name, values in data.items():
+                node_data.setdefault(name, []).extend(values)
+
+        edges = parts["edges"]
+        if edges:
+            u = np.concatenate([e[0] for e in edges])
+            v = np.concatenate([e[1] for e in edges])
+            edge_data = {name: np.concatenate([e[2][name] for e in edges]) for name in edges[0][2]}
+        else:
+            u = v = np.array([], dtype=np.int64)
+            edge_data = {}
+        self.compact = CompactGraph.from_arrays(node_ids, node_data, u, v, edge_data)
+
+    def number_of_nodes(self):
+        return self.G.number_of_nodes() if self.compact is None else self.compact.number_of_nodes()
 
-        df_all[self.col_deputy_id] = pd.to_numeric(
-            df_all[self.col_deputy_id],
-            errors="coerce"
-        ).astype("Int64")
+    def number_of_edges(self):
+        return self.G.number_of_edges() if self.compact is None else self.compact.number_of_edges()
+
+    def _add_edge_arrays(self, u, v, **columns):
+        """
+        Adiciona em bloco as arestas (u[i], v[i]) com atributos columns[nome][i]
+        (arrays), em self.G ou nos arrays de compact.
+        """
+        if self._compact_parts is not None:
+            self._compact_parts["edges"].append((np.asarray(u), np.asarray(v), columns))
+            return
+
+        u, v = np.asarray(u).tolist(), np.asarray(v).tolist()
+        if list(columns) == ["weight"]:
+            self.G.add_weighted_edges_from(zip(u, v, np.asarray(columns["weight"]).tolist()))
+            return
+        names = list(columns)
+        values = [np.asarray(columns[name]).tolist() for name in names]
+        self.G.add_edges_from(
+            (a, b, dict(zip(names, row)))
+            for a, b, *row in zip(u, v, *values)
+        )
+
+    def _load_votes(self, years=None):
+        """
+        Prepara o DataFrame já carregado em memória. Retorna (df_all, df): todos os
+        votos (universo de nós) e apenas os votos considerados (arestas).
+        """
+        self._normalize_columns()
+
+        df_all = self.votes_detail
+        df_all[self.col_deputy_id] = pd.to_numeric(df_all[self.col_deputy_id], errors="coerce")
         df_all = df_all.dropna(subset=[self.col_deputy_id])
-        df_all[self.col_deputy_id] = df_all[self.col_deputy_id].astype(int)
+        df_all = df_all.astype({self.col_deputy_id: int})
 
-        print("Adicionando nós (incluindo grau 0)...")
-        self._add_nodes_universe(df_all)
+        if years is not None:
+            df_all = df_all[df_all[self.col_year].isin(years)]
 
-        # 2) Arestas continuam restritas a Sim/Não
         print("Filtrando apenas votos relevantes (Sim/Não)...")
-        df = df_all[df_all[self.col_vote_type].isin(self.consider_votes)].copy()
+        df = df_all[df_all[self.col_vote_type].isin(self.consider_votes)]
+        return df_all, df
+
+    def _stream_votes(self, years=None, accumulator=None):
+        """
+        Lê votes_detail_info.csv em blocos, só com as colunas usadas, e alimenta
+        accumulator: por padrão um CovoteAccumulator (ids int32, votos int8, todos
+        os votos em memória) ou, em build_network, um CovoteProjection (só a soma
+        de covotação). Além dele, mantém em memória apenas o bloco corrente e a
+        primeira linha de atributos de cada deputado (fallback de
+        _add_nodes_universe).
+
+        Retorna (df_nodes, accumulator).
+        """
+        wanted = {self.col_vote_id, self.col_deputy_id, self.col_vote_type, self.col_year, self.col_date}
+        wanted.update(self.cols_deputy_info)
+        has_year = self.col_year in self._columns
+        has_date = self.col_date in self._columns
+
+        reader = pd.read_csv(
+            self.votes_detail_path,
+            sep=",",
+            usecols=lambda c: self._rename_map.get(c, c) in wanted,
+            dtype={c: str for c in [self.col_vote_id, self.col_vote_type, self.col_date] + self.cols_deputy_info},
+            chunksize=self.chunksize,
+        )
 
-        print(f"Votos após filtro: {len(df)}")
+        if accumulator is None:
+            accumulator = CovoteAccumulator(sorted(self.consider_votes))
+        df_nodes = None
+        n_rows = 0
+
+        for chunk in reader:
+            chunk = chunk.rename(columns=self._rename_map)
+            n_rows += len(chunk)
+
+            chunk[self.col_deputy_id] = pd.to_numeric(chunk[self.col_deputy_id], errors="coerce")
+            chunk = chunk.dropna(subset=[self.col_deputy_id])
+            chunk[self.col_deputy_id] = chunk[self.col_deputy_id].astype(np.int32)
+            if years is not None:
+                chunk = chunk[chunk[self.col_year].isin(years)]
+
+            accumulator.add(
+                chunk[self.col_deputy_id].to_numpy(),
+                chunk[self.col_vote_id].to_numpy(),
+                chunk[self.col_vote_type].astype(str).str.strip().to_numpy(),
+                chunk[self.col_year].to_numpy() if has_year else None,
+                chunk[self.col_date].to_numpy() if has_date else None,
+            )
+
+            info_cols = [self.col_deputy_id] + [c for c in self.cols_deputy_info if c in chunk.columns]
+            firsts = chunk[info_cols].drop_duplicates(subset=[self.col_deputy_id])
+            df_nodes = firsts if df_nodes is None else (
+                pd.concat([df_nodes, firsts]).drop_duplicates(subset=[self.col_deputy_id])
+            )
 
-        print("Calculando pares de covotação...")
-        self._add_edges(df)
+        accumulator.finish()
+        if df_nodes is None:
+            df_nodes = pd.DataFrame(columns=[self.col_deputy_id])
 
-        print("Rede construída.")
-        print(f"Nós: {self.G.number_of_nodes()}, arestas: {self.G.number_of_edges()}")
+        print(f"Linhas de votos lidas em blocos: {n_rows}")
+        return df_nodes, accumulator
 
     def _add_nodes_universe(self, df_votes_all):
         """
@@ -122,114 +379,35 @@ class CovotingNetworkBuilder:
         """
         universe_ids = set(self.deputies_ids)
         universe_ids.update(df_votes_all[self.col_deputy_id].unique().tolist())
-
-        universe_ids = sorted(int(x) for x in universe_ids)
-
-        for deputy_id in universe_ids:
-            if deputy_id in self.G:
-                continue
-
-            if deputy_id in self.deputies:
-                dep = self.deputies[deputy_id]
-
-                cpf = dep.get("cpf")
-                party = dep.get("party")
-                uf = dep.get("uf")
-                region = dep.get("region") or getUfRegion(uf)
-                label = dep.get("name")
-                sex = dep.get("sex")
-                education = dep.get("education")
-                birthdate = dep.get("birthdate")
-
-                age = calculateAge(birthdate) if birthdate else None
-                age_range = getAgeRange(age) if age is not None else None
-
-            else:
-                # Fallback: tenta usar atributos disponíveis no votes_detail_info.csv
-                sub = df_votes_all[df_votes_all[self.col_deputy_id] == deputy_id]
-                if len(sub) > 0:
-                    row = sub.iloc[0]
-                    label = row.get("deputado_nome", str(deputy_id))
-                    party = row.get("deputado_siglaPartido", "")
-                    uf = row.get("deputado_siglaUf", "")
-                    region = getUfRegion(uf) if uf else ""
-                else:
-                    label = str(deputy_id)
-                    party = ""
-                    uf = ""
-                    region = ""
-
-                sex = ""
-                education = ""
-                cpf = ""
-                age = None
-                age_range = None
-
-            self.G.add_node(
-                deputy_id,
-                label=label,
-                party=party,
-                uf=uf,
-                region=region,
-                sex=sex,
-                education=education,
-                age=age,
-                age_range=age_range,
-            )
+        self._add_nodes_from_table(universe_ids, df_votes_all)
 
     def _add_nodes(self, df_votes):
         """
         Mantido por compatibilidade: cria nós só para deputados presentes em df_votes.
         (Não é mais usado como universo principal, pois agora usamos _add_nodes_universe.)
         """
-        deputies_in_votes = sorted(df_votes[self.col_deputy_id].unique())
+        self._add_nodes_from_table(df_votes[self.col_deputy_id].unique().tolist(), df_votes)
 
-        for deputy_id in deputies_in_votes:
-            if deputy_id in self.deputies:
-                dep = self.deputies[deputy_id]
-
-                cpf = dep.get("cpf")
-                party = dep.get("party")
-                uf = dep.get("uf")
-                region = dep.get("region") or getUfRegion(uf)
-                label = dep.get("name")
-                sex = dep.get("sex")
-                education = dep.get("education")
-                birthdate = dep.get("birthdate")
-
-                age = calculateAge(birthdate) if birthdate else None
-                age_range = getAgeRange(age) if age is not None else None
+    def _add_nodes_from_table(self, deputy_ids, df_votes):
+        """
+        Adiciona em bloco os nós de deputy_ids a partir da tabela de atributos
+        (build_deputy_table). Deputados fora de deputies_info.csv usam nome, partido
+        e UF da primeira linha em que aparecem em df_votes.
+        """
+        if self._compact_parts is None:
+            deputy_ids = [d for d in deputy_ids if d not in self.G]
+        table = build_deputy_table(
+            self.deputies, deputy_ids, df_votes=df_votes, deputy_col=self.col_deputy_id
+        )
+        outside = ~table["in_deputies_info"]
+        table.loc[outside, ["sex", "education"]] = ""
 
-            else:
-                sub = df_votes[df_votes[self.col_deputy_id] == deputy_id]
-                if len(sub) > 0:
-                    row = sub.iloc[0]
-                    label = row.get("deputado_nome", str(deputy_id))
-                    party = row.get("deputado_siglaPartido", "")
-                    uf = row.get("deputado_siglaUf", "")
-                    region = getUfRegion(uf) if uf else ""
-                else:
-                    label = str(deputy_id)
-                    party = ""
-                    uf = ""
-                    region = ""
-
-                sex = ""
-                education = ""
-                age = None
-                age_range = None
-
-            self.G.add_node(
-                deputy_id,
-                label=label,
-                party=party,
-                uf=uf,
-                region=region,
-                sex=sex,
-                education=education,
-                age=age,
-                age_range=age_range,
-            )
+        columns = ["label", "party", "uf", "region", "sex", "education", "age", "age_range"]
+        missing = {"age": None, "age_range": None}
+        if self._compact_parts is not None:
+            self._compact_parts["nodes"].append(node_columns(table, columns, missing=missing))
+        else:
+            self.G.add_nodes_from(node_records(table, columns, missing=missing))
 
     def _add_edges(self, df_votes):
         # Agrupa por votação, e cria pares entre deputados que votaram igual
@@ -253,6 +431,295 @@ class CovotingNetworkBuilder:
                     else:
                         self.G.add_edge(u, v, weight=1)
 
+    def _incidence(self, votes, year=None, dedupe=False):
+        """
+        Incidência deputado × (votação, voto) de um DataFrame de votos ou de um
+        CovoteAccumulator. Retorna (deputy_index, col_votes, B), em que col_votes
+        identifica a votação de cada coluna de B.
+        """
+        if isinstance(votes, CovoteAccumulator):
+            return votes.incidence(year=year, dedupe=dedupe)
+
+        if year is not None:
+            votes = votes[votes[self.col_year] == year]
+        if dedupe:
+            votes = votes.drop_duplicates(subset=[self.col_vote_id, self.col_deputy_id])
+
+        deputy_index, col_index, B = encode_incidence(
+            votes[self.col_deputy_id].to_numpy(),
+            [votes[self.col_vote_id], votes[self.col_vote_type]],
+        )
+        return deputy_index, col_index.get_level_values(0), B
+
+    def _votes_years(self, votes):
+        if isinstance(votes, CovoteAccumulator):
+            return votes.years()
+        return sorted(int(y) for y in votes[self.col_year].unique())
+
+    def _votes_signature(self, votes, year):
+        columns = (self.col_vote_id, self.col_deputy_id, self.col_vote_type)
+        if isinstance(votes, CovoteAccumulator):
+            return data_signature(votes.frame(year, columns), columns)
+        return data_signature(votes[votes[self.col_year] == year], columns)
+
+    def _project(self, incidence, col_groups):
+        # Projeção B·Bᵀ, serial ou dividida por votação entre self.workers processos
+        if self.workers > 1:
+            return project_parallel(incidence, col_groups, self.workers)
+        return project(incidence)
+
+    def _add_edges_sparse(self, votes):
+        """
+        Mesmo resultado de _add_edges, calculado em bloco (ver _covote_pairs).
+        """
+        deputy_index, pair_counts = self._covote_pairs(votes)
+        self._add_pair_edges(deputy_index, pair_counts)
+
+    def _covote_pairs(self, votes, year=None):
+        """
+        Contagens de covotação de um conjunto de votos:
+          - B: incidência deputado × (votação, voto)
+          - C = B·Bᵀ: C[i, j] = número de votações em que i e j votaram igual
+
+        Retorna (deputy_index, K), com K triangular superior: K[i, j] (i < j) são os
+        pesos das arestas e K[i, i] os laços que o laço original gerava para linhas
+        repetidas (mesmo deputado duas vezes na mesma votação): soma de C(b, 2).
+        """
+        deputy_index, col_votes, B = self._incidence(votes, year=year)
+        return deputy_index, self._pair_counts(B, col_votes)
+
+    def _pair_counts(self, B, col_votes):
+        if self.weighting != "count":
+            # Ponderações fracionárias: sem laços (só fazem sentido como contagem)
+            return sparse.triu(weighted_projection(B, self.weighting), k=1).tocsr()
+
+        C = self._project(B, col_votes)
+        loops = (C.diagonal() - np.asarray(B.sum(axis=1)).ravel()) // 2
+        return (sparse.triu(C, k=1) + sparse.diags(loops, dtype=loops.dtype)).tocsr()
+
+    def _add_pair_edges(self, deputy_index, pair_counts):
+        coo = pair_counts.tocoo()
+        mask = coo.data != 0
+        self._add_edge_arrays(
+            deputy_index[coo.row[mask]], deputy_index[coo.col[mask]], weight=coo.data[mask]
+        )
+
+    def _add_edges_from_shards(self, votes, cache_dir, filter_params):
+        """
+        Contagens de covotação somando shards anuais persistidos em cache_dir.
+
+        Cada shard é chaveado pelo ano e pelos parâmetros de filtro (filter_params,
+        ex.: division_threshold/min_total_votes do VotesMiner, mais os votos
+        considerados). Só anos novos ou alterados são recalculados; os demais são
+        lidos do disco. Como cada votação pertence a um único ano, a soma dos
+        shards é igual à contagem sobre todos os anos juntos.
+        """
+        params = dict(filter_params or {})
+        params["consider_votes"] = sorted(self.consider_votes)
+        if self.weighting != "count":
+            params["weighting"] = self.weighting
+
+        shards = []
+        for year in self._votes_years(votes):
+            path = shard_path(cache_dir, year, params)
+            signature = self._votes_signature(votes, year)
+
+            shard = load_shard(path, signature)
+            if shard is None:
+                print(f"  {year}: calculando shard de covotação...")
+                shard = self._covote_pairs(votes, year=year)
+                save_shard(path, shard[0], shard[1], signature)
+            else:
+                print(f"  {year}: shard lido do cache ({path})")
+            shards.append(shard)
+
+        deputy_index, pair_counts = sum_shards(shards)
+        self._add_pair_edges(deputy_index, pair_counts)
+
+    def _add_edges_agreement(self, votes):
+        """
+        Concordância, discordância e participação comum a partir de uma única
+        incidência deputado × (votação, voto):
+          - S = B·Bᵀ: votaram igual
+          - A = B agregada por votação; P = A·Aᵀ: votaram ambos
+          - D = P - S: votaram diferente
+
+        Linhas repetidas (mesmo deputado na mesma votação) contam uma vez só.
+        """
+        deputy_index, col_votes, B = self._incidence(votes, dedupe=True)
+        A = collapse_columns(B, col_votes)
+
+        same = self._project(B, col_votes)
+        common = self._project(A, np.arange(A.shape[1]))
+
+        rows, cols, n_common = upper_pairs(common)
+        keep = n_common >= self.min_common_votes
+        rows, cols, n_common = rows[keep], cols[keep], n_common[keep]
+
+        n_same = np.asarray(same[rows, cols]).ravel()
+        n_diff = n_common - n_same
+        agreement = n_same / n_common
+
+        print(f"Pares com pelo menos {self.min_common_votes} votações em comum: {len(rows)}")
+
+        self._add_edge_arrays(
+            deputy_index[rows], deputy_index[cols],
+            weight=n_same, disagreement=n_diff, common_votes=n_common, agreement=agreement,
+        )
+
+    def build_approximate(self,
+                          num_perm: int = 128,
+                          bands: int = 32,
+                          threshold: float = None,
+                          years=None,
+                          seed: int = 0,
+                          compact: bool = False):
+        """
+        Rede de covotação aproximada para exploração de muitas legislaturas.
+
+        Cada deputado é resumido por uma assinatura MinHash do conjunto de
+        (votação, voto) em que votou; pares candidatos vêm do LSH em bandas (ver
+        MinHashLSH) e só eles têm a similaridade estimada. O peso das arestas é o
+        Jaccard estimado (aproxima build_network(weighting="jaccard")); ficam as
+        arestas com estimativa >= threshold (padrão: limiar das bandas).
+
+        O índice fica em self.sketch, usado por top_similar.
+        """
+        if years is not None:
+            if self.col_year not in self._columns:
+                raise ValueError(f"Coluna {self.col_year} ausente em votes_detail_info.csv.")
+            years = sorted(int(y) for y in years)
+            print(f"Votações restritas aos anos: {years}")
+
+        if self.streaming:
+            df_nodes, votes = self._stream_votes(years)
+        else:
+            df_nodes, votes = self._load_votes(years)
+
+        self._begin_graph(compact)
+        print("Adicionando nós (incluindo grau 0)...")
+        self._add_nodes_universe(df_nodes)
+
+        print(f"Calculando assinaturas MinHash (num_perm={num_perm}, bands={bands})...")
+        deputy_index, _, B = self._incidence(votes, dedupe=True)
+        self.sketch = MinHashLSH(num_perm=num_perm, bands=bands, seed=seed).fit(deputy_index, B)
+
+        rows, cols, sims = self.sketch.similarity_graph(threshold)
+        self._add_edge_arrays(deputy_index[rows], deputy_index[cols], weight=sims)
+        self._finish_graph()
+
+        print("Rede aproximada construída.")
+        print(f"Nós: {self.number_of_nodes()}, arestas: {self.number_of_edges()}")
+
+    def top_similar(self, deputy_id, k: int = 10):
+        """
+        Até k deputados mais parecidos com deputy_id (Jaccard estimado), a partir
+        do índice de build_approximate.
+        """
+        if getattr(self, "sketch", None) is None:
+            raise RuntimeError("Chame build_approximate() antes de top_similar().")
+        return self.sketch.query(int(deputy_id), k=k)
+
+    def build_windows(self,
+                      window: int,
+                      step: int = 1,
+                      order_by: str = "date",
+                      freq: str = "M",
+                      years=None,
+                      weighting: str = "count"):
+        """
+        Série temporal de redes de covotação em janelas deslizantes.
+
+        As votações são ordenadas por período: mês (freq="M") ou outra frequência
+        do pandas sobre dataHoraVoto (order_by="date"), ou ano (order_by="ano_votacao").
+        Cada janela cobre `window` períodos consecutivos e avança `step` períodos.
+
+        As contagens B·Bᵀ são calculadas uma vez por período, sobre um índice de
+        deputados comum; com weighting="count", cada janela é obtida da anterior
+        somando os períodos que entram e subtraindo os que saem; com pesos float,
+        é somada dos seus períodos (ver sliding_sums).
+
+        Resultado em self.windows: lista de (rótulo "início/fim", matriz triangular
+        superior), com linhas/colunas em self.windows_index. Use save_windows para
+        gravar a série.
+
+        weighting aceita "count", "newman" e "hyperbolic" (aditivas entre períodos).
+        """
+        if order_by not in ("date", "ano_votacao"):
+            raise ValueError(f"order_by inválido: {order_by!r}. Use 'date' ou 'ano_votacao'.")
+        if weighting not in ("count", "newman", "hyperbolic"):
+            raise ValueError(f"weighting inválido para janelas: {weighting!r}.")
+        self.weighting = weighting
+        order_col = self.col_date if order_by == "date" else self.col_year
+        if order_col not in self._columns:
+            raise ValueError(f"Coluna {order_col} ausente em votes_detail_info.csv.")
+
+        if years is not None:
+            years = sorted(int(y) for y in years)
+
+        if self.streaming:
+            _, votes = self._stream_votes(years)
+        else:
+            _, votes = self._load_votes(years)
+
+        deputy_index, col_votes, B = self._incidence(votes)
+
+        if isinstance(votes, CovoteAccumulator):
+            if order_by == "date":
+                col_time = votes.vote_dates(col_votes)
+            else:
+                col_time = votes.vote_years(col_votes)
+        else:
+            vote_time = votes.groupby(self.col_vote_id)[order_col].min()
+            col_time = vote_time.reindex(col_votes).to_numpy()
+
+        if order_by == "date":
+            col_periods = pd.PeriodIndex(pd.to_datetime(col_time, errors="coerce"), freq=freq)
+        else:
+            col_periods = pd.PeriodIndex(pd.to_datetime(pd.Series(col_time).astype(str), format="%Y"), freq="Y")
+        if col_periods.isna().any():
+            raise ValueError(f"Há votações sem {order_col} válido; não é possível ordená-las.")
+
+        periods = pd.period_range(col_periods.min(), col_periods.max(), freq=col_periods.freq)
+        print(f"Calculando covotação por período ({len(periods)} períodos de {periods.freqstr})...")
+        B = B.tocsc()
+        period_matrices = []
+        for period in periods:
+            cols = np.flatnonzero(col_periods == period)
+            period_matrices.append(self._pair_counts(B[:, cols].tocsr(), np.asarray(col_votes)[cols]))
+
+        self.windows_index = deputy_index
+        self.windows = [
+            (f"{periods[start]}/{periods[end - 1]}", matrix)
+            for start, end, matrix in sliding_sums(period_matrices, window, step)
+        ]
+        print(f"Janelas geradas: {len(self.windows)} (window={window}, step={step})")
+        return self.windows
+
+    def save_windows(self,
+                     output_dir: str = "../data/networks",
+                     network_name: str = "covoting-windows",
+                     use_version: bool = True):
+        """
+        Grava a série de build_windows em um único .npz (ver load_windows), em vez
+        de um GEXF por janela.
+        """
+        if use_version:
+            timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            filename = f"{network_name}-{timestamp}.npz"
+        else:
+            filename = f"{network_name}.npz"
+
+        path = os.path.join(output_dir, filename)
+        save_windows(
+            path,
+            self.windows_index,
+            [label for label, _ in self.windows],
+            [matrix for _, matrix in self.windows],
+        )
+        print(f"Série de janelas salva em: {path}")
+        return path
+
     def sanitize(self):
         # Mantido caso você use em outras partes do fluxo
         # Aqui não removemos nós isolados (você quer grau 0)
@@ -261,11 +728,34 @@ class CovotingNetworkBuilder:
     def save_network(self,
                      output_dir: str = "../data/networks",
                      network_name: str = "covoting-network",
-                     use_version: bool = True):
+                     use_version: bool = True,
+                     backbone: str = None,
+                     alpha: float = 0.05,
+                     fmt: str = "gexf",
+                     compress: bool = False):
+        """
+        Salva a rede em GEXF, escrito em fluxo (idade ausente é omitida, ver
+        write_gexf; .gexf.gz com compress=True); fmt="binary" grava no formato
+        binário (diretório .cgraph, ver read_network) e fmt="both", nos dois.
+
+        backbone="disparity" salva apenas o backbone do filtro de disparidade
+        (arestas com p-valor < alpha; ver disparity_filter), com sufixo "-backbone"
+        no nome. self.G não é alterado. Uma rede compact é gravada direto dos
+        arrays (o backbone ainda passa por networkx).
+        """
+        if backbone not in (None, "disparity"):
+            raise ValueError(f"backbone inválido: {backbone!r}. Use None ou 'disparity'.")
+        if fmt not in NETWORK_FORMATS:
+            raise ValueError(f"fmt inválido: {fmt!r}. Use um de {NETWORK_FORMATS}.")
 
         os.makedirs(output_dir, exist_ok=True)
 
+        G = self.G if self.compact is None else self.compact
         base_name = network_name
+        if backbone == "disparity":
+            G = disparity_filter(G if self.compact is None else G.to_networkx(), alpha=alpha)
+            base_name = f"{network_name}-backbone"
+
         if use_version:
             timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
             filename = f"{base_name}-{timestamp}.gexf"
@@ -273,5 +763,6 @@ class CovotingNetworkBuilder:
             filename = f"{base_name}.gexf"
 
         path = os.path.join(output_dir, filename)
-        nx.write_gexf(self.G, path)
+        path = write_network(G, path, fmt, compress=compress)
         print(f"Rede salva em: {path}")
+        return path
@@ -6,9 +6,20 @@ import collections
 import matplotlib.pyplot as plt
 import copy
 import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
 from utils import reject_outliers
 from utils import generateNodePairs
 from utils import getThresholdCounts
+from compact_graph import CompactGraph
+
+
+def isCompactGraph(G):
+    '''
+    Verdadeiro para CompactGraph, importado como compact_graph ou como
+    source.compact_graph (classes distintas para o isinstance)
+    '''
+    return hasattr(G, "adjacency") and hasattr(G, "edge_attrs")
 
 
 class GraphAnalysis:
@@ -16,19 +27,37 @@ class GraphAnalysis:
     Realiza análises da rede de coautorias de proposição de lei, extraindo métricas como
     modularidade, estatísticas de grau e arestas, informações dos nós e assortatividade.
 
-    :param G: rede no formato da biblioteca NetworkX
+    :param G: rede no formato da biblioteca NetworkX ou CompactGraph; graus,
+        componentes, clusterização, matriz de adjacência e somas de pesos usam a
+        versão compacta (arrays). Um CompactGraph só é convertido para NetworkX
+        (self.graph) quando algum método precisa dos atributos dos vértices
     '''
     def __init__(self, G):
-        self.graph = G
-        self.nodes_number = self.graph.number_of_nodes()
-        self.edges_number = self.graph.number_of_edges()
+        if isCompactGraph(G):
+            self.compact = G
+            self._graph = None
+        else:
+            self.compact = None
+            self._graph = G
+            self.fillNullAttribute('party')
+        self.nodes_number = G.number_of_nodes()
+        self.edges_number = G.number_of_edges()
         self.degree_info = self.setDegreeInfo()
         self.components_number = self.setNumberOfComponents()
-        self.global_clustering_index = nx.average_clustering(self.graph)
+        self.global_clustering_index = self.setGlobalClustering()
         self.everage_local_clustering_index = None
         self.average_shortest_path = None
         self.pseudo_diameter = None
-        self.fillNullAttribute('party')
+
+    @property
+    def graph(self):
+        '''
+        Rede em NetworkX, convertida da versão compacta no primeiro uso
+        '''
+        if self._graph is None:
+            self._graph = self.compact.to_networkx()
+            self.fillNullAttribute('party')
+        return self._graph
 
     def setDeputiesList(self, deputies_dict):
         self.deputies_list = list(deputies_dict.keys())
@@ -55,46 +84,71 @@ class GraphAnalysis:
         '''
         Cria dicionário com informações sobre grau mínimo, médio e máximo da rede e seus respectivos vértices
         '''
+        compact = self.getCompact()
+        degrees = compact.degree()
+        nodes = compact.nodes()
         g_max = {"node": None, "value": 0}
         g_min = {"node": None, "value": math.inf}
-        zeros = 0
-        g_sum = 0
-        for node_degree in list(self.graph.degree().items()):
-
-            if(node_degree[1] > g_max['value']):
-                g_max['node'] = node_degree[0] 
-                g_max['value'] = node_degree[1]
-
-            if(node_degree[1] < g_min['value']):
-                g_min['node'] = node_degree[0] 
-                g_min['value'] = node_degree[1] 
-
-            if(node_degree[1] == 0):
-                zeros += 1
-
-            g_sum += node_degree[1]
-        result = {"min": g_min, "max": g_max, "mean": g_sum/len(self.graph.degree()), "zeros": zeros}
+        if len(degrees):
+            # argmax/argmin devolvem o primeiro vértice, como o laço original
+            i_max = int(np.argmax(degrees))
+            if degrees[i_max] > 0:
+                g_max = {"node": nodes[i_max], "value": int(degrees[i_max])}
+            i_min = int(np.argmin(degrees))
+            g_min = {"node": nodes[i_min], "value": int(degrees[i_min])}
+
+        result = {"min": g_min, "max": g_max, "mean": int(degrees.sum())/len(degrees),
+                  "zeros": int((degrees == 0).sum())}
         return result
 
+    def getDegrees(self):
+        '''
+        Dicionário vértice → grau (laços contam 2, como no NetworkX)
+        '''
+        compact = self.getCompact()
+        return dict(zip(compact.nodes(), compact.degree().tolist()))
+
     def getDegreeInfo(self):
         return self.degree_info
 
     def getDensity(self):
-        return nx.density(self.graph)
+        # Mesma fórmula de nx.density para grafos não direcionados
+        n = self.getNumberOfNodes()
+        if n <= 1:
+            return 0
+        return 2 * self.getNumberOfEdges() / (n * (n - 1))
 
     def setNumberOfComponents(self):
-        return nx.number_connected_components(self.graph)
+        n_components, _ = connected_components(self.getCompact().adjacency(None), directed=False)
+        return n_components
+
+    def setGlobalClustering(self):
+        '''
+        Coeficiente de clusterização médio, sem pesos (como nx.average_clustering),
+        calculado sobre a matriz de adjacência: para cada vértice, pares de vizinhos
+        ligados (diagonal de A³) sobre d(d - 1)
+        '''
+        A = self.getCompact().adjacency(None).astype(np.float64)
+        # Laços não contam como vizinhos
+        A = (sparse.triu(A, k=1) + sparse.tril(A, k=-1)).tocsr()
+        degree = np.diff(A.indptr).astype(np.float64)
+        closed = np.asarray((A @ A).multiply(A).sum(axis=1)).ravel()
+        possible = degree * (degree - 1)
+        clustering = np.divide(closed, possible, out=np.zeros_like(closed), where=possible > 0)
+        return float(clustering.mean())
 
     def getNumberOfComponents(self):
         return self.components_number
 
+    def getLargestComponentSize(self):
+        _, labels = connected_components(self.getCompact().adjacency(None), directed=False)
+        return int(np.bincount(labels).max())
+
     def getRelativeSizeLargeComponent(self):
-        largest_cc = max(nx.connected_components(self.graph), key=len)
-        largest_cc_size = len(largest_cc)
-        return largest_cc_size/self.getNumberOfNodes()
+        return self.getLargestComponentSize()/self.getNumberOfNodes()
 
     def getDeputyDegree(self, deputy_id):
-        print("O grau do deputado {} é: {}".format(deputy_id, self.graph.degree()[str(deputy_id)]))
+        print("O grau do deputado {} é: {}".format(deputy_id, self.getDegrees()[str(deputy_id)]))
 
     def getDeputyInfo(self, deputy_id):
         '''
@@ -120,15 +174,13 @@ class GraphAnalysis:
         Exibe na tela um resumo das principais propriedades da rede
         '''
         degree_info = self.getDegreeInfo()
-        largest_cc = max(nx.connected_components(self.graph), key=len)
-        largest_cc_size = len(largest_cc)
         column_list = [
             self.getNumberOfNodes(),
             self.getNumberOfEdges(),
-            nx.density(self.graph),
+            self.getDensity(),
             self.getNumberOfComponents(),
-            nx.average_clustering(self.graph),
-            largest_cc_size,
+            self.getGlobalClustering(),
+            self.getLargestComponentSize(),
             self.getRelativeSizeLargeComponent(),
             degree_info['min']['value'],
             degree_info['max']['value'],
@@ -263,27 +315,32 @@ class GraphAnalysis:
 
         return count_attributes
 
+    def getCompact(self, refresh=False):
+        '''
+        Versão compacta (CompactGraph) da rede, montada uma vez e reaproveitada.
+        É refeita de self.graph se o número de vértices ou de arestas mudar, ou com
+        refresh=True (ex.: depois de alterar pesos de arestas em self.graph)
+        '''
+        G = self._graph
+        if G is not None and (
+            self.compact is None or refresh
+            or self.compact.number_of_nodes() != G.number_of_nodes()
+            or self.compact.number_of_edges() != G.number_of_edges()
+        ):
+            self.compact = CompactGraph.from_networkx(G)
+        return self.compact
+
     def adjMatrix(self, weighted=False):
-        size = len(self.graph.nodes())
-        adj_matrix = np.zeros((size, size))
+        compact = self.getCompact()
+        adj_matrix = compact.adjacency('weight' if weighted else None).toarray().astype(float)
+        # Laços somam o peso duas vezes na diagonal, como no laço original por aresta
+        adj_matrix[np.diag_indices_from(adj_matrix)] *= 2
+
         matrix_map = {}
         matrix_map['index_to_dep'] = {}
-        count = 0
-
-        for deputy_id in self.graph.nodes():
+        for count, deputy_id in enumerate(compact.nodes()):
             matrix_map[deputy_id] = count
             matrix_map['index_to_dep'][count] = deputy_id
-            count += 1
-        for edge in self.graph.edges(data=True):
-            deputy_1 = edge[0]
-            deputy_2 = edge[1]
-            if(weighted):
-                weight = edge[2]['weight']
-            else:
-                weight = 1
-
-            adj_matrix[matrix_map[deputy_1]][matrix_map[deputy_2]] += weight
-            adj_matrix[matrix_map[deputy_2]][matrix_map[deputy_1]] += weight
         return adj_matrix, matrix_map
 
     def joinEdgesAttFraction(self, attribute, adj_matrix, m_map):
@@ -309,6 +366,8 @@ class GraphAnalysis:
     def incidenceEdgesAttFraction(self, attribute, weighted=False):
         result = {}
         weights = self.getSumEdgeWeights()
+        compact = self.getCompact()
+        neighbors_number = dict(zip(compact.nodes(), np.diff(compact.indptr).tolist()))
         total_weight = 0
         for node in self.graph.nodes(data=True):
             deputy_id = node[0]
@@ -317,7 +376,7 @@ class GraphAnalysis:
             if(weighted):
                 weight = weights[deputy_id]
             else:
-                weight = len(self.graph.neighbors(deputy_id))
+                weight = neighbors_number[deputy_id]
 
             total_weight += weight
 
@@ -391,14 +450,8 @@ class GraphAnalysis:
         """
         Retorna dicionário com a soma dos pesos das arestas incidentes a cada vértice
         """
-        weights = {}
-        for node in self.graph.nodes(data=True):
-            node_id = node[0]
-            node_edge_weights = 0
-            for neighbor in self.graph.neighbors(node_id):
-                node_edge_weights += self.graph[node_id][neighbor]['weight']
-            weights[node_id] = node_edge_weights
-        return weights
+        compact = self.getCompact()
+        return dict(zip(compact.nodes(), compact.strength('weight').tolist()))
 
     def nodesModularityByAttribute(self, attribute, weighted=False):
         """
@@ -450,7 +503,7 @@ class GraphAnalysis:
         if(attributes_to_analyse is not None):
             attributes_to_analyse = self.getNodeAttributeNames()
         nodes_modularity = {}
-        node_degrees = self.graph.degree()
+        node_degrees = self.getDegrees()
         
         for node_id, degree in node_degrees.items():
             if(degree != 0):
@@ -619,6 +672,7 @@ class GraphAnalysis:
         '''
 
         nodes_edge_weights = self.getSumEdgeWeights()
+        node_degrees = self.getDegrees()
         # valor esperado da soma dos pesos para vértices com o atributo de homofilia fornecido como argumento
         expected_weight = {}
         expected_homophily = {}
@@ -629,7 +683,7 @@ class GraphAnalysis:
             node_id = node[0]
             attribute_name = node[1][homophily_attribute]
             sum_edges_weights = nodes_edge_weights[node_id]
-            node_degree = max(self.graph.degree()[str(node_id)], 1)
+            node_degree = max(node_degrees[str(node_id)], 1)
             if(node_id in expected_weight):
                 expected_weight[node_id] = sum_edges_weights * expected_edge_weights[attribute_name]
                 w_mean = sum_edges_weights/node_degree
@@ -9,10 +9,23 @@ import random
 import ast
 import os
 from datetime import date
-from .utils import calculateAge
-from .utils import getAgeRange
-from .utils import generateEdges
 from .utils import getUfRegion
+from .utils import UF_REGIONS
+from .deputy_table import build_deputy_table, node_columns
+from .compact_graph import CompactGraph
+from .network_store import NETWORK_FORMATS, write_network
+from .bipartite import (MASS_STRATEGIES, PROJECTION_WEIGHTINGS, encode_incidence, mass_column_scale,
+                        project, weighted_projection)
+from .proposal_scoring import score_proposals
+from .covote_windows import save_windows
+from .coauthorship_state import load_state, save_state
+from .utils import PairAccumulator
+from .coauthorship_components import (combine_edges, combine_nodes, role_vectors, save_components,
+                                      sidecar_path, stack_pair_layers)
+from time import perf_counter
+import hashlib
+import json
+from scipy import sparse
 
 class NetworkBuilder():
     deputies = None
@@ -28,31 +41,37 @@ class NetworkBuilder():
     roles_relevance = None
 
     G = None
-    collab_weights = {}
-    collab_pertinence = {}
+    compact = None
+    weighted_network = True
+    weighting = "count"
+    mass_threshold = 150
+    mass_strategy = "keep"
+    collab_weights = None
+    collab_pertinence = None
 
     def __init__(self):
         print("Carregando informações...")
 
+        # Dicionários por instância (antes eram atributos de classe compartilhados)
+        self.collab_weights = {}
+        self.collab_pertinence = {}
+
     # Deputados "globais" (todas as legislaturas mineradas)
         self.deputies = getDeputies()
         all_deputy_ids = set(int(k) for k in self.deputies.keys())
 
     # Proposições, cargos, partidos e autores dos ANOS selecionados
-        self.proposals = getProposals()
+        # Tabelas (DataFrames) direto do cache, sem converter para dicionários
+        self.proposals = readProposalsTable()
+        self.proposal_scores = score_proposals(self.proposals, proposal_weight, positive_proposal_status)
         self.legislative_roles = getRoles()
-        self.parties = getParties()
+        self.parties = readPartiesTable()
         self.proposal_authors = getAuthors()
-        self.tse_info = getInfoTSE()
+        # Só os candidatos do TSE com CPF de algum deputado (ver getInfoTSE)
+        self.tse_info = getInfoTSE(cpfs=getDeputiesCPFs(self.deputies))
 
     # Deputados que aparecem como autores nas proposições selecionadas
-        author_ids = set()
-        for authors in self.proposal_authors.values():
-            for a in authors:
-                try:
-                    author_ids.add(int(a))
-                except (ValueError, TypeError):
-                    continue
+        author_ids = set(np.unique(self.proposal_authors.authors).tolist())
 
     # Interseção: só entram na rede deputados que:
     # - existem em deputies_info.csv
@@ -65,38 +84,155 @@ class NetworkBuilder():
 
         # A partir daqui, tudo usa só esses ids ativos
         self.setDeputiesRegion()
-        self.setDeputiesIndividualProposals()
-        self.setDeputiesRoleInfluence()
 
 
-    def buildNetwork(self, weighted = True):
+    def buildNetwork(self, weighted = True, weighting = "count", mass_strategy = "keep", mass_threshold = 150,
+                     state_path = None, compact = False):
+        '''
+        weighting define a projeção das coautorias: "count" (soma dos pesos de tipo),
+        "newman" (1/(k-1) por proposição com k autores), "hyperbolic" (1/k) ou
+        "jaccard" (contagem normalizada pela união das proposições dos dois deputados)
+
+        mass_strategy trata proposições com mass_threshold ou mais deputados autores:
+        "keep" (padrão), "cap", "downweight" ou "drop" (ver mass_column_scale)
+
+        Com state_path, os acumuladores (pares, pertinência, propostas individuais,
+        influência de cargos) são lidos desse arquivo e atualizados só com as
+        proposições novas, removidas ou alteradas (ver updateFromState)
+
+        Com compact=True, a rede é montada direto em arrays (self.compact, ver
+        CompactGraph) e self.G fica None; saveNetWork converte para networkx só
+        na hora de gravar
+        '''
+        if weighting not in PROJECTION_WEIGHTINGS:
+            raise ValueError(f"Ponderação inválida: {weighting!r}. Use uma de {PROJECTION_WEIGHTINGS}.")
+        if mass_strategy not in MASS_STRATEGIES:
+            raise ValueError(f"Estratégia inválida: {mass_strategy!r}. Use uma de {MASS_STRATEGIES}.")
         self.weighted_network = weighted
+        self.weighting = weighting
+        self.mass_strategy = mass_strategy
+        self.mass_threshold = mass_threshold
+        if state_path is None:
+            contributions = self.proposalContributions()
+            self.setDeputiesIndividualProposals(contributions)
+            self.setDeputiesRoleInfluence()
+            self.setCollaborations(contributions)
+        else:
+            self.updateFromState(state_path)
+        if compact:
+            self.G = None
+            self.compact = self.compactGraph()
+            return
+        self.compact = None
         self.G = nx.Graph()
         self.addNodes()
         self.addEdges()
 
-    def saveNetWork(self, network_name="coauthorship-network", use_version=True):
-        import os
-        from datetime import datetime
+    def _stateConfig(self):
+        return {
+            "weighting": self.weighting,
+            "mass_strategy": self.mass_strategy,
+            "mass_threshold": self.mass_threshold,
+            "proposal_weight": proposal_weight,
+            "positive_proposal_status": positive_proposal_status,
+            "role_weights": role_weights,
+        }
+
+    def _rolesSignature(self):
+        '''
+        Assinatura das entradas da influência de cargos: cargos, partidos e o
+        conjunto de deputados da rede (roleComponents só considera deputies_ids)
+        '''
         import pandas as pd
 
-        print("Salvando a rede...")
+        roles = pd.util.hash_pandas_object(self.legislative_roles.reset_index(), index=False)
+        parties = json.dumps(self.parties.to_dict('index'), sort_keys=True, default=str)
+        deputies = np.asarray(sorted(self.deputies_ids), dtype=np.int64).tobytes()
+        return (f"{int(roles.sum()) & 0xFFFFFFFFFFFFFFFF:016x}"
+                f"-{hashlib.sha1(parties.encode('utf-8')).hexdigest()[:16]}"
+                f"-{hashlib.sha1(deputies).hexdigest()[:16]}")
 
-    # Sanear atributos: GEXF não aceita None
-        for node, data in self.G.nodes(data=True):
-            for k, v in list(data.items()):
-                if v is None:
-                    data[k] = ''  # ou 'NA', se preferir
+    def updateFromState(self, state_path):
+        '''
+        Atualiza os acumuladores a partir do estado salvo em state_path, aplicando
+        como deltas apenas as proposições adicionadas, removidas ou alteradas (autores,
+        tipo ou situação); a influência de cargos só é recalculada se cargos,
+        partidos ou o conjunto de deputados mudarem. Sem estado compatível (arquivo ausente, outros parâmetros
+        ou weighting="jaccard", que não é aditivo), recalcula tudo. Ao final, grava
+        o estado atualizado em state_path.
+        '''
+        config = self._stateConfig()
+        contributions = self.proposalContributions()
+        roles_signature = self._rolesSignature()
+        state = None if self.weighting == "jaccard" else load_state(state_path, config)
+
+        if state is None:
+            print(f"Estado incremental ausente ou incompatível ({state_path}); recalculando tudo...")
+            individual = self._individualTotals(contributions)
+            pairs = self.collabPairs(contributions)
+            self.setDeputiesRoleInfluence()
+        else:
+            old = state["contributions"]
+            removed = {pid: c for pid, c in old.items() if contributions.get(pid) != c}
+            added = {pid: c for pid, c in contributions.items() if old.get(pid) != c}
+            print(f"Estado incremental: {len(added)} proposições novas/alteradas, "
+                  f"{len(removed)} removidas/alteradas")
+
+            individual = self._individualTotals(added, state["individual"])
+            individual = self._individualTotals(removed, individual, sign=-1)
+
+            # pares: estado + novas - removidas, somados por chave de par
+            accumulators = [PairAccumulator() for _ in range(3)]
+            for delta, sign in [(state["pairs"], 1), (self.collabPairs(added), 1), (self.collabPairs(removed), -1)]:
+                u, v = delta[0], delta[1]
+                for accumulator, values in zip(accumulators, delta[2:]):
+                    accumulator.addPairs(u, v, sign * values)
+            u, v, weights = accumulators[0].totals()
+            _, _, pertinence = accumulators[1].totals()
+            _, _, shared = accumulators[2].totals()
+            keep = shared > 0
+            pairs = (u[keep], v[keep], weights[keep], pertinence[keep], shared[keep])
+
+            saved_signature, saved_roles = state["roles"]
+            if saved_signature == roles_signature:
+                self.roles_relevance = saved_roles
+            else:
+                print("Cargos, partidos ou deputados mudaram; recalculando influência de cargos...")
+                self.setDeputiesRoleInfluence()
+
+        self.deputies_proposals = {deputy_id: w for deputy_id, (w, _) in individual.items()}
+        self._setCollabDicts(pairs)
+        save_state(state_path, config, contributions, pairs, individual,
+                   (roles_signature, self.roles_relevance))
+        print(f"Estado incremental salvo em: {state_path}")
+
+    def saveNetWork(self, network_name="coauthorship-network", use_version=True, components=False, fmt="gexf",
+                    compress=False):
+        '''
+        Salva a rede em GEXF. Com components=True, grava ao lado as contagens por
+        tipo de proposição e por cargo (<rede>.components.npz), que permitem
+        reponderar a rede depois sem recontar coautorias (ver reweight_network)
+
+        fmt="binary" grava no formato binário (diretório <rede>.cgraph, lido com
+        read_network) e fmt="both", nos dois. O GEXF é escrito em fluxo (ver
+        write_gexf), comprimido com gzip (.gexf.gz) se compress=True
+        '''
+        if fmt not in NETWORK_FORMATS:
+            raise ValueError(f"Formato inválido: {fmt!r}. Use um de {NETWORK_FORMATS}.")
+        # Validar antes de gravar: sem isso a rede seria salva sem as contagens
+        if components and self.weighting == "jaccard":
+            raise ValueError("weighting='jaccard' não é linear nos pesos de tipo; salve sem components.")
+        import os
+        from datetime import datetime
 
-        for u, v, data in self.G.edges(data=True):
-            for k, vv in list(data.items()):
-                if vv is None:
-                    data[k] = ''
+        print("Salvando a rede...")
+        # Atributos None: '' nos de texto e omitidos nos numéricos (write_gexf)
+        G = self.G if self.G is not None else self.compact
 
     # Inferir anos a partir de ../data/proposals_info.csv
         years_str = "unknown_years"
         try:
-            props = pd.read_csv("../data/proposals_info.csv")
+            props = self.proposals
             if "ano" in props.columns:
                 anos = sorted(props["ano"].dropna().unique())
                 if len(anos) > 0:
@@ -120,95 +256,107 @@ class NetworkBuilder():
     # Caminho final
         path = os.path.join("../data/networks", filename)
 
-    # Salvar GEXF
-        nx.write_gexf(self.G, path)
+    # Salvar GEXF e/ou formato binário
+        path = write_network(G, path, fmt, compress=compress)
         print("Rede salva em: {}".format(path))
 
+        if components:
+            self.saveComponents(sidecar_path(path))
+        return path
+
+    def saveComponents(self, path):
+        '''
+        Grava sweepComponents (mais quais deputados estão em deputies_info e se a
+        rede tem peso) para reponderação posterior
+        '''
+        components = self.sweepComponents()
+        table = self.deputyTable()
+        components["known"] = table["in_deputies_info"].reindex(components["deputy_index"]).to_numpy(dtype=bool)
+        components["weighted"] = np.array(self.weighted_network)
+        save_components(path, components)
+        print("Componentes salvas em: {}".format(path))
+
 
     def addNodes(self):
         print("Gerando vértices...")
-        out_of_date_deputies = []
+        records, n_outside = self.nodeRecords(self.deputies_proposals, self.roles_relevance, node_parameters)
+        self.G.add_nodes_from(records)
 
-        for deputy_id in self.deputies_ids:
-            deputy_id = int(deputy_id)
-
-            if deputy_id in self.deputies:
-                cpf = self.deputies[deputy_id].get('cpf')
-                party = self.deputies[deputy_id].get('party', '')
-                uf = self.deputies[deputy_id].get('uf', '')
-                region = self.deputies[deputy_id].get('region', '')
-                label = self.deputies[deputy_id].get('name', '')
-                sex = self.deputies[deputy_id].get('sex', '')
-                education = self.deputies[deputy_id].get('education', '')
-                birthdate = self.deputies[deputy_id].get('birthdate')
-
-                tse_record = self.tse_info.get(cpf, {}) if isinstance(self.tse_info, dict) else {}
-                education_tse = tse_record.get('DS_GRAU_INSTRUCAO', '')
-                ethnicity = tse_record.get('DS_COR_RACA', '')
-
-                age = calculateAge(birthdate) if birthdate else ''
-                age_range = getAgeRange(age) if age != '' else ''
-
-                individual_proposals = (
-                    self.deputies_proposals.get(deputy_id, 0) * node_parameters['proposal']
-                )
-
-                role_relevance = (
-                    self.roles_relevance.get(deputy_id, 0) * node_parameters['role']
-                )
-
-                deputy_weight = individual_proposals + role_relevance
-
-                self.G.add_node(
-                    deputy_id,
-                    label=label,
-                    style='filled',
-                    weight=deputy_weight,
-                    party=party,
-                    uf=uf,
-                    age_range=age_range,
-                    sex=sex,
-                    education=education,
-                    age=age,
-                    education_tse=education_tse,
-                    ethnicity=ethnicity,
-                    region=region
-                )
+        print("Deputados fora de deputies_info adicionados como nós:", n_outside)
 
-            else:
-                # Autor que apareceu nas proposições, mas não está em deputies_info
-                self.G.add_node(
-                    deputy_id,
-                    label=str(deputy_id),
-                    style='filled',
-                    weight=0,
-                    party='',
-                    uf='',
-                    age_range='',
-                    sex='',
-                    education='',
-                    age='',
-                    education_tse='',
-                    ethnicity='',
-                    region=''
-                )
-                out_of_date_deputies.append(deputy_id)
-
-        print("Deputados fora de deputies_info adicionados como nós:", len(out_of_date_deputies))
+    def deputyTable(self):
+        '''
+        Tabela de atributos dos deputados (build_deputy_table), montada uma vez
+        '''
+        if getattr(self, "_deputy_table", None) is None:
+            self._deputy_table = build_deputy_table(self.deputies, self.deputies_ids, tse_info=self.tse_info)
+        return self._deputy_table
 
+    def nodeRecords(self, deputies_proposals, roles_relevance, node_params):
+        '''
+        Nós (id, atributos) com o peso de cada deputado segundo node_params (ver
+        nodeColumns)
+        '''
+        ids, data, n_outside = self.nodeColumns(deputies_proposals, roles_relevance, node_params)
+        records = [
+            (deputy_id, {col: values[i] for col, values in data.items()})
+            for i, deputy_id in enumerate(ids)
+        ]
+        return records, n_outside
+
+    def nodeColumns(self, deputies_proposals, roles_relevance, node_params):
+        '''
+        Atributos dos nós em colunas, (ids, {atributo: valores}, número de deputados
+        fora de deputies_info), com o peso de cada deputado segundo node_params; a
+        tabela de atributos é montada uma vez e reaproveitada entre chamadas
+        '''
+        table = self.deputyTable()
+        known = table["in_deputies_info"].to_numpy()
+
+        # Autor que apareceu nas proposições, mas não está em deputies_info: peso 0
+        # (float para todos: a influência de cargos pode ser fracionária e o GEXF
+        # declara um único tipo por atributo)
+        weights = [
+            float(deputies_proposals.get(deputy_id, 0) * node_params['proposal']
+                  + roles_relevance.get(deputy_id, 0) * node_params['role'])
+            if is_known else 0.0
+            for deputy_id, is_known in zip(table.index.tolist(), known)
+        ]
+        table = table.assign(style='filled', weight=weights)
+
+        ids, data = node_columns(table, [
+            'label', 'style', 'weight', 'party', 'uf', 'age_range', 'sex', 'education',
+            'age', 'education_tse', 'ethnicity', 'region'
+        ])
+        return ids, data, int((~known).sum())
+
+    def compactGraph(self):
+        '''
+        A mesma rede de addNodes + addEdges, montada direto em arrays (CompactGraph)
+        '''
+        print("Gerando rede compacta...")
+        ids, data, n_outside = self.nodeColumns(self.deputies_proposals, self.roles_relevance, node_parameters)
+        print("Deputados fora de deputies_info adicionados como nós:", n_outside)
+
+        pairs = list(self.collab_weights.keys())
+        u = np.fromiter((a for a, _ in pairs), dtype=np.int64, count=len(pairs))
+        v = np.fromiter((b for _, b in pairs), dtype=np.int64, count=len(pairs))
+        if self.weighted_network:
+            weights = list(self.collab_weights.values())
+        else:
+            weights = np.ones(len(pairs), dtype=np.int64)
+        pertinence = [self.collab_pertinence[pair] for pair in pairs]
+        return CompactGraph.from_arrays(ids, data, u, v, {"weight": weights, "success_pertinence": pertinence})
 
     def addEdges(self):
         print("Adicionando arestas...")
-        self.setCollaborations()
-        self.setCollaborationsSuccess()
-        for edge in self.collab_weights.keys():
-            if(self.weighted_network):
-                weight = self.collab_weights[edge]
-            else:
-                weight = 1
-            self.G.add_edge(
-                edge[0], edge[1], weight= weight, success_pertinence=self.collab_pertinence[edge]
-            )
+        self.G.add_edges_from(
+            (u, v, {
+                "weight": self.collab_weights[(u, v)] if self.weighted_network else 1,
+                "success_pertinence": self.collab_pertinence[(u, v)],
+            })
+            for u, v in self.collab_weights.keys()
+        )
     
     def removePastDeputies(self):
         nodes_to_remove = []
@@ -219,127 +367,376 @@ class NetworkBuilder():
   
         self.G.remove_nodes_from(nodes_to_remove)
             
-    def setCollaborations(self):
-        """
-        Define pesos das arestas de acordo com número de coautoria entre dois deputados.
-
-        Ajustes principais:
-        - usa apenas autores cujo id está em self.deputies_ids
-        - remove duplicados de autores por proposição
-        - ignora proposições com menos de 2 deputados válidos
+    def proposalContributions(self, valid_only = True):
         """
-        deputies_set = set(self.deputies_ids)
-
-        print("Calculando coautorias (setCollaborations)...")
-        for proposal_id in list(self.proposals.keys()):
-            if proposal_id not in self.proposal_authors:
-                continue
-
-            # lista de autores bruta vinda de getAuthors()
-            proposal_authors = self.proposal_authors[proposal_id]
+        Contribuição de cada proposição válida, numa única passada:
+        proposição → (autores, peso do tipo, pertinência ponderada), em que
 
-            # filtrar só ids que existem em self.deputies_ids
-            filtered_authors = [a for a in proposal_authors if a in deputies_set]
+        - autores: ids em self.deputies_ids, sem duplicados, ordenados
+        - peso do tipo: proposal_weight[siglaTipo] (tipos desconhecidos são ignorados)
+        - pertinência ponderada: peso do tipo × pertinência da situação
 
-            # remover duplicados (caso o mesmo deputado apareça mais de uma vez)
-            filtered_authors = sorted(set(filtered_authors))
+        Tipo, peso e pertinência vêm da tabela self.proposal_scores (score_proposals).
 
-            # se sobrou menos de 2, não gera aresta
-            if len(filtered_authors) <= 1:
+        Proposições com 1 autor alimentam as propostas individuais; com 2 ou mais,
+        as coautorias. Com valid_only=False, entram também tipos fora de
+        proposal_weight (com peso <NA>).
+        """
+        deputies_set = set(self.deputies_ids)
+        scores = self.proposal_scores
+        valid = scores["valid"].to_dict()
+        type_weights = scores["type_weight"].to_dict()
+        pertinences = scores["weighted_pertinence"].to_dict()
+
+        contributions = {}
+        mass_sizes = []
+        for proposal_id, proposal_authors in self.proposal_authors.items():
+            # proposições fora de proposals_info ou de tipo desconhecido são ignoradas
+            if proposal_id not in valid or (valid_only and not valid[proposal_id]):
                 continue
 
-            # tipo e peso da proposição
-            proposal_type = self.proposals[proposal_id]["siglaTipo"]
-            if proposal_type not in proposal_weight:
-                # se aparecer um tipo estranho, simplesmente ignora
+            # filtrar só ids que existem em self.deputies_ids e remover duplicados
+            filtered_authors = sorted(set(int(a) for a in proposal_authors if a in deputies_set))
+            if not filtered_authors:
                 continue
 
-            n_proposal_weight = proposal_weight[proposal_type]
+            # proposições "monstro": só contadas, resumo no fim
+            if len(filtered_authors) >= self.mass_threshold:
+                mass_sizes.append(len(filtered_authors))
 
-            # log opcional pra você identificar proposições "monstro"
-            if len(filtered_authors) >= 150:
-                print(
-                    f"[ALERTA] Proposição {proposal_id} tem {len(filtered_authors)} deputados autores "
-                    f"(tipo {proposal_type}) – vai gerar muitas arestas."
-                )
-
-            # acumular peso de colaboração
-            self.collab_weights = self.addCollabEdge(
-                self.collab_weights, filtered_authors, n_proposal_weight, False
+            contributions[int(proposal_id)] = (
+                tuple(filtered_authors),
+                type_weights[proposal_id],
+                pertinences[proposal_id],
             )
 
-    def addCollabEdge(self, graph, collab_list, proposal_weight, archived):
-        '''
-        Calcula o número de colaborações que ocorreu entre os deputados em uma proposicao
-        '''
-        proposal_weight = proposal_weight
-        if bool(archived) is True:
-            proposal_weight = proposal_weight * 0.5
-
-        edges = generateEdges(collab_list)
-        for edge in edges:
-            if edge in graph:
-                graph[edge] += proposal_weight
-            else:
-                graph[edge] = proposal_weight
-
-        return graph
-
-    def addCollabPertinence(self, graph, collab_list, proposal_pertinence):
-        '''
-        Calcula o quanto propostas isncritas em conjunto entre dois ou mais deputados foram aceitas na câmara
-        '''
-        edges = generateEdges(collab_list)
-        for edge in edges:
-            if edge in graph:
-                graph[edge] += proposal_pertinence
-            else:
-                graph[edge] = proposal_pertinence
-        return graph
+        if mass_sizes:
+            print(
+                f"[ALERTA] {len(mass_sizes)} proposições com {self.mass_threshold} ou mais deputados autores "
+                f"(máximo {max(mass_sizes)}) – estratégia {self.mass_strategy}."
+            )
+        return contributions
 
-    def setCollaborationsSuccess(self):
+    def collabPairs(self, contributions):
         """
-        Define atributo de pertinência para cada aresta. Esse atributo representa os projetos entre dois deputados
-        que em algum nível foram aceitos pela câmara.
+        Pares de coautores das proposições em contributions (as de 2 ou mais autores).
+        Retorna arrays (u, v, weight, pertinence, shared), com u < v:
 
-        Ajustes:
-        - mesmo filtro de autores válidos e deduplicação usado em setCollaborations
-        """
-        deputies_set = set(self.deputies_ids)
+        - weight: peso de coautoria (peso do tipo, projetado conforme self.weighting)
+        - pertinence: coautorias que em algum nível foram aceitas pela câmara
+        - shared: número de proposições em comum (define a existência da aresta)
 
-        print("Calculando pertinência das coautorias (setCollaborationsSuccess)...")
-        for proposal_id in list(self.proposals.keys()):
-            if proposal_id not in self.proposal_authors:
+        Monta uma incidência esparsa deputado × proposição e calcula cada atributo
+        como B · diag(vetor por proposição) · Bᵀ. Proposições com self.mass_threshold
+        ou mais autores seguem self.mass_strategy.
+        """
+        author_ids = []
+        proposal_cols = []
+        type_weights = []
+        pertinences = []
+        for authors, n_proposal_weight, pertinence_weighted in contributions.values():
+            # se sobrou menos de 2, não gera aresta
+            if len(authors) <= 1:
                 continue
+            # uma coluna da incidência deputado × proposição por proposição válida
+            author_ids.extend(authors)
+            proposal_cols.extend([len(type_weights)] * len(authors))
+            type_weights.append(n_proposal_weight)
+            pertinences.append(pertinence_weighted)
+
+        if not type_weights:
+            empty = np.array([], dtype=np.int64)
+            return empty, empty, empty, empty, empty
+
+        deputy_index, _, B = encode_incidence(author_ids, [proposal_cols])
+        type_weights = np.asarray(type_weights)
+        pertinences = np.asarray(pertinences)
+
+        # proposições "de massa": fator por coluna, sem gerar os pares
+        sizes = np.bincount(proposal_cols)
+        if self.mass_strategy != "keep" and (sizes >= self.mass_threshold).any():
+            scale = mass_column_scale(sizes, self.mass_threshold, self.mass_strategy)
+            kept = scale > 0
+            B = B[:, kept]
+            type_weights = type_weights[kept] * scale[kept]
+            pertinences = pertinences[kept] * scale[kept]
+
+        # peso de colaboração: B · diag(peso do tipo · escala) · Bᵀ
+        W = weighted_projection(B, self.weighting, column_weights=type_weights)
+        # pertinência: B · diag(peso do tipo · pertinência da situação) · Bᵀ
+        P = project(B, pertinences)
+
+        # arestas: pares com pelo menos uma coautoria (mesmo que o peso seja 0)
+        shared = sparse.triu(project(B), k=1).tocoo()
+        return (
+            deputy_index[shared.row].astype(np.int64),
+            deputy_index[shared.col].astype(np.int64),
+            np.asarray(W[shared.row, shared.col]).ravel(),
+            np.asarray(P[shared.row, shared.col]).ravel(),
+            shared.data.astype(np.int64),
+        )
+
+    def setCollaborations(self, contributions = None):
+        """
+        Define os dois atributos das arestas a partir de collabPairs:
+        - collab_weights: peso de coautoria entre dois deputados
+        - collab_pertinence: coautorias que em algum nível foram aceitas pela câmara
 
-            proposal_authors = self.proposal_authors[proposal_id]
-            filtered_authors = [a for a in proposal_authors if a in deputies_set]
-            filtered_authors = sorted(set(filtered_authors))
-
-            if len(filtered_authors) <= 1:
-                continue
+        As chaves dos dicionários são os pares (u, v) com u < v.
+        """
+        print(f"Calculando coautorias e pertinência (setCollaborations, ponderação {self.weighting})...")
+        if contributions is None:
+            contributions = self.proposalContributions()
+        self._setCollabDicts(self.collabPairs(contributions))
+
+    def _setCollabDicts(self, pairs):
+        u, v, weights, pertinence, _ = pairs
+        edges = list(zip(u.tolist(), v.tolist()))
+        self.collab_weights = dict(zip(edges, weights.tolist()))
+        self.collab_pertinence = dict(zip(edges, pertinence.tolist()))
+
+    def buildYearLayers(self, contributions = None):
+        '''
+        Pilha de matrizes de coautoria por ano (coluna ano de proposals_info.csv,
+        gravada por prepare_info_for_years.py), numa única passada pelos autores.
 
-            proposal = self.proposals[proposal_id]
-            proposal_type = proposal["siglaTipo"]
-            if proposal_type not in proposal_weight:
-                continue
+        Resultado em self.layer_index (ids de deputado, linhas/colunas comuns a todas
+        as camadas), self.layer_years e self.layers: nome → lista de matrizes
+        triangulares superiores, uma por ano, para "weight", "success_pertinence" e
+        "shared" (número de proposições em comum). Qualquer intervalo de anos é a
+        soma das camadas (ver aggregateLayers / layerGraph).
 
-            proposal_status = int(proposal["ultimoStatus_idSituacao"])
-            n_proposal_weight = proposal_weight[proposal_type]
+        weighting="jaccard" não é aditivo entre anos e não é aceito aqui.
+        '''
+        if self.weighting == "jaccard":
+            raise ValueError("weighting='jaccard' não é aditivo entre anos; use outra ponderação nas camadas.")
+        if contributions is None:
+            contributions = self.proposalContributions()
 
-            status_pertinence = 0
-            for status in positive_proposal_status:
-                if int(proposal_status) == status["status_code"]:
-                    status_pertinence = status["positive_pertinence"]
-                    break
+        import pandas as pd
 
-            pertinence_weighted = n_proposal_weight * status_pertinence
+        proposal_ids = list(contributions)
+        if "ano" not in self.proposals.columns:
+            raise ValueError("proposals_info.csv sem coluna ano.")
+        years = pd.to_numeric(self.proposals["ano"], errors="coerce").reindex(proposal_ids)
+        if years.isna().any():
+            raise ValueError(f"Proposição {years.index[years.isna()][0]} sem coluna ano em proposals_info.csv.")
+        proposal_years = dict(zip(proposal_ids, years.astype(np.int64).tolist()))
+
+        self.layer_years = sorted(set(proposal_years.values()))
+        self.layer_index = np.asarray(self.deputies_ids, dtype=np.int64)
+        n = len(self.layer_index)
+
+        by_year = {year: {} for year in self.layer_years}
+        for proposal_id, contribution in contributions.items():
+            by_year[proposal_years[proposal_id]][proposal_id] = contribution
+
+        print(f"Calculando camadas de coautoria por ano ({len(self.layer_years)} anos)...")
+        self.layers = {"weight": [], "success_pertinence": [], "shared": []}
+        for year in self.layer_years:
+            u, v, weights, pertinence, shared = self.collabPairs(by_year[year])
+            rows = np.searchsorted(self.layer_index, u)
+            cols = np.searchsorted(self.layer_index, v)
+            for name, values in zip(self.layers, (weights, pertinence, shared)):
+                self.layers[name].append(sparse.csr_matrix((values, (rows, cols)), shape=(n, n)))
+        return self.layers
+
+    def aggregateLayers(self, years = None):
+        '''
+        Soma das camadas dos anos informados (todos, se None): nome → matriz
+        triangular superior sobre self.layer_index
+        '''
+        if years is None:
+            years = self.layer_years
+        selected = [i for i, year in enumerate(self.layer_years) if year in set(int(y) for y in years)]
+        n = len(self.layer_index)
+        aggregated = {}
+        for name, matrices in self.layers.items():
+            total = sparse.csr_matrix((n, n), dtype=matrices[0].dtype if matrices else np.int64)
+            for i in selected:
+                total = total + matrices[i]
+            aggregated[name] = total
+        return aggregated
+
+    def layerGraph(self, years = None):
+        '''
+        Rede de coautoria dos anos informados a partir das camadas, sem reler os CSVs.
+        Os nós (com atributos) são os de self.G, se a rede já foi construída.
+        '''
+        aggregated = self.aggregateLayers(years)
+        shared = aggregated["shared"].tocoo()
+        weights = np.asarray(aggregated["weight"][shared.row, shared.col]).ravel()
+        pertinence = np.asarray(aggregated["success_pertinence"][shared.row, shared.col]).ravel()
+
+        G = nx.Graph()
+        if self.G is not None:
+            G.add_nodes_from(self.G.nodes(data=True))
+        else:
+            G.add_nodes_from(self.layer_index.tolist())
+        G.add_edges_from(
+            (u, v, {"weight": w if self.weighted_network else 1, "success_pertinence": p})
+            for u, v, w, p in zip(self.layer_index[shared.row].tolist(),
+                                  self.layer_index[shared.col].tolist(),
+                                  weights.tolist(),
+                                  pertinence.tolist())
+        )
+        return G
+
+    def saveYearLayers(self, network_name = "coauthorship-layers", output_dir = "../data/networks"):
+        '''
+        Grava as camadas por ano em .npz (um arquivo por atributo; ver load_windows)
+        '''
+        paths = []
+        for name, matrices in self.layers.items():
+            path = os.path.join(output_dir, f"{network_name}-{name}.npz")
+            save_windows(path, self.layer_index, [str(y) for y in self.layer_years], matrices)
+            paths.append(path)
+        print("Camadas salvas em: {}".format(", ".join(paths)))
+        return paths
+
+    def sweepComponents(self):
+        '''
+        Contagens que não dependem de proposal_weight, role_weights nem node_parameters,
+        calculadas uma vez sobre os dados já carregados:
+
+        - pair_u, pair_v: pares de coautores (u < v) de qualquer tipo de proposição
+        - pair_weight, pair_pertinence, pair_shared: pares × tipos de proposição, com
+          a coautoria projetada (self.weighting, self.mass_strategy), a pertinência
+          da situação e o número de proposições em comum, sem o peso do tipo
+        - individual: deputados × tipos, propostas individuais
+        - roles, role_counts, role_party: ver roleComponents
+
+        Qualquer configuração é uma combinação linear delas (combine_edges /
+        combine_nodes). weighting="jaccard" não é linear e não é aceito aqui.
+        '''
+        if self.weighting == "jaccard":
+            raise ValueError("weighting='jaccard' não é linear nos pesos de tipo; use outra ponderação.")
+
+        contributions = self.proposalContributions(valid_only=False)
+        types = self.proposal_scores["siglaTipo"].astype(str).to_dict()
+        status_pertinence = self.proposal_scores["status_pertinence"].to_dict()
+
+        type_names = sorted({types[pid] for pid in contributions})
+        type_codes = {t: i for i, t in enumerate(type_names)}
+        by_type = {t: {} for t in type_names}
+        for proposal_id, (authors, _, _) in contributions.items():
+            by_type[types[proposal_id]][proposal_id] = (authors, 1, status_pertinence[proposal_id])
+
+        print(f"Calculando contagens de coautoria por tipo ({len(type_names)} tipos)...")
+        pair_u, pair_v, W, P, S = stack_pair_layers([self.collabPairs(by_type[t]) for t in type_names])
+
+        deputy_index, roles, role_counts, role_party = self.roleComponents()
+        single = [(authors[0], type_codes[types[pid]])
+                  for pid, (authors, _, _) in contributions.items() if len(authors) == 1]
+        rows = np.searchsorted(deputy_index, np.asarray([a for a, _ in single], dtype=np.int64))
+        cols = np.asarray([t for _, t in single], dtype=np.int64)
+        individual = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (rows, cols)), shape=(len(deputy_index), len(type_names))
+        )
+
+        return {
+            "deputy_index": deputy_index,
+            "types": type_names,
+            "pair_u": pair_u,
+            "pair_v": pair_v,
+            "pair_weight": W,
+            "pair_pertinence": P,
+            "pair_shared": S,
+            "individual": individual,
+            "roles": roles,
+            "role_counts": role_counts,
+            "role_party": role_party,
+        }
+
+    def variantGraph(self, components, proposal_weight, role_weights, node_params):
+        '''
+        Rede para uma configuração de pesos a partir de sweepComponents, sem recontar
+        coautorias nem reler os CSVs
+        '''
+        ids = components["deputy_index"].tolist()
+        proposals, roles, has_role = combine_nodes(components, proposal_weight, role_weights)
+        deputies_proposals = dict(zip(ids, proposals.tolist()))
+        roles_relevance = {d: r for d, r, h in zip(ids, roles.tolist(), has_role.tolist()) if h}
+
+        G = nx.Graph()
+        G.add_nodes_from(self.nodeRecords(deputies_proposals, roles_relevance, node_params)[0])
+
+        u, v, weights, pertinence = combine_edges(components, proposal_weight)
+        G.add_edges_from(
+            (a, b, {"weight": w if self.weighted_network else 1, "success_pertinence": p})
+            for a, b, w, p in zip(u.tolist(), v.tolist(), weights.tolist(), pertinence.tolist())
+        )
+        return G
+
+    def sweep(self, configs, weighted = True, weighting = "count", mass_strategy = "keep", mass_threshold = 150,
+              network_name = "coauthorship-sweep", output_dir = "../data/networks"):
+        '''
+        Constrói uma rede por configuração reaproveitando os dados carregados e as
+        contagens por tipo/cargo (sweepComponents), e grava um GEXF por configuração.
 
-            self.collab_pertinence = self.addCollabPertinence(
-                self.collab_pertinence, filtered_authors, pertinence_weighted
+        configs: dicionário nome → {"proposal_weight": ..., "role_weights": ...,
+        "node_parameters": ...}; chaves ausentes usam os valores de model_parameters.
+        Retorna nome → caminho do arquivo.
+        '''
+        if mass_strategy not in MASS_STRATEGIES:
+            raise ValueError(f"Estratégia inválida: {mass_strategy!r}. Use uma de {MASS_STRATEGIES}.")
+        self.weighted_network = weighted
+        self.weighting = weighting
+        self.mass_strategy = mass_strategy
+        self.mass_threshold = mass_threshold
+
+        components = self.sweepComponents()
+        os.makedirs(output_dir, exist_ok=True)
+
+        paths = {}
+        for name, config in configs.items():
+            G = self.variantGraph(
+                components,
+                config.get("proposal_weight", proposal_weight),
+                config.get("role_weights", role_weights),
+                config.get("node_parameters", node_parameters),
             )
+            path = write_network(G, os.path.join(output_dir, f"{network_name}-{name}.gexf"))
+            paths[name] = path
+            print(f"[{name}] nós: {G.number_of_nodes()}, arestas: {G.number_of_edges()} -> {path}")
+        return paths
 
-    def setDeputiesIndividualProposals(self):
+    def massProposalReport(self, strategies = MASS_STRATEGIES):
+        '''
+        Compara as estratégias para proposições de massa: para cada uma, recalcula
+        as coautorias e mede arestas, massa total (soma dos pesos), variação da
+        massa em relação a "keep" e tempo de cálculo. Não altera a rede.
+        '''
+        import pandas as pd
+
+        saved = (self.mass_strategy, self.collab_weights, self.collab_pertinence)
+        # As contribuições não dependem da estratégia: calculadas (e resumidas) uma vez
+        contributions = self.proposalContributions()
+        rows = []
+        try:
+            for strategy in strategies:
+                self.mass_strategy = strategy
+                start = perf_counter()
+                self.setCollaborations(contributions)
+                elapsed = perf_counter() - start
+                rows.append({
+                    "strategy": strategy,
+                    "edges": len(self.collab_weights),
+                    "edge_mass": float(sum(self.collab_weights.values())),
+                    "pertinence_mass": float(sum(self.collab_pertinence.values())),
+                    "seconds": elapsed,
+                })
+        finally:
+            self.mass_strategy, self.collab_weights, self.collab_pertinence = saved
+
+        report = pd.DataFrame(rows).set_index("strategy")
+        if "keep" in report.index and report.loc["keep", "edge_mass"] > 0:
+            report["mass_change"] = report["edge_mass"] / report.loc["keep", "edge_mass"] - 1
+        print(f"Proposições com {self.mass_threshold} ou mais autores:")
+        print(report.to_string())
+        return report
+
+    def setDeputiesIndividualProposals(self, contributions = None):
         """
         Propostas individuais escritas por um deputado e ponderadas por peso de acordo com seu tipo.
 
@@ -347,92 +744,96 @@ class NetworkBuilder():
         - considera apenas deputados em self.deputies_ids
         - garante que só propostas com exatamente 1 deputado válido contam como "individuais"
         """
-        deputies_set = set(self.deputies_ids)
-        deputies_weight = {}
-
         print("Calculando propostas individuais (setDeputiesIndividualProposals)...")
-        for proposal_id, authors_list in self.proposal_authors.items():
-            if proposal_id not in self.proposals:
-                continue
-
-            # filtrar só deputados válidos
-            filtered_authors = [a for a in authors_list if a in deputies_set]
-            filtered_authors = sorted(set(filtered_authors))
+        if contributions is None:
+            contributions = self.proposalContributions()
+        individual = self._individualTotals(contributions)
+        self.deputies_proposals = {deputy_id: w for deputy_id, (w, _) in individual.items()}
 
-            # só conta como individual se sobrou exatamente 1 deputado
-            if len(filtered_authors) != 1:
-                continue
-
-            author_id = filtered_authors[0]
-            proposal_type = self.proposals[proposal_id]["siglaTipo"]
-            if proposal_type not in proposal_weight:
+    def _individualTotals(self, contributions, totals = None, sign = 1):
+        '''
+        Soma (sign × peso do tipo, sign × 1) por autor das proposições individuais de
+        contributions em totals (deputado → (peso, número de propostas)); autores
+        que ficam sem propostas saem do dicionário
+        '''
+        totals = {} if totals is None else totals
+        for authors, n_proposal_weight, _ in contributions.values():
+            if len(authors) != 1:
                 continue
-
-            n_proposal_weight = proposal_weight[proposal_type]
-
-            if author_id in deputies_weight:
-                deputies_weight[author_id] += n_proposal_weight
+            author_id = authors[0]
+            w, n = totals.get(author_id, (0, 0))
+            w, n = w + sign * n_proposal_weight, n + sign
+            if n:
+                totals[author_id] = (w, n)
             else:
-                deputies_weight[author_id] = n_proposal_weight
-
-        self.deputies_proposals = deputies_weight
+                totals.pop(author_id, None)
+        return totals
 
-    def setDeputiesIndividualSuccessProposals(self):
+    def setDeputiesIndividualSuccessProposals(self, contributions = None):
         '''
         Propostas escritas por apenas um deputado que tiveram algum grau de aceitação na camara, ponderadas também
         por peso de acordo com o seu tipo
         '''
-        deputies_pertincence = {}
-        for proposal_id in list(self.proposals.keys()):
-            authors_list = self.proposal_authors[proposal_id]
-            n_authors = len(authors_list)
-            # checks if the proposal have only one author
-            if (n_authors == 1 and (proposal_id in list(self.proposals.keys()))):
-                author_id = authors_list[0]
-                proposal_type = self.proposals[proposal_id]['siglaTipo']
-                proposal_status = int(self.proposals[proposal_id]['ultimoStatus_idSituacao'])
-                proposal_weight = proposal_weight[proposal_type]
-                status_pertinence = 0
-
-                for status in positive_proposal_status:
-                    if(int(proposal_status) == status['status_code']):
-                        status_pertinence = status['positive_pertinence']
-                pertinence_weighted = proposal_weight * status_pertinence
+        if contributions is None:
+            contributions = self.proposalContributions()
 
-                if(author_id in deputies_pertincence):
-                    deputies_pertincence[author_id] += pertinence_weighted
-                else:
-                    deputies_pertincence[author_id] = pertinence_weighted
+        deputies_pertinence = {}
+        for authors, _, pertinence_weighted in contributions.values():
+            # checks if the proposal have only one author
+            if len(authors) != 1:
+                continue
+            author_id = authors[0]
+            deputies_pertinence[author_id] = deputies_pertinence.get(author_id, 0) + pertinence_weighted
 
-        self.deputies_proposals_pertinence = deputies_pertincence
+        self.deputies_proposals_pertinence = deputies_pertinence
 
     def setDeputiesRoleInfluence(self):
         '''
         Calcula a influência de um deputado de acordo com os cargos que este ocupo na câmara nos anos
         referentes as legislaturas selecionadas
+
+        Cálculo colunar sobre roles_info.csv (ver roleComponents): peso do cargo por
+        role_weights e, para cargos de liderança fora da tabela,
+        "Líder de partido" × (membros do partido / 513) × 30. Cargos sem peso contam 0.
+        '''
+        deputy_index, roles, counts, party = self.roleComponents()
+        direct, leader = role_vectors(roles, role_weights)
+        totals = counts @ direct + party @ leader
+        has_role = np.diff(counts.indptr) > 0
+        self.roles_relevance = dict(zip(deputy_index[has_role].tolist(), totals[has_role].tolist()))
+
+    def roleComponents(self):
         '''
-        deputies_weight = {}
-        role_weight_dict = role_weights
-        for deputy_id, role in self.legislative_roles.iterrows():
-            role_name = role['role_name']
-            deputy_id = str(deputy_id)
-            if (deputy_id in self.deputies_ids):
-                if(role_name in role_weight_dict.keys()):
-                    weight = role_weight_dict[role_name]
-                elif("Líder" in role_name):
-                    party_id = role['role_place_id']
-                    party_weight = (self.parties[party_id]["members_number"]/513) * 30
-                    weight = role_weight_dict["Líder de partido"] * party_weight
-                if(deputy_id in deputies_weight):
-                    deputies_weight[deputy_id] += weight
-                else:
-                    deputies_weight[deputy_id] = weight
-
-        self.roles_relevance = deputies_weight
+        Contagens de cargos por deputado da rede, com ids normalizados para int uma
+        única vez: (ids, nomes de cargo, contagens deputado × cargo, soma do fator do
+        partido (membros / 513 × 30) deputado × cargo). A influência de qualquer
+        configuração de role_weights é uma combinação linear delas (role_vectors).
+        '''
+        import pandas as pd
+
+        roles = self.legislative_roles.reset_index()
+        deputy_ids = pd.to_numeric(roles['deputy_id'], errors='coerce').astype('Int64')
+        in_network = deputy_ids.isin(self.deputies_ids).to_numpy(dtype=bool)
+        roles = roles[in_network]
+        deputy_ids = deputy_ids[in_network].to_numpy(dtype='int64')
+
+        parties = self.parties
+        party_weight = (parties['members_number'] / 513) * 30 if len(parties) else pd.Series(dtype=float)
+        party_weight.index = pd.to_numeric(party_weight.index, errors='coerce')
+        party_ids = pd.to_numeric(roles['role_place_id'], errors='coerce')
+        factors = party_ids.map(party_weight).fillna(0).to_numpy(dtype=float)
+
+        deputy_index = np.asarray(self.deputies_ids, dtype=np.int64)
+        role_codes, role_names = pd.factorize(roles['role_name'].astype(str), sort=True)
+        rows = np.searchsorted(deputy_index, deputy_ids)
+        shape = (len(deputy_index), len(role_names))
+        counts = sparse.csr_matrix((np.ones(len(rows)), (rows, role_codes)), shape=shape)
+        party = sparse.csr_matrix((factors, (rows, role_codes)), shape=shape)
+        return deputy_index, list(role_names), counts, party
 
     def setDeputiesRegion(self):
     
         for deputy_id in self.deputies_ids:
-            if deputy_id in self.deputies and "uf" in self.deputies[deputy_id]:
+            if deputy_id in self.deputies and self.deputies[deputy_id].get("uf") in UF_REGIONS:
                 uf = self.deputies[deputy_id]["uf"]
                 self.deputies[deputy_id]["region"] = getUfRegion(uf)
@@ -1,12 +1,18 @@
+import warnings
+
 import numpy as np
 import model_parameters
 import networkx as nx
 import pandas as pd
+from proposal_scoring import score_proposals
 
 class ProposalAnalysis:
     def __init__(self, proposal_authors, proposals):
         self.proposal_authors = proposal_authors
         self.proposals = proposals
+        self.proposal_scores = score_proposals(
+            proposals, model_parameters.proposal_weight, model_parameters.positive_proposal_status
+        )
 
     def getPrAuthorsInfo(self, graph_analysis_obj, pagerank_alpha=0.9):
         '''
@@ -40,21 +46,22 @@ class ProposalAnalysis:
 
         return proposal_authors_info
 
-    def getPrSituation(self):
+    def getPrSituation(self, graph_analysis_obj=None):
         '''
         Dicionário com 1 se a proposição for de alguma forma aprovada e 0 caso contrário
+
+        getPrSituation(graph_analysis_obj) é o nome antigo de getPrPagerankSituation,
+        mantido por compatibilidade (obsoleto)
         '''
-        proposals_situation = {}
-        for proposal_id in list(self.proposals.keys()):
-            proposal_status = int(self.proposals[proposal_id]['ultimoStatus_idSituacao'])
-            status_pertinence = 0
-            for status in model_parameters.positive_proposal_status:
-                if(int(proposal_status) == status['status_code']):
-                    status_pertinence = status['positive_pertinence']
-            proposals_situation[proposal_id] = status_pertinence
-        return proposals_situation
+        if graph_analysis_obj is not None:
+            warnings.warn(
+                "getPrSituation(graph_analysis_obj) está obsoleto; use getPrPagerankSituation.",
+                DeprecationWarning, stacklevel=2,
+            )
+            return self.getPrPagerankSituation(graph_analysis_obj)
+        return self.proposal_scores["status_pertinence"].to_dict()
 
-    def getPrSituation(self, graph_analysis_obj):
+    def getPrPagerankSituation(self, graph_analysis_obj):
         '''
         Retorna dicionario onde a chave é a proposicao e value é dicionario com pagerank e situacao
         '''
@@ -77,8 +84,9 @@ class ProposalAnalysis:
         return pagerank_situation_relationship
 
     def getPrSummary(self):
-        total = len(list(self.getPrSituation()))
-        approved = sum(list(self.getPrSituation()))
+        situation = self.getPrSituation()
+        total = len(situation)
+        approved = sum(situation.values())
         return {"approved": approved, "rejected": total - approved}
  
     def countPrAttribute(self, attribute):
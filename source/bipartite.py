@@ -0,0 +1,188 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+def encode_incidence(row_ids, col_keys, row_index=None):
+    """
+    Codifica uma rede bipartida (ex.: deputado × (votação, voto)) como matriz de
+    incidência esparsa.
+
+    :param row_ids: ids das linhas (ex.: deputados), um por registro
+    :param col_keys: lista de arrays/Series que, juntos, identificam a coluna
+                     (ex.: [idVotacao, voto])
+    :param row_index: ids de linha já ordenados; se None, usa os ids únicos de row_ids
+
+    Retorna (row_index, col_index, B), em que col_index é o MultiIndex dos rótulos de
+    coluna e B[i, c] conta quantas vezes a linha i aparece na coluna c. Registros
+    repetidos são somados, não descartados.
+    """
+    row_ids = np.asarray(row_ids)
+    if row_index is None:
+        row_index = np.unique(row_ids)
+    rows = np.searchsorted(row_index, row_ids)
+
+    cols, uniques = pd.MultiIndex.from_arrays(list(col_keys)).factorize()
+    n_cols = len(uniques)
+
+    data = np.ones(len(rows), dtype=np.int32)
+    B = sparse.csr_matrix((data, (rows, cols)), shape=(len(row_index), n_cols))
+    B.sum_duplicates()
+    return row_index, uniques, B
+
+
+def collapse_columns(incidence, col_groups):
+    """
+    Soma as colunas de B que pertencem ao mesmo grupo (B · M, com M indicadora
+    coluna → grupo). Ex.: (votação, voto) → votação.
+    """
+    groups, _ = pd.factorize(np.asarray(col_groups))
+    n_cols = incidence.shape[1]
+    M = sparse.csr_matrix(
+        (np.ones(n_cols, dtype=incidence.dtype), (np.arange(n_cols), groups)),
+        shape=(n_cols, groups.max() + 1 if n_cols else 0),
+    )
+    return (incidence @ M).tocsr()
+
+
+def project(incidence, column_weights=None):
+    """
+    Projeção da rede bipartida sobre as linhas: B · diag(w) · Bᵀ.
+
+    Sem pesos, a entrada (i, j) é o número de colunas em comum entre i e j.
+    """
+    if column_weights is None:
+        return (incidence @ incidence.T).tocsr()
+    column_weights = np.asarray(column_weights)
+    W = sparse.diags(column_weights, dtype=column_weights.dtype)
+    return (incidence @ W @ incidence.T).tocsr()
+
+
+PROJECTION_WEIGHTINGS = ("count", "newman", "hyperbolic", "jaccard")
+
+
+def column_scale(incidence, weighting="count"):
+    """
+    Fator de escala por coluna (hiperaresta) de tamanho k para cada ponderação:
+      - "count" e "jaccard": 1
+      - "newman": 1 / (k - 1) (colunas com k < 2 não geram pares: 0)
+      - "hyperbolic": 1 / k
+    k conta linhas distintas da coluna.
+    """
+    if weighting not in PROJECTION_WEIGHTINGS:
+        raise ValueError(f"Ponderação inválida: {weighting!r}. Use uma de {PROJECTION_WEIGHTINGS}.")
+
+    sizes = np.diff(incidence.tocsc().indptr).astype(np.float64)
+    if weighting == "newman":
+        return np.divide(1.0, sizes - 1, out=np.zeros_like(sizes), where=sizes > 1)
+    if weighting == "hyperbolic":
+        return np.divide(1.0, sizes, out=np.zeros_like(sizes), where=sizes > 0)
+    return np.ones_like(sizes)
+
+
+MASS_STRATEGIES = ("keep", "cap", "downweight", "drop")
+
+
+def mass_column_scale(sizes, threshold, strategy="keep"):
+    """
+    Fator por coluna para hiperarestas "de massa" (k >= threshold linhas), que
+    sozinhas geram k(k-1)/2 pares:
+      - "keep": 1 (sem tratamento)
+      - "cap": limita a massa da coluna à de um clique de tamanho threshold,
+        t(t-1) / (k(k-1))
+      - "downweight": 1 / (k - 1)
+      - "drop": 0 (a coluna deve ser descartada)
+    Colunas abaixo do limiar ficam com 1. Como o fator multiplica a coluna em
+    B · diag(w) · Bᵀ, cada hiperaresta continua sendo uma atualização de posto 1,
+    sem gerar a lista de pares.
+    """
+    if strategy not in MASS_STRATEGIES:
+        raise ValueError(f"Estratégia inválida: {strategy!r}. Use uma de {MASS_STRATEGIES}.")
+
+    sizes = np.asarray(sizes, dtype=np.float64)
+    scale = np.ones_like(sizes)
+    mass = sizes >= max(threshold, 2)
+    if strategy == "cap":
+        scale[mass] = threshold * (threshold - 1) / (sizes[mass] * (sizes[mass] - 1))
+    elif strategy == "downweight":
+        scale[mass] = 1.0 / (sizes[mass] - 1)
+    elif strategy == "drop":
+        scale[mass] = 0.0
+    return scale
+
+
+def weighted_projection(incidence, weighting="count", column_weights=None):
+    """
+    Projeção B · diag(w · escala) · Bᵀ para a ponderação escolhida (ver
+    column_scale); column_weights (ex.: peso do tipo de proposição) multiplica a
+    escala de cada coluna.
+
+    "jaccard" normaliza a contagem (ponderada) pela união:
+    C[i, j] / (C[i, i] + C[j, j] - C[i, j]).
+    """
+    if weighting == "count":
+        # Sem escala: preserva o tipo (inteiro) dos pesos
+        C = project(incidence, column_weights)
+    else:
+        scale = column_scale(incidence, weighting)
+        if column_weights is not None:
+            scale = scale * np.asarray(column_weights, dtype=np.float64)
+        C = project(incidence, scale)
+
+    if weighting == "jaccard":
+        C = C.tocoo()
+        diagonal = C.diagonal()
+        union = diagonal[C.row] + diagonal[C.col] - C.data
+        data = np.divide(C.data, union, out=np.zeros_like(C.data, dtype=np.float64), where=union > 0)
+        C = sparse.csr_matrix((data, (C.row, C.col)), shape=C.shape)
+    return C
+
+
+def _project_block(block):
+    """
+    Executado em um processo do pool: calcula B_k·B_kᵀ das colunas recebidas e
+    devolve as entradas não nulas como triplas (linhas, colunas, valores).
+    """
+    coo = (block @ block.T).tocoo()
+    return coo.row, coo.col, coo.data
+
+
+def project_parallel(incidence, col_groups, workers):
+    """
+    Mesmo resultado de project(incidence), distribuindo as colunas entre workers
+    processos. Colunas do mesmo grupo (ex.: mesma votação) vão para o mesmo worker.
+
+    Cada worker devolve seu B_k·B_kᵀ esparso (triplas); a redução soma as triplas
+    na ordem dos workers, então o resultado é determinístico e idêntico ao
+    caminho serial, inclusive no tipo dos valores. A memória cresce com o número
+    de pares com covotação em cada bloco, não com linhas².
+    """
+    groups, _ = pd.factorize(np.asarray(col_groups))
+    owner = groups % workers
+    incidence = incidence.tocsc()
+    n = incidence.shape[0]
+
+    blocks = [incidence[:, np.flatnonzero(owner == k)].tocsr() for k in range(workers)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        triples = list(pool.map(_project_block, blocks))
+
+    # Soma em 64 bits; o resultado volta ao tipo da projeção serial (o de B)
+    accumulate = np.result_type(incidence.dtype, np.int64)
+    rows = np.concatenate([r for r, _, _ in triples])
+    cols = np.concatenate([c for _, c, _ in triples])
+    data = np.concatenate([d.astype(accumulate) for _, _, d in triples])
+    total = sparse.csr_matrix((data, (rows, cols)), shape=(n, n))
+    total.sum_duplicates()
+    return total.astype(incidence.dtype)
+
+
+def upper_pairs(matrix):
+    """
+    Extrai as entradas não nulas do triângulo superior estrito (i < j) de uma
+    matriz simétrica, como arrays (i, j, valor).
+    """
+    upper = sparse.triu(matrix, k=1).tocoo()
+    mask = upper.data != 0
+    return upper.row[mask], upper.col[mask], upper.data[mask]
@@ -0,0 +1,180 @@
+import os
+
+import numpy as np
+from scipy import sparse
+
+from .network_store import is_binary_network, network_base, read_network, write_network
+from .utils import packPairs, unpackPairs
+
+
+def stack_pair_layers(layers):
+    """
+    Empilha camadas de pares (u, v, weight, pertinence, shared), uma por tipo de
+    proposição, em matrizes esparsas pares × tipos sobre a união dos pares.
+    Retorna (u, v, W, P, S).
+    """
+    keys = [packPairs(u, v) for u, v, *_ in layers]
+    all_keys = np.unique(np.concatenate(keys)) if keys else np.array([], dtype=np.int64)
+    n_pairs, n_types = len(all_keys), len(layers)
+
+    stacked = []
+    for position in range(3):
+        rows, cols, data = [], [], []
+        for t, (layer, layer_keys) in enumerate(zip(layers, keys)):
+            rows.append(np.searchsorted(all_keys, layer_keys))
+            cols.append(np.full(len(layer_keys), t, dtype=np.int64))
+            data.append(layer[2 + position])
+        if rows:
+            matrix = sparse.csr_matrix(
+                (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+                shape=(n_pairs, n_types),
+            )
+        else:
+            matrix = sparse.csr_matrix((n_pairs, n_types), dtype=np.int64)
+        stacked.append(matrix)
+
+    u, v = unpackPairs(all_keys)
+    return (u, v, *stacked)
+
+
+def type_vector(types, proposal_weight):
+    """
+    Peso de cada tipo em `types` segundo proposal_weight (0 para tipos ausentes) e
+    máscara dos tipos considerados válidos (presentes no dicionário).
+    """
+    weights = np.asarray([proposal_weight.get(t, 0) for t in types])
+    valid = np.asarray([t in proposal_weight for t in types], dtype=np.int64)
+    return weights, valid
+
+
+def role_vectors(roles, role_weights):
+    """
+    Coeficientes por nome de cargo: (peso direto, peso de liderança). Cargos em
+    role_weights usam o peso direto; os demais com "Líder" no nome usam
+    role_weights["Líder de partido"] sobre o fator do partido; o resto vale 0.
+    """
+    direct = np.asarray([float(role_weights.get(r, 0)) for r in roles])
+    leader = np.asarray([
+        float(role_weights.get("Líder de partido", 0)) if r not in role_weights and "Líder" in r else 0.0
+        for r in roles
+    ])
+    return direct, leader
+
+
+def combine_edges(components, proposal_weight):
+    """
+    Arestas de uma configuração de proposal_weight por recombinação linear das
+    contagens por tipo: retorna (u, v, weight, pertinence) dos pares com pelo
+    menos uma proposição de tipo válido.
+    """
+    weights, valid = type_vector(components["types"], proposal_weight)
+    shared = components["pair_shared"] @ valid
+    keep = shared > 0
+    weight = components["pair_weight"] @ weights
+    pertinence = components["pair_pertinence"] @ weights
+    return components["pair_u"][keep], components["pair_v"][keep], weight[keep], pertinence[keep]
+
+
+def combine_nodes(components, proposal_weight, role_weights):
+    """
+    Por deputado de components["deputy_index"]: (peso das propostas individuais,
+    influência de cargos, possui algum cargo) para a configuração informada.
+    """
+    weights, _ = type_vector(components["types"], proposal_weight)
+    direct, leader = role_vectors(components["roles"], role_weights)
+    proposals = components["individual"] @ weights
+    roles = components["role_counts"] @ direct + components["role_party"] @ leader
+    has_role = np.diff(components["role_counts"].tocsr().indptr) > 0
+    return proposals, roles, has_role
+
+
+def save_components(path, components):
+    """
+    Grava as componentes (contagens por tipo de proposição e por cargo) em .npz.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    arrays = {}
+    for name, value in components.items():
+        if sparse.issparse(value):
+            value = value.tocsr()
+            arrays[f"{name}__data"] = value.data
+            arrays[f"{name}__indices"] = value.indices
+            arrays[f"{name}__indptr"] = value.indptr
+            arrays[f"{name}__shape"] = np.asarray(value.shape)
+        else:
+            arrays[name] = np.asarray(value)
+    np.savez_compressed(path, **arrays)
+
+
+def load_components(path):
+    """
+    Lê as componentes gravadas por save_components.
+    """
+    components = {}
+    with np.load(path) as f:
+        for name in f.files:
+            if "__" not in name:
+                value = f[name]
+                components[name] = value.tolist() if value.dtype.kind in "US" else value
+        for name in {n.split("__")[0] for n in f.files if "__" in n}:
+            components[name] = sparse.csr_matrix(
+                (f[f"{name}__data"], f[f"{name}__indices"], f[f"{name}__indptr"]),
+                shape=tuple(f[f"{name}__shape"]),
+            )
+    return components
+
+
+def sidecar_path(network_path):
+    """
+    Caminho das componentes gravadas ao lado de uma rede (.gexf → .components.npz).
+    """
+    return network_base(network_path) + ".components.npz"
+
+
+def reweight_graph(G, components, proposal_weight, role_weights, node_parameters):
+    """
+    Recalcula, no próprio G, os pesos de nós e arestas para uma nova configuração,
+    a partir das componentes (ver NetworkBuilder.sweepComponents). Arestas que
+    deixam de ter proposições de tipo válido são removidas e as novas, criadas.
+    """
+    ids = components["deputy_index"].tolist()
+    known = np.asarray(components["known"], dtype=bool)
+    proposals, roles, _ = combine_nodes(components, proposal_weight, role_weights)
+    node_weights = np.where(
+        known, proposals * node_parameters["proposal"] + roles * node_parameters["role"], 0.0
+    ).astype(float)
+    for deputy_id, weight in zip(ids, node_weights.tolist()):
+        if deputy_id in G:
+            G.nodes[deputy_id]["weight"] = weight
+
+    weighted = bool(components["weighted"])
+    u, v, weights, pertinence = combine_edges(components, proposal_weight)
+    edges = set(zip(u.tolist(), v.tolist()))
+    G.remove_edges_from([(a, b) for a, b in G.edges() if (min(a, b), max(a, b)) not in edges])
+    G.add_edges_from(
+        (a, b, {"weight": w if weighted else 1, "success_pertinence": p})
+        for a, b, w, p in zip(u.tolist(), v.tolist(), weights.tolist(), pertinence.tolist())
+    )
+    return G
+
+
+def reweight_network(network_path, proposal_weight, role_weights, node_parameters, output_path=None):
+    """
+    Regrava uma rede salva com componentes (NetworkBuilder.saveNetWork(components=True))
+    com novos pesos, sem recontar coautorias nem ler os dados brutos. Por padrão
+    grava ao lado do original, com sufixo "-reweighted", no mesmo formato (GEXF ou
+    binário).
+    """
+    network_path = network_path.rstrip(os.sep)
+    components = load_components(sidecar_path(network_path))
+    G = read_network(network_path, node_type=int)
+    reweight_graph(G, components, proposal_weight, role_weights, node_parameters)
+
+    fmt = "binary" if is_binary_network(network_path) else "gexf"
+    compress = network_path.endswith(".gz")
+    if output_path is None:
+        base = network_base(network_path)
+        output_path = f"{base}-reweighted{network_path[len(base):]}"
+    output_path = write_network(G, output_path, fmt, compress=compress)
+    print(f"Rede reponderada salva em: {output_path}")
+    return output_path
@@ -0,0 +1,77 @@
+import json
+import os
+
+import numpy as np
+
+
+def save_state(path, config, contributions, pairs, individual, roles):
+    """
+    Persiste os acumuladores do NetworkBuilder em um único .npz:
+      - config: parâmetros que definem os pesos (ponderação, estratégia de massa,
+        pesos de tipo/situação); se mudarem, o estado não é reaproveitado
+      - contributions: proposição → (autores, peso do tipo, pertinência ponderada)
+      - pairs: (u, v, weight, pertinence, shared) acumulados por par, u < v
+      - individual: deputado → (peso de propostas individuais, número de propostas)
+      - roles: (assinatura de cargos/partidos, influência por deputado)
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    proposal_ids = list(contributions.keys())
+    authors = [contributions[pid][0] for pid in proposal_ids]
+    u, v, weight, pertinence, shared = pairs
+    roles_signature, roles_relevance = roles
+
+    np.savez_compressed(
+        path,
+        config=np.array(json.dumps(config, sort_keys=True, default=str)),
+        proposal_ids=np.asarray(proposal_ids, dtype=np.int64),
+        proposal_indptr=np.cumsum([0] + [len(a) for a in authors]).astype(np.int64),
+        proposal_authors=np.asarray([a for group in authors for a in group], dtype=np.int64),
+        proposal_weights=np.asarray([contributions[pid][1] for pid in proposal_ids]),
+        proposal_pertinences=np.asarray([contributions[pid][2] for pid in proposal_ids]),
+        pair_u=np.asarray(u, dtype=np.int64),
+        pair_v=np.asarray(v, dtype=np.int64),
+        pair_weight=np.asarray(weight),
+        pair_pertinence=np.asarray(pertinence),
+        pair_shared=np.asarray(shared, dtype=np.int64),
+        individual_ids=np.asarray(list(individual.keys()), dtype=np.int64),
+        individual_weight=np.asarray([w for w, _ in individual.values()]),
+        individual_count=np.asarray([n for _, n in individual.values()], dtype=np.int64),
+        roles_signature=np.array(roles_signature),
+        roles_ids=np.asarray(list(roles_relevance.keys())),
+        roles_weight=np.asarray(list(roles_relevance.values())),
+    )
+
+
+def load_state(path, config):
+    """
+    Lê um estado salvo por save_state. Retorna None se o arquivo não existir ou
+    tiver sido gerado com outra config.
+    """
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as f:
+        if str(f["config"]) != json.dumps(config, sort_keys=True, default=str):
+            return None
+
+        ids = f["proposal_ids"].tolist()
+        indptr = f["proposal_indptr"]
+        authors = f["proposal_authors"].tolist()
+        weights = f["proposal_weights"].tolist()
+        pertinences = f["proposal_pertinences"].tolist()
+        contributions = {
+            pid: (tuple(authors[indptr[i]:indptr[i + 1]]), weights[i], pertinences[i])
+            for i, pid in enumerate(ids)
+        }
+
+        pairs = (f["pair_u"], f["pair_v"], f["pair_weight"], f["pair_pertinence"], f["pair_shared"])
+        individual = {
+            deputy_id: (w, n)
+            for deputy_id, w, n in zip(f["individual_ids"].tolist(),
+                                       f["individual_weight"].tolist(),
+                                       f["individual_count"].tolist())
+        }
+        roles = (str(f["roles_signature"]),
+                 dict(zip(f["roles_ids"].tolist(), f["roles_weight"].tolist())))
+
+    return {"contributions": contributions, "pairs": pairs, "individual": individual, "roles": roles}
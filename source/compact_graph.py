@@ -0,0 +1,351 @@
+import numpy as np
+import pandas as pd
+import networkx as nx
+from scipy import sparse
+
+
+class _Missing:
+    def __repr__(self):
+        return "<ausente>"
+
+
+MISSING = _Missing()
+
+
+def encode_column(values):
+    """
+    Codifica os valores de um atributo (um por nó/aresta; MISSING = ausente) em
+    uma coluna compacta sem perda: (tipo, valores, máscara de presença ou None).
+
+      - "int": int32 quando cabe, senão int64
+      - "float": float32 quando a conversão não perde precisão, senão float64
+      - "bool": bool
+      - "str": pandas.Categorical
+      - "object": tipos misturados (ex.: int e None), mantidos como estão
+
+    Arrays numéricos do numpy são codificados sem passar por listas.
+    """
+    if isinstance(values, np.ndarray) and values.dtype.kind in "biuf":
+        kind = {"b": "bool", "i": "int", "u": "int", "f": "float"}[values.dtype.kind]
+        return kind, _narrow(kind, values), None
+
+    values = list(values)
+    present = np.fromiter((v is not MISSING for v in values), dtype=bool, count=len(values))
+    mask = None if present.all() else present
+    kinds = {type(v) for v in values if v is not MISSING}
+
+    if kinds == {bool}:
+        return "bool", np.asarray([v is True for v in values], dtype=bool), mask
+    if kinds and kinds <= {int}:
+        filled = np.asarray([v if v is not MISSING else 0 for v in values], dtype=np.int64)
+        return "int", _narrow("int", filled), mask
+    if kinds and kinds <= {float}:
+        filled = np.asarray([v if v is not MISSING else 0.0 for v in values], dtype=np.float64)
+        return "float", _narrow("float", filled), mask
+    if kinds == {str}:
+        return "str", pd.Categorical([v if v is not MISSING else None for v in values]), mask
+
+    column = np.empty(len(values), dtype=object)
+    column[:] = [v if v is not MISSING else None for v in values]
+    return "object", column, mask
+
+
+def _narrow(kind, values):
+    # Menor dtype que representa os valores exatamente
+    if kind == "int":
+        values = values.astype(np.int64, copy=False)
+        info = np.iinfo(np.int32)
+        if len(values) == 0 or (values.min() >= info.min and values.max() <= info.max):
+            return values.astype(np.int32)
+        return values
+    if kind == "float":
+        values = values.astype(np.float64, copy=False)
+        narrow = values.astype(np.float32)
+        if np.array_equal(narrow.astype(np.float64), values, equal_nan=True):
+            return narrow
+        return values
+    return values.astype(bool, copy=False)
+
+
+def decode_column(kind, column, mask):
+    if kind == "str":
+        values = np.asarray(column.astype(object)).tolist()
+    else:
+        values = column.tolist()
+    if mask is None:
+        return values
+    return [v if p else MISSING for v, p in zip(values, mask.tolist())]
+
+
+def _id_array(node_ids):
+    if isinstance(node_ids, np.ndarray) and node_ids.dtype.kind in "iu":
+        return node_ids
+    node_ids = list(node_ids)
+    if node_ids and all(type(n) is int for n in node_ids):
+        return np.asarray(node_ids, dtype=np.int64)
+    ids = np.empty(len(node_ids), dtype=object)
+    ids[:] = node_ids
+    return ids
+
+
+def _positions(node_ids, nodes):
+    # Posição de cada id de `nodes` em node_ids (KeyError se algum não existir)
+    if node_ids.dtype.kind in "iu":
+        nodes = np.asarray(nodes, dtype=np.int64)
+        order = np.argsort(node_ids, kind="stable")
+        found = np.searchsorted(node_ids[order], nodes)
+        found = np.minimum(found, max(len(order) - 1, 0))
+        if len(nodes) and (len(order) == 0 or (node_ids[order][found] != nodes).any()):
+            raise KeyError("Aresta com extremo fora da lista de nós.")
+        return order[found].astype(np.int32) if len(order) else np.array([], dtype=np.int32)
+    index = {node: i for i, node in enumerate(node_ids.tolist())}
+    return np.asarray([index[node] for node in list(nodes)], dtype=np.int32)
+
+
+class CompactGraph:
+    """
+    Grafo não direcionado em arrays, para redes grandes (ex.: covotação):
+
+      - nós: ids em node_ids e índices int32; atributos em colunas compactas
+      - arestas: extremos (edge_u, edge_v) int32 e atributos em colunas (o peso em
+        float32 sempre que não houver perda)
+      - adjacência CSR simétrica (indptr, indices int32, edge_index int32 → aresta)
+
+    Converte de/para nx.Graph sem perda de atributos (ver from_networkx /
+    to_networkx); os builders podem montá-lo direto dos arrays (from_arrays).
+    """
+
+    def __init__(self, node_ids, edge_u, edge_v, node_attrs=None, edge_attrs=None, graph_attrs=None):
+        self.node_ids = _id_array(node_ids)
+        self.edge_u = np.asarray(edge_u, dtype=np.int32)
+        self.edge_v = np.asarray(edge_v, dtype=np.int32)
+        self.node_attrs = dict(node_attrs or {})
+        self.edge_attrs = dict(edge_attrs or {})
+        self.graph_attrs = dict(graph_attrs or {})
+        self._index = None
+        self._build_adjacency()
+
+    # ------------------------------------------------------------------ montagem
+
+    @classmethod
+    def from_arrays(cls, node_ids, node_columns=None, u=(), v=(), edge_columns=None, graph_attrs=None):
+        """
+        Monta o grafo a partir de ids de nós, colunas de atributos de nós
+        (nome → lista/array, um valor por nó), extremos das arestas como ids (u, v)
+        e colunas de atributos de arestas (nome → lista/array, um valor por aresta).
+        """
+        node_ids = _id_array(node_ids)
+        positions = _positions(node_ids, u), _positions(node_ids, v)
+        node_attrs = {name: encode_column(values) for name, values in (node_columns or {}).items()}
+        edge_attrs = {name: encode_column(values) for name, values in (edge_columns or {}).items()}
+        return cls(node_ids, *positions, node_attrs, edge_attrs, graph_attrs)
+
+    @classmethod
+    def from_parts(cls, node_ids, node_attrs, edge_attrs, graph_attrs, edge_u, edge_v, indptr, indices, edge_index):
+        """
+        Monta o grafo a partir de colunas já codificadas (encode_column) e da
+        adjacência CSR pronta, sem copiar os arrays (ex.: mapeados do disco).
+        """
+        graph = cls.__new__(cls)
+        graph.node_ids = _id_array(node_ids)
+        graph.edge_u, graph.edge_v = edge_u, edge_v
+        graph.indptr, graph.indices, graph.edge_index = indptr, indices, edge_index
+        graph.node_attrs = dict(node_attrs)
+        graph.edge_attrs = dict(edge_attrs)
+        graph.graph_attrs = dict(graph_attrs or {})
+        graph._index = None
+        return graph
+
+    def relabel(self, node_type):
+        """
+        Cópia rasa com os ids dos nós convertidos por node_type (ex.: str).
+        """
+        return CompactGraph.from_parts(
+            [node_type(n) for n in self.node_ids.tolist()], self.node_attrs, self.edge_attrs,
+            self.graph_attrs, self.edge_u, self.edge_v, self.indptr, self.indices, self.edge_index,
+        )
+
+    @classmethod
+    def from_networkx(cls, G):
+        """
+        Converte um nx.Graph, preservando ids, atributos de grafo, nós e arestas.
+        """
+        nodes = list(G.nodes(data=True))
+        node_names = []
+        for _, data in nodes:
+            for key in data:
+                if key not in node_names:
+                    node_names.append(key)
+        node_columns = {
+            name: [data.get(name, MISSING) for _, data in nodes]
+            for name in node_names
+        }
+
+        edges = list(G.edges(data=True))
+        edge_names = []
+        for _, _, data in edges:
+            for key in data:
+                if key not in edge_names:
+                    edge_names.append(key)
+        edge_columns = {
+            name: [data.get(name, MISSING) for _, _, data in edges]
+            for name in edge_names
+        }
+
+        return cls.from_arrays(
+            [n for n, _ in nodes], node_columns,
+            [a for a, _, _ in edges], [b for _, b, _ in edges], edge_columns,
+            graph_attrs=G.graph,
+        )
+
+    def to_networkx(self):
+        """
+        nx.Graph equivalente (mesmos ids, atributos e tipos de valores).
+        """
+        G = nx.Graph()
+        G.graph.update(self.graph_attrs)
+
+        ids = self.node_ids.tolist()
+        node_values = {name: decode_column(*column) for name, column in self.node_attrs.items()}
+        G.add_nodes_from(
+            (node_id, {name: values[i] for name, values in node_values.items() if values[i] is not MISSING})
+            for i, node_id in enumerate(ids)
+        )
+
+        edge_values = {name: decode_column(*column) for name, column in self.edge_attrs.items()}
+        G.add_edges_from(
+            (ids[a], ids[b], {name: values[k] for name, values in edge_values.items() if values[k] is not MISSING})
+            for k, (a, b) in enumerate(zip(self.edge_u.tolist(), self.edge_v.tolist()))
+        )
+        return G
+
+    def _build_adjacency(self):
+        n = len(self.node_ids)
+        m = len(self.edge_u)
+        edge_ids = np.arange(m, dtype=np.int32)
+        loops = self.edge_u == self.edge_v
+        rows = np.concatenate([self.edge_u, self.edge_v[~loops]])
+        cols = np.concatenate([self.edge_v, self.edge_u[~loops]])
+        ids = np.concatenate([edge_ids, edge_ids[~loops]])
+
+        order = np.lexsort((cols, rows))
+        self.indices = cols[order].astype(np.int32)
+        self.edge_index = ids[order].astype(np.int32)
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=self.indptr[1:])
+
+    # ------------------------------------------------------------------ consultas
+
+    def index_of(self, nodes):
+        """
+        Índice interno de um id, ou array de índices de uma lista/array de ids.
+        """
+        if isinstance(nodes, (list, tuple, np.ndarray)):
+            return _positions(self.node_ids, nodes)
+        if self._index is None:
+            self._index = {node: i for i, node in enumerate(self.node_ids.tolist())}
+        return self._index[nodes]
+
+    def number_of_nodes(self):
+        return len(self.node_ids)
+
+    def number_of_edges(self):
+        return len(self.edge_u)
+
+    def nodes(self):
+        return self.node_ids.tolist()
+
+    def node_attribute(self, name):
+        """
+        Valores de um atributo de nó, na ordem de node_ids (None se ausente).
+        """
+        values = decode_column(*self.node_attrs[name])
+        return [None if v is MISSING else v for v in values]
+
+    def edge_attribute(self, name, default=None):
+        """
+        Array com um atributo de aresta por aresta (default onde ausente).
+        """
+        kind, column, mask = self.edge_attrs[name]
+        values = np.asarray(column.astype(object)) if kind == "str" else column
+        if mask is not None:
+            values = np.where(mask, values, default)
+        return values
+
+    def weights(self, weight="weight"):
+        if weight is None or weight not in self.edge_attrs:
+            return np.ones(self.number_of_edges(), dtype=np.float32)
+        return self.edge_attribute(weight, 1)
+
+    def adjacency(self, weight="weight"):
+        """
+        Matriz de adjacência esparsa simétrica (CSR), na ordem de node_ids.
+        """
+        n = self.number_of_nodes()
+        data = np.asarray(self.weights(weight))[self.edge_index]
+        return sparse.csr_matrix((data, self.indices, self.indptr), shape=(n, n))
+
+    def is_directed(self):
+        return False
+
+    def edges(self, data=False, chunk=100_000):
+        """
+        Percorre as arestas como (u, v) ou, com data=True, (u, v, atributos), como
+        G.edges do networkx; os atributos são decodificados em blocos de chunk.
+        """
+        for start in range(0, self.number_of_edges(), chunk):
+            end = start + chunk
+            u = self.node_ids[self.edge_u[start:end]].tolist()
+            v = self.node_ids[self.edge_v[start:end]].tolist()
+            if not data:
+                yield from zip(u, v)
+                continue
+            columns = {
+                name: decode_column(kind, column[start:end], None if mask is None else mask[start:end])
+                for name, (kind, column, mask) in self.edge_attrs.items()
+            }
+            for k, (a, b) in enumerate(zip(u, v)):
+                yield a, b, {name: values[k] for name, values in columns.items() if values[k] is not MISSING}
+
+    def degree(self, weight=None):
+        """
+        Grau de cada nó (laços contam 2, como no networkx); com weight, a soma dos
+        pesos das arestas incidentes (laços também contam 2).
+        """
+        loops = self.edge_u == self.edge_v
+        if weight is not None:
+            strength = self.strength(weight)
+            loop_weights = np.asarray(self.weights(weight))[loops]
+            extra = np.bincount(self.edge_u[loops], weights=loop_weights, minlength=self.number_of_nodes())
+            return strength + extra.astype(strength.dtype)
+        degree = np.diff(self.indptr)
+        return degree + np.bincount(self.edge_u[loops], minlength=self.number_of_nodes())
+
+    def strength(self, weight="weight"):
+        """
+        Soma dos pesos das arestas incidentes em cada nó (laço conta uma vez, como
+        a soma sobre G.neighbors); mantém inteiros se os pesos forem inteiros.
+        """
+        A = self.adjacency(weight)
+        if A.dtype.kind == "f":
+            A = A.astype(np.float64)
+        return np.asarray(A.sum(axis=1)).ravel()
+
+    def neighbors(self, node):
+        i = self.index_of(node)
+        return self.node_ids[self.indices[self.indptr[i]:self.indptr[i + 1]]].tolist()
+
+    @property
+    def nbytes(self):
+        """
+        Memória aproximada dos arrays do grafo, em bytes.
+        """
+        total = sum(a.nbytes for a in (self.edge_u, self.edge_v, self.indices, self.edge_index, self.indptr))
+        total += self.node_ids.nbytes
+        for kind, column, mask in list(self.node_attrs.values()) + list(self.edge_attrs.values()):
+            if kind == "str":
+                total += column.codes.nbytes
+            else:
+                total += column.nbytes
+            total += mask.nbytes if mask is not None else 0
+        return total
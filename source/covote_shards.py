@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+def shard_path(cache_dir, year, params):
+    """
+    Caminho do shard de covotação de um ano. O nome inclui um digest dos parâmetros
+    de filtro (VotesMiner + votos considerados), para que filtros diferentes não
+    compartilhem cache.
+    """
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(cache_dir, f"covote-{year}-{digest}.npz")
+
+
+def data_signature(df_year, columns):
+    """
+    Assinatura do conteúdo das linhas de um ano. Se o ano for minerado de novo
+    (ex.: ano corrente), a assinatura muda e o shard é recalculado.
+
+    columns = (votação, deputado, voto); os tipos são normalizados (str, int64, str)
+    para que leitura completa e leitura em blocos gerem a mesma assinatura.
+    """
+    col_vote, col_deputy, col_type = columns
+    normalized = pd.DataFrame({
+        col_vote: df_year[col_vote].astype(str).to_numpy(dtype=object),
+        col_deputy: df_year[col_deputy].to_numpy(dtype=np.int64),
+        col_type: df_year[col_type].astype(str).to_numpy(dtype=object),
+    })
+    hashed = pd.util.hash_pandas_object(normalized, index=False)
+    return f"{len(df_year)}-{int(hashed.sum()) & 0xFFFFFFFFFFFFFFFF:016x}"
+
+
+def save_shard(path, deputy_index, pair_counts, signature):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    coo = sparse.triu(pair_counts).tocoo()
+    np.savez_compressed(
+        path,
+        deputy_index=deputy_index,
+        row=coo.row.astype(np.int32),
+        col=coo.col.astype(np.int32),
+        data=coo.data,
+        signature=np.array(signature),
+    )
+
+
+def load_shard(path, signature):
+    """
+    Retorna (deputy_index, pair_counts) ou None se o shard não existir ou estiver
+    desatualizado em relação à assinatura informada.
+    """
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as f:
+        if str(f["signature"]) != signature:
+            return None
+        deputy_index = f["deputy_index"]
+        n = len(deputy_index)
+        pair_counts = sparse.csr_matrix((f["data"], (f["row"], f["col"])), shape=(n, n))
+    return deputy_index, pair_counts
+
+
+def sum_shards(shards):
+    """
+    Soma shards (deputy_index, pair_counts) com universos de deputados diferentes,
+    realinhando todos para a união ordenada dos ids.
+    """
+    deputy_index = np.unique(np.concatenate([idx for idx, _ in shards])) if shards else np.array([], dtype=np.int64)
+    n = len(deputy_index)
+
+    rows, cols, data = [], [], []
+    for idx, counts in shards:
+        coo = counts.tocoo()
+        remap = np.searchsorted(deputy_index, idx)
+        rows.append(remap[coo.row])
+        cols.append(remap[coo.col])
+        data.append(coo.data)
+
+    if not rows:
+        return deputy_index, sparse.csr_matrix((n, n), dtype=np.int64)
+
+    total = sparse.csr_matrix(
+        (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))), shape=(n, n)
+    )
+    total.sum_duplicates()
+    return deputy_index, total
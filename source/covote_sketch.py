@@ -0,0 +1,145 @@
+import numpy as np
+from scipy import sparse
+
+
+# Primo de Mersenne 2^31 - 1: hashes cabem em uint32 e (a·x + b) cabe em uint64
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_MAX_HASH = np.uint32((1 << 31) - 1)
+
+
+class MinHashLSH:
+    """
+    Similaridade aproximada entre linhas de uma incidência esparsa (ex.: deputado ×
+    (votação, voto)) por MinHash, indexada por LSH em bandas.
+
+    Cada linha vira uma assinatura de num_perm mínimos de hashes das suas colunas;
+    a fração de posições iguais entre duas assinaturas estima o Jaccard dos
+    conjuntos de colunas. Para deputados, é o Jaccard dos conjuntos de (votação,
+    voto): votações em que votaram igual / união das participações, o mesmo valor
+    de weighting="jaccard" na rede exata.
+
+    As assinaturas são divididas em `bands` bandas de num_perm / bands posições;
+    pares que coincidem em pelo menos uma banda são candidatos. O limiar
+    aproximado a partir do qual um par tende a ser candidato é
+    (1 / bands) ** (bands / num_perm).
+    """
+
+    def __init__(self, num_perm=128, bands=32, seed=0):
+        if num_perm < 1 or bands < 1 or num_perm % bands != 0:
+            raise ValueError("num_perm deve ser um múltiplo positivo de bands.")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+
+        self.keys = np.array([], dtype=np.int64)
+        self.signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._buckets = np.empty((0, bands), dtype=np.int64)
+
+    @property
+    def threshold(self):
+        return (1.0 / self.bands) ** (1.0 / self.rows_per_band)
+
+    def fit(self, keys, incidence, max_block=1 << 25):
+        """
+        Calcula as assinaturas das linhas de `incidence` (rótulos em `keys`) e
+        indexa as bandas. Os hashes são calculados em blocos de permutações, com
+        no máximo ~max_block valores (nnz × permutações) por bloco.
+        """
+        incidence = sparse.csr_matrix(incidence)
+        incidence.sort_indices()
+        n_rows, n_cols = incidence.shape
+        indptr, indices = incidence.indptr, incidence.indices
+
+        signatures = np.full((n_rows, self.num_perm), _MAX_HASH, dtype=np.uint32)
+        non_empty = np.flatnonzero(np.diff(indptr) > 0)
+        cols = np.arange(n_cols, dtype=np.uint64)
+
+        block = max(1, min(self.num_perm, max_block // max(1, incidence.nnz)))
+        for start in range(0, self.num_perm, block):
+            end = min(start + block, self.num_perm)
+            # hash de cada coluna em cada permutação do bloco: (colunas × bloco)
+            hashes = ((np.outer(cols, self._a[start:end]) + self._b[start:end]) % _MERSENNE_PRIME).astype(np.uint32)
+            if len(non_empty):
+                minima = np.minimum.reduceat(hashes[indices], indptr[non_empty], axis=0)
+                signatures[non_empty, start:end] = minima
+
+        self.keys = np.asarray(keys, dtype=np.int64)
+        self.signatures = signatures
+        self._buckets = np.column_stack([
+            np.unique(self._band(b), axis=0, return_inverse=True)[1].ravel()
+            for b in range(self.bands)
+        ]) if n_rows else np.empty((0, self.bands), dtype=np.int64)
+        # Linhas vazias não têm conjunto para comparar: ficam fora de qualquer bucket
+        self._buckets[np.diff(indptr) == 0] = -1
+        return self
+
+    def _band(self, b):
+        return self.signatures[:, b * self.rows_per_band:(b + 1) * self.rows_per_band]
+
+    def similarity(self, rows, cols):
+        """
+        Jaccard estimado entre pares de linhas (posições em self.keys).
+        """
+        rows = np.asarray(rows)
+        cols = np.asarray(cols)
+        return (self.signatures[rows] == self.signatures[cols]).mean(axis=1)
+
+    def candidate_pairs(self):
+        """
+        Pares (i, j), i < j, que coincidem em pelo menos uma banda.
+        """
+        n = len(self.keys)
+        packed = []
+        for b in range(self.bands):
+            buckets = self._buckets[:, b]
+            order = np.argsort(buckets, kind="stable")
+            order = order[buckets[order] >= 0]
+            sorted_buckets = buckets[order]
+            starts = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+            sizes = np.diff(np.r_[starts, len(order)])
+            for start, size in zip(starts[sizes > 1], sizes[sizes > 1]):
+                members = np.sort(order[start:start + size]).astype(np.int64)
+                i, j = np.triu_indices(size, k=1)
+                packed.append(members[i] * n + members[j])
+
+        if not packed:
+            empty = np.array([], dtype=np.int64)
+            return empty, empty
+        packed = np.unique(np.concatenate(packed))
+        return packed // n, packed % n
+
+    def similarity_graph(self, threshold=None):
+        """
+        Arestas (i, j, Jaccard estimado) entre candidatos com estimativa >= threshold
+        (padrão: o limiar das bandas).
+        """
+        if threshold is None:
+            threshold = self.threshold
+        rows, cols = self.candidate_pairs()
+        sims = self.similarity(rows, cols)
+        keep = sims >= threshold
+        return rows[keep], cols[keep], sims[keep]
+
+    def query(self, key, k=10):
+        """
+        Até k linhas mais parecidas com `key` entre os candidatos do LSH, como
+        lista de (key, Jaccard estimado) em ordem decrescente.
+        """
+        position = np.flatnonzero(self.keys == key)
+        if len(position) == 0:
+            raise KeyError(f"{key} não está no índice.")
+        i = position[0]
+
+        own = self._buckets[i]
+        if (own < 0).all():
+            return []
+        candidates = np.flatnonzero((self._buckets == own).any(axis=1))
+        candidates = candidates[candidates != i]
+
+        sims = self.similarity(np.full(len(candidates), i), candidates)
+        order = np.argsort(-sims, kind="stable")[:k]
+        return list(zip(self.keys[candidates[order]].tolist(), sims[order].tolist()))
@@ -0,0 +1,276 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .bipartite import column_scale, encode_incidence, project
+
+
+class NonContiguousVotes(ValueError):
+    """
+    Votação que reaparece no arquivo depois de projetada por CovoteProjection.
+    """
+
+
+class CovoteAccumulator:
+    """
+    Acumula votos nominais em códigos compactos, alimentado bloco a bloco:
+      - deputado: int32 (id do deputado)
+      - votação: int32 (código sequencial de idVotacao)
+      - voto: int8 (posição em vote_types)
+      - ano: int16 (ano_votacao, se informado)
+      - data: datetime64 por votação (menor data vista, se informada)
+
+    Cerca de 11 bytes por voto, contra centenas de bytes por linha de um
+    DataFrame com colunas object. A incidência deputado × (votação, voto) só é
+    montada no final (incidence), o que dá o mesmo resultado de encode_incidence
+    independentemente da ordem das linhas no arquivo.
+
+    Só os tipos encolhem: a memória ainda cresce com o total de votos do arquivo.
+    É o caminho de agreement, cache_dir, build_windows e build_approximate, que
+    precisam dos votos individuais; a rede de build_network usa CovoteProjection,
+    limitada pelo bloco e pelo número de pares.
+    """
+
+    def __init__(self, vote_types):
+        self.vote_types = list(vote_types)
+        self._vote_codes = {}
+        self._vote_labels = []
+        self._vote_dates = np.array([], dtype="datetime64[s]")
+        self._deputies = []
+        self._votes = []
+        self._types = []
+        self._years = []
+
+    def __len__(self):
+        return sum(len(d) for d in self._deputies)
+
+    def add(self, deputy_ids, vote_ids, vote_types, years=None, dates=None):
+        """
+        Adiciona um bloco de votos. Votos fora de vote_types são ignorados.
+        """
+        type_codes = pd.Categorical(vote_types, categories=self.vote_types).codes.astype(np.int8)
+        mask = type_codes >= 0
+
+        vote_ids = pd.Series(np.asarray(vote_ids)[mask]).astype(str)
+        for vote_id in vote_ids.unique():
+            if vote_id not in self._vote_codes:
+                self._vote_codes[vote_id] = len(self._vote_labels)
+                self._vote_labels.append(vote_id)
+
+        self._deputies.append(np.asarray(deputy_ids)[mask].astype(np.int32))
+        self._votes.append(vote_ids.map(self._vote_codes).to_numpy(dtype=np.int32))
+        self._types.append(type_codes[mask])
+        self._add_dates(self._votes[-1], None if dates is None else np.asarray(dates)[mask])
+        if years is None:
+            self._years.append(np.zeros(mask.sum(), dtype=np.int16))
+        else:
+            self._years.append(np.asarray(years)[mask].astype(np.int16))
+
+    def finish(self):
+        pass
+
+    def _add_dates(self, vote_codes, dates):
+        known = len(self._vote_dates)
+        if len(self._vote_labels) > known:
+            self._vote_dates = np.concatenate([
+                self._vote_dates,
+                np.full(len(self._vote_labels) - known, np.datetime64("NaT"), dtype="datetime64[s]"),
+            ])
+        if dates is None or len(vote_codes) == 0:
+            return
+
+        dates = pd.Series(pd.to_datetime(dates, errors="coerce").to_numpy(dtype="datetime64[s]"))
+        first = dates.groupby(vote_codes).min()
+        codes = first.index.to_numpy()
+        current = self._vote_dates[codes]
+        new = first.to_numpy(dtype="datetime64[s]")
+        self._vote_dates[codes] = np.where(np.isnat(current) | (new < current), new, current)
+
+    def vote_dates(self, vote_codes):
+        """
+        Data (menor dataHoraVoto vista) de cada votação, pelos códigos de incidence.
+        """
+        return self._vote_dates[np.asarray(vote_codes)]
+
+    def vote_years(self, vote_codes):
+        """
+        Ano (ano_votacao) de cada votação, pelos códigos de incidence.
+        """
+        votes = np.concatenate(self._votes)
+        years = np.concatenate(self._years)
+        by_vote = np.zeros(len(self._vote_labels), dtype=np.int16)
+        by_vote[votes] = years
+        return by_vote[np.asarray(vote_codes)]
+
+    def _arrays(self, year=None):
+        deputies = np.concatenate(self._deputies) if self._deputies else np.array([], dtype=np.int32)
+        votes = np.concatenate(self._votes) if self._votes else np.array([], dtype=np.int32)
+        types = np.concatenate(self._types) if self._types else np.array([], dtype=np.int8)
+        if year is not None:
+            mask = np.concatenate(self._years) == year
+            deputies, votes, types = deputies[mask], votes[mask], types[mask]
+        return deputies, votes, types
+
+    def years(self):
+        if not self._years:
+            return []
+        return sorted(int(y) for y in np.unique(np.concatenate(self._years)))
+
+    def incidence(self, year=None, dedupe=False):
+        """
+        Retorna (deputy_index, col_votes, B), como encode_incidence:
+          - deputy_index: ids de deputado ordenados (linhas de B)
+          - col_votes: código da votação de cada coluna de B
+          - B: incidência deputado × (votação, voto), int32
+
+        dedupe=True conta uma vez só o mesmo deputado repetido na mesma votação.
+        """
+        deputies, votes, types = self._arrays(year)
+        if dedupe:
+            _, first = np.unique(
+                (votes.astype(np.int64) << 32) | deputies.astype(np.int64),
+                return_index=True,
+            )
+            first.sort()
+            deputies, votes, types = deputies[first], votes[first], types[first]
+
+        deputy_index = np.unique(deputies).astype(np.int64)
+        rows = np.searchsorted(deputy_index, deputies)
+
+        keys = votes.astype(np.int64) * len(self.vote_types) + types
+        col_keys, cols = np.unique(keys, return_inverse=True)
+        col_votes = col_keys // len(self.vote_types)
+
+        B = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols.ravel())),
+            shape=(len(deputy_index), len(col_keys)),
+        )
+        B.sum_duplicates()
+        return deputy_index, col_votes, B
+
+    def frame(self, year=None, columns=("idVotacao", "deputado_id", "voto")):
+        """
+        Reconstrói as colunas (idVotacao, deputado_id, voto) dos votos acumulados,
+        com os mesmos tipos do DataFrame lido via pd.read_csv (str, int64, str).
+        """
+        deputies, votes, types = self._arrays(year)
+        col_vote, col_deputy, col_type = columns
+        return pd.DataFrame({
+            col_vote: np.asarray(self._vote_labels, dtype=object)[votes],
+            col_deputy: deputies.astype(np.int64),
+            col_type: np.asarray(self.vote_types, dtype=object)[types],
+        })
+
+
+class CovoteProjection:
+    """
+    Soma de covotação B·Bᵀ acumulada bloco a bloco, sem guardar os votos:
+    cada votação completa é projetada e somada a uma matriz esparsa deputado ×
+    deputado. Só as linhas da última votação do bloco (que pode continuar no
+    bloco seguinte) ficam pendentes.
+
+    A memória fica limitada pelo bloco e pelos pares com covotação, mas as
+    linhas de cada votação precisam estar contíguas no arquivo (como gravado
+    pelo VotesMiner); uma votação que reaparece depois de projetada gera
+    NonContiguousVotes.
+
+    weighting: "count", "newman", "hyperbolic" ou "jaccard" (ver
+    weighted_projection); result() devolve o mesmo que _pair_counts sobre a
+    incidência completa.
+    """
+
+    def __init__(self, vote_types, weighting="count"):
+        self.vote_types = list(vote_types)
+        self.weighting = weighting
+        self._deputy_ids = pd.Index([], dtype=np.int64)
+        self._done = set()
+        self._pending = None
+        self._total = None
+        self._row_sums = np.zeros(0, dtype=np.int64)
+        self._n_votes = 0
+
+    def __len__(self):
+        return self._n_votes
+
+    def add(self, deputy_ids, vote_ids, vote_types, years=None, dates=None):
+        """
+        Adiciona um bloco de votos (years e dates são ignorados). Votos fora de
+        vote_types são ignorados.
+        """
+        vote_types = np.asarray(vote_types)
+        mask = pd.Series(vote_types).isin(self.vote_types).to_numpy()
+        block = pd.DataFrame({
+            "deputy": np.asarray(deputy_ids)[mask].astype(np.int64),
+            "vote": pd.Series(np.asarray(vote_ids)[mask]).astype(str).to_numpy(),
+            "type": vote_types[mask],
+        })
+        self._n_votes += len(block)
+        if self._pending is not None:
+            block = pd.concat([self._pending, block], ignore_index=True)
+        if len(block) == 0:
+            return
+
+        last = block["vote"].iat[-1]
+        tail = block["vote"].to_numpy() == last
+        self._pending = block[tail]
+        self._project(block[~tail])
+
+    def finish(self):
+        """
+        Projeta a última votação pendente.
+        """
+        if self._pending is not None:
+            self._project(self._pending)
+            self._pending = None
+
+    def _project(self, block):
+        if len(block) == 0:
+            return
+        votes = block["vote"].unique()
+        if self._done.intersection(votes):
+            raise NonContiguousVotes("Votações não contíguas em votes_detail_info.csv.")
+        self._done.update(votes)
+
+        new_ids = pd.Index(block["deputy"].unique()).difference(self._deputy_ids)
+        self._deputy_ids = self._deputy_ids.append(new_ids)
+        n = len(self._deputy_ids)
+        rows = self._deputy_ids.get_indexer(block["deputy"])
+
+        _, _, B = encode_incidence(rows, [block["vote"], block["type"]], row_index=np.arange(n))
+        if self.weighting in ("newman", "hyperbolic"):
+            C = project(B, column_scale(B, self.weighting))
+        else:
+            C = project(B).astype(np.int64)
+
+        self._row_sums = np.pad(self._row_sums, (0, n - len(self._row_sums)))
+        self._row_sums += np.asarray(B.sum(axis=1)).ravel()
+        if self._total is None:
+            self._total = C
+        else:
+            self._total.resize((n, n))
+            self._total = self._total + C
+
+    def result(self):
+        """
+        Retorna (deputy_index, K), como _covote_pairs: deputy_index ordenado e K
+        triangular superior (com laços de linhas repetidas em "count").
+        """
+        self.finish()
+        order = np.argsort(self._deputy_ids.to_numpy(), kind="stable")
+        deputy_index = self._deputy_ids.to_numpy()[order]
+        n = len(deputy_index)
+        if self._total is None:
+            return deputy_index, sparse.csr_matrix((n, n), dtype=np.int32)
+        C = self._total[order][:, order].tocsr()
+
+        if self.weighting == "count":
+            C = C.astype(np.int32)
+            loops = (C.diagonal() - self._row_sums[order].astype(np.int32)) // 2
+            return deputy_index, (sparse.triu(C, k=1) + sparse.diags(loops, dtype=loops.dtype)).tocsr()
+        if self.weighting == "jaccard":
+            C = C.tocoo()
+            diagonal = C.diagonal()
+            union = diagonal[C.row] + diagonal[C.col] - C.data
+            data = np.divide(C.data, union, out=np.zeros_like(C.data, dtype=np.float64), where=union > 0)
+            C = sparse.csr_matrix((data, (C.row, C.col)), shape=C.shape)
+        return deputy_index, sparse.triu(C, k=1).tocsr()
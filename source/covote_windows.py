@@ -0,0 +1,89 @@
+import os
+
+import numpy as np
+from scipy import sparse
+
+
+def sliding_sums(period_matrices, window, step=1):
+    """
+    Gera (início, fim, matriz) para janelas de `window` períodos consecutivos,
+    avançando `step` períodos por vez. Só janelas completas são emitidas.
+
+    Com matrizes inteiras (contagens), a primeira janela é somada do zero e as
+    seguintes são obtidas da anterior somando os períodos que entram e
+    subtraindo os que saem. Com pesos float (newman, hyperbolic), a subtração
+    deixaria resíduos de arredondamento (±1e-17) como arestas fantasmas, então
+    cada janela é somada diretamente dos seus períodos.
+    """
+    n = len(period_matrices)
+    if window < 1 or step < 1:
+        raise ValueError("window e step devem ser >= 1.")
+    if window > n:
+        return
+
+    incremental = all(m.dtype.kind in "iub" for m in period_matrices)
+    current = None
+    previous_start = None
+    for start in range(0, n - window + 1, step):
+        end = start + window
+        if not incremental or current is None or start >= previous_start + window:
+            # Sem sobreposição com a janela anterior (ou pesos float): soma do zero
+            current = period_matrices[start].tocsr()
+            for p in range(start + 1, end):
+                current = current + period_matrices[p]
+        else:
+            previous_end = previous_start + window
+            for p in range(previous_start, start):
+                current = current - period_matrices[p]
+            for p in range(previous_end, end):
+                current = current + period_matrices[p]
+            current.eliminate_zeros()
+        previous_start = start
+        yield start, end, current
+
+
+def save_windows(path, deputy_index, labels, matrices):
+    """
+    Salva uma série de snapshots (matrizes triangulares superiores sobre o mesmo
+    deputy_index) em um único .npz: as entradas de todas as janelas ficam
+    concatenadas, com offsets por janela. O tipo dos pesos é preservado.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    rows, cols, data, offsets = [], [], [], [0]
+    for matrix in matrices:
+        coo = sparse.triu(matrix).tocoo()
+        rows.append(coo.row.astype(np.int32))
+        cols.append(coo.col.astype(np.int32))
+        data.append(coo.data)
+        offsets.append(offsets[-1] + coo.nnz)
+
+    empty = np.array([], dtype=np.int32)
+    np.savez_compressed(
+        path,
+        deputy_index=np.asarray(deputy_index, dtype=np.int64),
+        labels=np.asarray(labels, dtype=str),
+        offsets=np.asarray(offsets, dtype=np.int64),
+        row=np.concatenate(rows) if rows else empty,
+        col=np.concatenate(cols) if cols else empty,
+        data=np.concatenate(data) if data else empty,
+    )
+
+
+def load_windows(path):
+    """
+    Lê uma série salva por save_windows. Retorna (deputy_index, labels, matrices),
+    com uma matriz CSR triangular superior por janela.
+    """
+    with np.load(path) as f:
+        deputy_index = f["deputy_index"]
+        labels = f["labels"].tolist()
+        offsets = f["offsets"]
+        row, col, data = f["row"], f["col"], f["data"]
+
+    n = len(deputy_index)
+    matrices = [
+        sparse.csr_matrix((data[a:b], (row[a:b], col[a:b])), shape=(n, n))
+        for a, b in zip(offsets[:-1], offsets[1:])
+    ]
+    return deputy_index, labels, matrices
@@ -1,65 +1,344 @@
+import hashlib
+import json
+import os
+from collections.abc import Mapping
+
 import pandas as pd
 import numpy as np
 
 
-def getDeputies():
-    df_deputies = pd.read_csv("../data/deputies_info.csv", sep=',')
-    df_deputies.set_index('index', inplace=True)
-    return df_deputies.to_dict('index')
-    
+# Cache colunar das tabelas lidas dos CSVs (ver readCachedCSV). Desligue com
+# TABLE_CACHE = False ou com a variável de ambiente CONGRESS_TABLE_CACHE=0.
+TABLE_CACHE = os.environ.get("CONGRESS_TABLE_CACHE", "1") != "0"
+
+# Incrementar quando a normalização de alguma tabela mudar, para invalidar os caches
+TABLE_CACHE_VERSION = 3
+
+# Tipos fixos por tabela (ver pinDtypes). Colunas numéricas voltam do Parquet
+# com o mesmo dtype; as de texto (listadas ou não numéricas) são normalizadas
+DEPUTIES_DTYPES = {c: 'text' for c in ('name', 'party', 'uf', 'sex', 'education', 'birthdate')}
+PROPOSALS_DTYPES = {'siglaTipo': 'text'}
+AUTHORS_DTYPES = {}
+PARTIES_DTYPES = {c: 'text' for c in ('name', 'initials', 'leader_name')}
+ROLES_DTYPES = {'role_name': 'text', 'role_place_name': 'text'}
+TSE_DTYPES = {'DS_GRAU_INSTRUCAO': 'text', 'DS_COR_RACA': 'text'}
+
+
+def pinDtypes(df, dtypes):
+    '''
+    Fixa os tipos das colunas, para que a leitura do CSV e a do cache (Parquet)
+    devolvam a mesma tabela: as colunas de dtypes são convertidas (números via
+    pd.to_numeric; 'text' como abaixo) e as demais colunas não numéricas viram
+    texto: object, com str nos valores e NaN nos ausentes (o Parquet devolveria
+    None ou o tipo str do pandas).
+    '''
+    for column in df.columns:
+        dtype = dtypes.get(column)
+        if dtype is None and not pd.api.types.is_numeric_dtype(df[column]):
+            dtype = 'text'
+        if dtype == 'text':
+            values = df[column].astype(object)
+            present = values.notna()
+            values[present] = values[present].astype(str)
+            df[column] = values.where(present, np.nan).astype(object)
+        elif dtype is not None:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype(dtype)
+    return df
+
+
+def fileDigest(path, block_size=1 << 20):
+    '''
+    sha1 do conteúdo de um arquivo, lido em blocos
+    '''
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cachePath(csv_path, name):
+    '''
+    Caminho do cache de uma tabela: <pasta do CSV>/.cache/<arquivo>.<name>.parquet
+    '''
+    folder, filename = os.path.split(csv_path)
+    return os.path.join(folder, ".cache", f"{filename}.{name}.parquet")
 
-def getInfoTSE():
+
+def readCachedCSV(csv_path, name, parse, dtypes=None):
+    '''
+    Lê a tabela de csv_path com parse(csv_path) (DataFrame já com tipos
+    normalizados), guardando o resultado em Parquet ao lado do CSV (ver cachePath).
+    Com dtypes, a tabela lida do cache passa por pinDtypes(dtypes), como parse
+    deve fazer, e fica igual à recém-lida.
+
+    O cache vale enquanto o CSV não mudar: se mtime e tamanho forem os mesmos da
+    gravação, é lido direto; se só o mtime mudou (arquivo copiado ou regravado
+    igual), o sha1 do conteúdo decide. Sem pyarrow, ou se a tabela não puder ser
+    gravada em Parquet, apenas chama parse.
+    '''
+    if not TABLE_CACHE:
+        return parse(csv_path)
+
+    path = cachePath(csv_path, name)
+    meta_path = path + ".json"
+    stat = os.stat(csv_path)
+    meta = {"version": TABLE_CACHE_VERSION, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    cached = None
     try:
-        tse_info = pd.read_csv("../data/candidates_tse_info.csv", sep=',', encoding='utf-8')
-    except FileNotFoundError:
-        print("Aviso: candidates_tse_info.csv não encontrado; prosseguindo sem atributos TSE.")
-        return {}
+        with open(meta_path, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    if cached is not None and os.path.exists(path) and cached.get("version") == meta["version"]:
+        same_file = cached.get("mtime_ns") == meta["mtime_ns"] and cached.get("size") == meta["size"]
+        if not same_file and cached.get("size") == meta["size"]:
+            meta["sha1"] = fileDigest(csv_path)
+            same_file = cached.get("sha1") == meta["sha1"]
+            if same_file:
+                _writeCacheMeta(meta_path, dict(cached, mtime_ns=meta["mtime_ns"]))
+        if same_file:
+            try:
+                df = pd.read_parquet(path)
+                return df if dtypes is None else pinDtypes(df, dtypes)
+            except ImportError:
+                return parse(csv_path)
+            except Exception as e:
+                print(f"Aviso: cache ilegível ({path}): {e}; relendo {csv_path}")
+
+    df = parse(csv_path)
+    meta.setdefault("sha1", fileDigest(csv_path))
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        df.to_parquet(path)
+        _writeCacheMeta(meta_path, meta)
+    except ImportError:
+        pass
+    except Exception as e:
+        print(f"Aviso: não foi possível gravar o cache de {csv_path}: {e}")
+    return df
+
 
+def _writeCacheMeta(meta_path, meta):
+    try:
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+    except OSError:
+        pass
+
+
+def _parseDeputies(path):
+    df_deputies = pinDtypes(pd.read_csv(path, sep=','), DEPUTIES_DTYPES)
+    df_deputies.set_index('index', inplace=True)
+    return df_deputies
+
+
+def readDeputiesTable(data_dir="../data"):
+    return readCachedCSV(os.path.join(data_dir, "deputies_info.csv"), "deputies", _parseDeputies, DEPUTIES_DTYPES)
+
+
+def getDeputies(data_dir="../data"):
+    return readDeputiesTable(data_dir).to_dict('index')
+
+
+def _parseInfoTSE(path):
+    tse_info = pinDtypes(pd.read_csv(path, sep=',', encoding='utf-8'), TSE_DTYPES)
     tse_info['NR_CPF_CANDIDATO'] = tse_info['NR_CPF_CANDIDATO'].fillna(0.0).astype(int)
+    # Candidato em mais de uma eleição: fica o último registro (to_dict('index')
+    # exige CPFs únicos)
+    tse_info = tse_info.drop_duplicates('NR_CPF_CANDIDATO', keep='last')
     tse_info.set_index('NR_CPF_CANDIDATO', inplace=True)
+    return tse_info
+
+
+# Colunas do TSE usadas nos atributos dos deputados (ver build_deputy_table)
+TSE_COLUMNS = ('DS_GRAU_INSTRUCAO', 'DS_COR_RACA')
+
+
+def getInfoTSE(data_dir="../data", cpfs=None, columns=TSE_COLUMNS, chunksize=200_000):
+    '''
+    Informações dos candidatos do TSE, indexadas pelo CPF.
+
+    Com cpfs, lê só NR_CPF_CANDIDATO e `columns`, em blocos de chunksize linhas,
+    mantendo apenas os candidatos desses CPFs; o resultado, pequeno, fica em cache ao lado do CSV
+    enquanto o arquivo e o conjunto de CPFs não mudarem (só o do último
+    conjunto é mantido). Sem cpfs, carrega a tabela inteira.
+
+    Nos dois casos, um CPF repetido no arquivo fica com o seu último registro.
+    '''
+    path = os.path.join(data_dir, "candidates_tse_info.csv")
+    if not os.path.exists(path):
+        print("Aviso: candidates_tse_info.csv não encontrado; prosseguindo sem atributos TSE.")
+        return {}
+    if cpfs is None:
+        return readCachedCSV(path, "tse", _parseInfoTSE, TSE_DTYPES).to_dict('index')
+
+    cpfs = sorted({int(c) for c in cpfs})
+    key = hashlib.sha1(json.dumps([cpfs, list(columns)]).encode("utf-8")).hexdigest()[:16]
+
+    def parse(csv_path):
+        return _parseInfoTSEForCPFs(csv_path, cpfs, columns, chunksize)
+
+    tse_info = readCachedCSV(path, f"tse-{key}", parse, TSE_DTYPES)
+    _pruneCaches(path, "tse-", keep=f"tse-{key}")
     return tse_info.to_dict('index')
 
 
-def getAuthors():
+def _pruneCaches(csv_path, prefix, keep):
+    '''
+    Remove os caches de csv_path com nome começando por prefix, exceto keep
+    (ex.: filtros de CPF de conjuntos de deputados anteriores)
+    '''
+    folder = os.path.dirname(cachePath(csv_path, keep))
+    start = os.path.basename(cachePath(csv_path, prefix))[:-len(".parquet")]
+    kept = os.path.basename(cachePath(csv_path, keep))
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return
+    for name in names:
+        if name.startswith(start) and name not in (kept, kept + ".json"):
+            try:
+                os.remove(os.path.join(folder, name))
+            except OSError:
+                pass
+
+
+def _parseInfoTSEForCPFs(path, cpfs, columns, chunksize):
+    header = pd.read_csv(path, sep=',', encoding='utf-8', nrows=0).columns
+    usecols = ['NR_CPF_CANDIDATO'] + [c for c in columns if c in header]
+    wanted = pd.Index(cpfs, dtype=np.int64)
+
+    chunks = []
+    for chunk in pd.read_csv(path, sep=',', encoding='utf-8', usecols=usecols, chunksize=chunksize):
+        cpf = chunk['NR_CPF_CANDIDATO'].fillna(0.0).astype(np.int64)
+        chunks.append(chunk.assign(NR_CPF_CANDIDATO=cpf)[cpf.isin(wanted)])
+
+    tse_info = pd.concat(chunks) if chunks else pd.DataFrame(columns=usecols)
+    tse_info = pinDtypes(tse_info.drop_duplicates('NR_CPF_CANDIDATO', keep='last'), TSE_DTYPES)
+    return tse_info.set_index('NR_CPF_CANDIDATO')[usecols[1:]]
+
+
+def getDeputiesCPFs(deputies):
+    '''
+    CPFs (int) dos deputados de getDeputies(), ignorando os ausentes
+    '''
+    cpfs = pd.to_numeric(pd.Series([d.get('cpf') for d in deputies.values()], dtype=object), errors='coerce')
+    return cpfs.dropna().astype(np.int64).tolist()
+
+
+def _parseAuthors(path):
+    return pinDtypes(pd.read_csv(path, sep=','), AUTHORS_DTYPES)
+
+
+def readAuthorsTable(data_dir="../data"):
+    return readCachedCSV(os.path.join(data_dir, "authors_info.csv"), "authors", _parseAuthors, AUTHORS_DTYPES)
+
+
+class ProposalAuthors(Mapping):
     """
-    Retorna um dicionário em que as chaves são as proposições de lei e os valores são os ids
-    dos deputados autores dessas proposições.
+    Autores por proposição em formato CSR:
+      - proposal_ids: ids das proposições, ordenados (int64)
+      - indptr: autores de proposal_ids[i] em authors[indptr[i]:indptr[i + 1]]
+      - authors: ids dos deputados autores (int32), na ordem do arquivo
+
+    Funciona como o dicionário antigo de getAuthors (proposição → lista de autores)
+    para quem usa keys(), items(), [] ou in.
     """
-    df_authors = pd.read_csv("../data/authors_info.csv", sep=',')
-    proposal_authors_dict = {}
+    def __init__(self, proposal_ids, indptr, authors):
+        self.proposal_ids = np.asarray(proposal_ids, dtype=np.int64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.authors = np.asarray(authors, dtype=np.int32)
+
+    def _position(self, proposal_id):
+        try:
+            proposal_id = int(proposal_id)
+        except (TypeError, ValueError):
+            return -1
+        i = int(np.searchsorted(self.proposal_ids, proposal_id))
+        if i < len(self.proposal_ids) and self.proposal_ids[i] == proposal_id:
+            return i
+        return -1
+
+    def __getitem__(self, proposal_id):
+        i = self._position(proposal_id)
+        if i < 0:
+            raise KeyError(proposal_id)
+        return self.authors[self.indptr[i]:self.indptr[i + 1]].tolist()
+
+    def __contains__(self, proposal_id):
+        return self._position(proposal_id) >= 0
+
+    def __iter__(self):
+        return iter(self.proposal_ids.tolist())
+
+    def __len__(self):
+        return len(self.proposal_ids)
 
-    for index, row in df_authors.iterrows():
-        if(int(row['codTipoAutor']) == 10000):
-            proposal_id = int(row['idProposicao'])
-            if(row['idProposicao'] in proposal_authors_dict):
-                proposal_authors_dict[proposal_id].append(row['idAutor'])
-            else:
-                proposal_authors_dict[proposal_id] = [row['idAutor']]
-    return proposal_authors_dict
+    def counts(self):
+        """
+        Número de autores de cada proposição, na ordem de proposal_ids
+        """
+        return np.diff(self.indptr)
 
 
-def getParties():
+def getAuthors(data_dir="../data"):
     """
-    Retorna dicionário de partidos políticos, bem como informações sobre seu número de membros
+    Retorna os autores deputados (codTipoAutor 10000) de cada proposição de lei, sem
+    repetições, como ProposalAuthors (proposição → lista de ids dos autores).
     """
-    df_parties = pd.read_csv("../data/parties_info.csv", sep=',')
+    df_authors = readAuthorsTable(data_dir)
+    deputies = pd.to_numeric(df_authors['codTipoAutor'], errors='coerce') == 10000
+    authors = pd.DataFrame({
+        'proposal': pd.to_numeric(df_authors.loc[deputies, 'idProposicao'], errors='coerce'),
+        'author': pd.to_numeric(df_authors.loc[deputies, 'idAutor'], errors='coerce'),
+    }).dropna()
+    authors = authors[~authors.duplicated()]
+
+    proposal = authors['proposal'].to_numpy(dtype=np.int64)
+    author = authors['author'].to_numpy(dtype=np.int64)
+    order = np.argsort(proposal, kind='stable')
+    proposal_ids, starts = np.unique(proposal[order], return_index=True)
+    indptr = np.append(starts, len(order))
+    return ProposalAuthors(proposal_ids, indptr, author[order])
+
+
+def _parseParties(path):
+    df_parties = pinDtypes(pd.read_csv(path, sep=','), PARTIES_DTYPES)
     df_parties.set_index('index', inplace=True)
-    return df_parties.to_dict('index')
+    return df_parties
+
 
+def readPartiesTable(data_dir="../data"):
+    return readCachedCSV(os.path.join(data_dir, "parties_info.csv"), "parties", _parseParties, PARTIES_DTYPES)
 
-def getRoles():
+
+def getParties(data_dir="../data"):
     """
-    Retorna já ocupados por um deputado na câmara.
+    Retorna dicionário de partidos políticos, bem como informações sobre seu número de membros
     """
-    df_roles = pd.read_csv("../data/roles_info.csv", sep=',')
+    return readPartiesTable(data_dir).to_dict('index')
+
+
+def _parseRoles(path):
+    df_roles = pinDtypes(pd.read_csv(path, sep=','), ROLES_DTYPES)
     df_roles.set_index('deputy_id', inplace=True)
     df_roles.drop_duplicates()
     return df_roles
 
 
-def getProposals():
+def getRoles(data_dir="../data"):
+    """
+    Retorna já ocupados por um deputado na câmara.
+    """
+    return readCachedCSV(os.path.join(data_dir, "roles_info.csv"), "roles", _parseRoles, ROLES_DTYPES)
+
+
+def _parseProposals(path):
     # lê o CSV garantindo UTF-8
-    df_proposals = pd.read_csv('../data/proposals_info.csv', encoding='utf-8')
+    df_proposals = pd.read_csv(path, encoding='utf-8')
 
     # tira espaços/brancos dos nomes de coluna (e lida com BOM)
     df_proposals.columns = df_proposals.columns.str.strip()
@@ -73,5 +352,12 @@ def getProposals():
         index_col = df_proposals.columns[0]
         print("Aviso: coluna 'id' não encontrada, usando", index_col, "como índice em getProposals()")
 
-    proposals_dict = df_proposals.set_index(index_col).to_dict('index')
-    return proposals_dict
\ No newline at end of file
+    return pinDtypes(df_proposals, PROPOSALS_DTYPES).set_index(index_col)
+
+
+def readProposalsTable(data_dir="../data"):
+    return readCachedCSV(os.path.join(data_dir, "proposals_info.csv"), "proposals", _parseProposals, PROPOSALS_DTYPES)
+
+
+def getProposals(data_dir="../data"):
+    return readProposalsTable(data_dir).to_dict('index')
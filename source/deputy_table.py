@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+from .utils import calculateAges, getAgeRanges, getUfRegions
+
+
+DEPUTY_COLUMNS = ["label", "party", "uf", "region", "sex", "education", "cpf",
+                  "age", "age_range", "education_tse", "ethnicity"]
+
+# Colunas de votes_detail_info.csv usadas para deputados fora de deputies_info.csv
+VOTES_INFO_COLUMNS = {
+    "deputado_nome": "label",
+    "deputado_siglaPartido": "party",
+    "deputado_siglaUf": "uf",
+}
+
+
+def build_deputy_table(deputies, deputy_ids=None, tse_info=None, df_votes=None,
+                       deputy_col="deputado_id"):
+    """
+    Tabela colunar de atributos de deputados, indexada pelo id (int), com as colunas
+    de DEPUTY_COLUMNS e in_deputies_info (bool). Valores ausentes ficam NaN/<NA>;
+    cada builder aplica sua própria convenção ('' ou None) ao criar os nós.
+
+    :param deputies: dicionário de getDeputies()
+    :param deputy_ids: universo de ids; se None, ids de deputies + ids de df_votes
+    :param tse_info: dicionário de getInfoTSE() (chave = CPF), opcional
+    :param df_votes: votos (votes_detail_info.csv), usados como fallback de nome,
+                     partido e UF de deputados fora de deputies_info.csv
+    """
+    info = pd.DataFrame.from_dict(deputies, orient="index")
+    info.index = info.index.astype(np.int64)
+    info = info.rename(columns={"name": "label"})
+
+    fallback = None
+    if df_votes is not None and len(df_votes) > 0:
+        cols = [c for c in VOTES_INFO_COLUMNS if c in df_votes.columns]
+        fallback = (
+            df_votes.groupby(deputy_col, sort=False)[cols].first()
+            if cols else pd.DataFrame(index=pd.Index(df_votes[deputy_col].unique()))
+        ).rename(columns=VOTES_INFO_COLUMNS)
+        fallback.index = fallback.index.astype(np.int64)
+
+    if deputy_ids is None:
+        ids = info.index
+        if fallback is not None:
+            ids = ids.union(fallback.index)
+        deputy_ids = ids
+    deputy_ids = pd.Index(sorted(int(d) for d in deputy_ids), dtype=np.int64)
+
+    table = info.reindex(deputy_ids)
+    table["in_deputies_info"] = deputy_ids.isin(info.index)
+    for col in ["label", "party", "uf", "sex", "education", "cpf", "birthdate", "region"]:
+        if col not in table.columns:
+            table[col] = np.nan
+
+    outside = ~table["in_deputies_info"]
+    if fallback is not None:
+        extra = fallback.reindex(deputy_ids[outside])
+        for col in extra.columns:
+            table.loc[outside, col] = extra[col].to_numpy()
+    table.loc[outside & table["label"].isna(), "label"] = (
+        deputy_ids[outside & table["label"].isna()].astype(str)
+    )
+
+    table["region"] = table["region"].where(table["region"].notna(), getUfRegions(table["uf"]).to_numpy())
+
+    table["age"] = calculateAges(table["birthdate"].where(table["in_deputies_info"])).set_axis(table.index)
+    table["age_range"] = getAgeRanges(table["age"]).set_axis(table.index)
+
+    table["education_tse"] = np.nan
+    table["ethnicity"] = np.nan
+    if tse_info:
+        tse = pd.DataFrame.from_dict(tse_info, orient="index")
+        cpfs = pd.to_numeric(table["cpf"], errors="coerce").astype("Int64")
+        for src, dst in [("DS_GRAU_INSTRUCAO", "education_tse"), ("DS_COR_RACA", "ethnicity")]:
+            if src in tse.columns:
+                table[dst] = cpfs.map(tse[src]).to_numpy()
+
+    return table[DEPUTY_COLUMNS + ["in_deputies_info"]]
+
+
+def node_columns(table, columns, missing=""):
+    """
+    Colunas da tabela como listas com tipos nativos do Python e `missing` no lugar
+    de valores ausentes: retorna (ids, {coluna: valores}), na ordem da tabela.
+
+    missing pode ser um valor único ou um dicionário coluna → valor.
+    """
+    data = {}
+    for col in columns:
+        fill = missing.get(col, "") if isinstance(missing, dict) else missing
+        values = table[col].astype(object)
+        data[col] = values.where(values.notna(), fill).tolist()
+    return table.index.tolist(), data
+
+
+def node_records(table, columns, missing=""):
+    """
+    Converte colunas da tabela em (id, atributos) prontos para G.add_nodes_from
+    (ver node_columns).
+    """
+    ids, data = node_columns(table, columns, missing)
+    return [
+        (deputy_id, {col: data[col][i] for col in columns})
+        for i, deputy_id in enumerate(ids)
+    ]
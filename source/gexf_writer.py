@@ -0,0 +1,228 @@
+import gzip
+import re
+from datetime import date
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+from .compact_graph import MISSING, CompactGraph, decode_column
+
+
+# Mesmo cabeçalho de nx.write_gexf (GEXF 1.2draft), lido pelo Gephi e por nx.read_gexf
+_HEADER = (
+    "<?xml version='1.0' encoding='utf-8'?>\n"
+    '<gexf xmlns="http://www.gexf.net/1.2draft" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+    'xsi:schemaLocation="http://www.gexf.net/1.2draft http://www.gexf.net/1.2draft/gexf.xsd" version="1.2">\n'
+)
+
+# Caracteres de controle não são permitidos em XML 1.0
+_INVALID_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# Atributos escritos no próprio elemento, e não como attvalue
+_NODE_RESERVED = ("label",)
+_EDGE_RESERVED = ("id", "label", "weight")
+
+
+def _python_type(value):
+    if isinstance(value, (bool, np.bool_)):
+        return bool
+    if isinstance(value, (int, np.integer)):
+        return int
+    if isinstance(value, (float, np.floating)):
+        return float
+    if isinstance(value, str):
+        return str
+    return object
+
+
+def _gexf_type(types):
+    """
+    Tipo GEXF de um atributo a partir dos tipos Python observados; GEXF declara um
+    único tipo por atributo, então tipos misturados viram string (ou double, se
+    forem só números).
+    """
+    if not types:
+        return "string"
+    if types == {bool}:
+        return "boolean"
+    if types == {int}:
+        return "long"
+    if types <= {int, float}:
+        return "double"
+    return "string"
+
+
+_ENTITIES = {'"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#9;"}
+
+
+def _text(value):
+    # Valor de atributo XML já entre aspas
+    return '"' + escape(_INVALID_XML.sub("", str(value)), _ENTITIES) + '"'
+
+
+def _format(value, gexf_type):
+    if gexf_type == "boolean":
+        return "true" if value else "false"
+    if gexf_type == "double":
+        return repr(float(value))
+    if gexf_type == "long":
+        return str(int(value))
+    return _text(value)[1:-1]
+
+
+class _Attributes:
+    """
+    Declaração dos atributos de uma classe (node/edge): título → (id, tipo GEXF).
+    """
+
+    def __init__(self, first_id=0):
+        self.types = {}
+        self.first_id = first_id
+
+    def observe(self, name, value):
+        if value is None or value is MISSING:
+            self.types.setdefault(name, set())
+            return
+        self.types.setdefault(name, set()).add(_python_type(value))
+
+    def finish(self):
+        self.declared = {
+            name: (str(self.first_id + i), _gexf_type(types))
+            for i, (name, types) in enumerate(self.types.items())
+        }
+        return self.first_id + len(self.declared)
+
+    def write_declaration(self, out, cls):
+        if not self.declared:
+            return
+        out.write(f'    <attributes mode="static" class="{cls}">\n')
+        for name, (attr_id, gexf_type) in self.declared.items():
+            out.write(f'      <attribute id="{attr_id}" title={_text(name)} type="{gexf_type}" />\n')
+        out.write("    </attributes>\n")
+
+    def attvalues(self, data, indent):
+        # GEXF não tem nulo: None vira '' em atributos string (como no antigo
+        # saveNetWork); nos numéricos e nos ausentes (MISSING), o attvalue é omitido
+        values = [
+            (self.declared[name], "" if value is None else value)
+            for name, value in data
+            if value is not MISSING and name in self.declared
+            and (value is not None or self.declared[name][1] == "string")
+        ]
+        if not values:
+            return ""
+        lines = [f"{indent}  <attvalues>\n"]
+        for (attr_id, gexf_type), value in values:
+            lines.append(f'{indent}    <attvalue for="{attr_id}" value="{_format(value, gexf_type)}" />\n')
+        lines.append(f"{indent}  </attvalues>\n")
+        return "".join(lines)
+
+
+def _compact_rows(columns, n, chunk):
+    """
+    Linhas (lista de (nome, valor)) de colunas de CompactGraph, decodificadas em
+    blocos de `chunk` linhas.
+    """
+    names = list(columns)
+    for start in range(0, n, chunk):
+        end = min(start + chunk, n)
+        decoded = [
+            decode_column(kind, column[start:end], None if mask is None else mask[start:end])
+            for kind, column, mask in (columns[name] for name in names)
+        ]
+        for row in zip(*decoded) if decoded else ([] for _ in range(end - start)):
+            yield list(zip(names, row))
+
+
+def write_gexf(graph, path, compress=None, chunk=100_000):
+    """
+    Grava a rede (nx.Graph ou CompactGraph) em GEXF escrevendo nós e arestas à
+    medida que são percorridos, sem montar a árvore XML em memória.
+
+    Os tipos dos atributos são inferidos numa primeira passada (um tipo por
+    atributo; tipos misturados viram string), sem contar valores None, que não
+    interrompem a gravação como em nx.write_gexf. Em atributos string, None é
+    gravado como '' (como no antigo saveNetWork); em atributos numéricos (ex.:
+    idade), o attvalue é omitido e o tipo numérico é mantido, como para
+    atributos ausentes do nó/aresta (MISSING em CompactGraph).
+
+    Com compress=True (ou path terminado em .gz), grava comprimido com gzip;
+    nx.read_gexf lê o .gexf.gz diretamente.
+    """
+    compact = isinstance(graph, CompactGraph)
+    if compress is None:
+        compress = str(path).endswith(".gz")
+
+    node_attrs = _Attributes()
+    edge_attrs = _Attributes()
+    if compact:
+        n_nodes, n_edges = graph.number_of_nodes(), graph.number_of_edges()
+        for row in _compact_rows(graph.node_attrs, n_nodes, chunk):
+            for name, value in row:
+                if name not in _NODE_RESERVED:
+                    node_attrs.observe(name, value)
+        for row in _compact_rows(graph.edge_attrs, n_edges, chunk):
+            for name, value in row:
+                if name not in _EDGE_RESERVED:
+                    edge_attrs.observe(name, value)
+    else:
+        for _, data in graph.nodes(data=True):
+            for name, value in data.items():
+                if name not in _NODE_RESERVED:
+                    node_attrs.observe(name, value)
+        for _, _, data in graph.edges(data=True):
+            for name, value in data.items():
+                if name not in _EDGE_RESERVED:
+                    edge_attrs.observe(name, value)
+    # Ids de atributos de aresta primeiro, como no nx.write_gexf
+    node_attrs.first_id = edge_attrs.finish()
+    node_attrs.finish()
+
+    if compact:
+        ids = graph.node_ids.tolist()
+        nodes = zip(ids, _compact_rows(graph.node_attrs, n_nodes, chunk))
+        edge_ends = zip(graph.edge_u.tolist(), graph.edge_v.tolist())
+        edges = (
+            (ids[u], ids[v], row)
+            for (u, v), row in zip(edge_ends, _compact_rows(graph.edge_attrs, n_edges, chunk))
+        )
+        graph_name = graph.graph_attrs.get("name", "")
+    else:
+        nodes = ((node, list(data.items())) for node, data in graph.nodes(data=True))
+        edges = ((u, v, list(data.items())) for u, v, data in graph.edges(data=True))
+        graph_name = graph.graph.get("name", "")
+
+    opener = gzip.open if compress else open
+    with opener(path, "wt", encoding="utf-8") as out:
+        out.write(_HEADER)
+        out.write(f'  <meta lastmodifieddate="{date.today().isoformat()}">\n')
+        out.write("    <creator>brazilian-congress-network</creator>\n  </meta>\n")
+        out.write(f'  <graph defaultedgetype="undirected" mode="static" name={_text(graph_name)}>\n')
+        edge_attrs.write_declaration(out, "edge")
+        node_attrs.write_declaration(out, "node")
+
+        out.write("    <nodes>\n")
+        for node, row in nodes:
+            data = dict(row)
+            label = data.get("label")
+            label = node if label is None or label is MISSING else label
+            values = node_attrs.attvalues(row, "      ")
+            head = f"      <node id={_text(node)} label={_text(label)}"
+            out.write(f"{head}>\n{values}      </node>\n" if values else f"{head} />\n")
+        out.write("    </nodes>\n")
+
+        out.write("    <edges>\n")
+        for i, (u, v, row) in enumerate(edges):
+            data = dict(row)
+            head = f"      <edge source={_text(u)} target={_text(v)}"
+            edge_id = data.get("id")
+            head += f" id={_text(i if edge_id is None or edge_id is MISSING else edge_id)}"
+            for key in ("label", "weight"):
+                value = data.get(key)
+                if value is not None and value is not MISSING:
+                    head += f" {key}={_text(value)}"
+            values = edge_attrs.attvalues(row, "      ")
+            out.write(f"{head}>\n{values}      </edge>\n" if values else f"{head} />\n")
+        out.write("    </edges>\n")
+        out.write("  </graph>\n</gexf>\n")
+    return path
@@ -0,0 +1,206 @@
+import json
+import os
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from .compact_graph import MISSING, CompactGraph, encode_column
+from .gexf_writer import write_gexf
+
+
+# Formato binário de rede: um diretório <nome>.cgraph com
+#   - manifest.json: versão, contagens, atributos do grafo e tipo de cada coluna
+#   - node_ids.npy (ids inteiros) ou coluna node_id em nodes.parquet
+#   - edge_u.npy, edge_v.npy, indptr.npy, indices.npy, edge_index.npy (CSR)
+#   - edge_<n>.npy (+ edge_<n>.mask.npy) para o n-ésimo atributo de aresta, se numérico
+#   - nodes.parquet / edges.parquet: atributos de texto ou de tipos misturados
+BINARY_SUFFIX = ".cgraph"
+FORMAT_VERSION = 1
+NETWORK_FORMATS = ("gexf", "binary", "both")
+
+_STRUCTURE = ("edge_u", "edge_v", "indptr", "indices", "edge_index")
+
+
+def is_binary_network(path):
+    return os.path.isfile(os.path.join(path, "manifest.json"))
+
+
+def _table_column(kind, column, mask):
+    # Coluna para Parquet; tipos misturados ("object") vão como JSON
+    if kind == "str":
+        values = pd.Series(np.asarray(column.astype(object)), dtype=object)
+    elif kind == "object":
+        values = pd.Series([json.dumps(v) for v in column.tolist()], dtype=object)
+    else:
+        values = pd.Series(column)
+    if mask is not None:
+        values = values.astype(object).where(mask, None)
+    return values
+
+
+def _from_table_column(kind, values):
+    mask = values.notna().to_numpy()
+    filled = values.astype(object).where(values.notna(), None).tolist()
+    if kind == "object":
+        filled = [json.loads(v) if v is not None else None for v in filled]
+    decoded = [v if present else MISSING for v, present in zip(filled, mask.tolist())]
+    return encode_column(decoded)
+
+
+def save_binary(graph, path):
+    """
+    Grava uma rede (nx.Graph ou CompactGraph) no formato binário em `path`
+    (diretório, criado se não existir). Retorna o caminho.
+    """
+    if not isinstance(graph, CompactGraph):
+        graph = CompactGraph.from_networkx(graph)
+    os.makedirs(path, exist_ok=True)
+
+    manifest = {
+        "format": "cgraph",
+        "version": FORMAT_VERSION,
+        "nodes": graph.number_of_nodes(),
+        "edges": graph.number_of_edges(),
+        "graph": graph.graph_attrs,
+        "int_ids": graph.node_ids.dtype.kind in "iu",
+        "node_attrs": {},
+        "edge_attrs": {},
+    }
+
+    for name in _STRUCTURE:
+        np.save(os.path.join(path, f"{name}.npy"), getattr(graph, name))
+
+    nodes = pd.DataFrame(index=pd.RangeIndex(graph.number_of_nodes()))
+    if manifest["int_ids"]:
+        np.save(os.path.join(path, "node_ids.npy"), graph.node_ids)
+    else:
+        nodes["node_id"] = pd.Series([json.dumps(n) for n in graph.node_ids.tolist()], dtype=object)
+    for name, (kind, column, mask) in graph.node_attrs.items():
+        manifest["node_attrs"][name] = kind
+        nodes[name] = _table_column(kind, column, mask)
+    nodes.to_parquet(os.path.join(path, "nodes.parquet"), index=False)
+
+    edges = pd.DataFrame(index=pd.RangeIndex(graph.number_of_edges()))
+    for position, (name, (kind, column, mask)) in enumerate(graph.edge_attrs.items()):
+        if kind in ("int", "float", "bool"):
+            # Nome do arquivo pela posição: atributos podem ter qualquer nome
+            np.save(os.path.join(path, f"edge_{position}.npy"), column)
+            if mask is not None:
+                np.save(os.path.join(path, f"edge_{position}.mask.npy"), mask)
+            manifest["edge_attrs"][name] = {"kind": kind, "file": f"edge_{position}", "mask": mask is not None}
+        else:
+            edges[name] = _table_column(kind, column, mask)
+            manifest["edge_attrs"][name] = {"kind": kind, "file": None, "mask": mask is not None}
+    if len(edges.columns):
+        edges.to_parquet(os.path.join(path, "edges.parquet"), index=False)
+
+    with open(os.path.join(path, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, default=str)
+    return path
+
+
+def load_binary(path, mmap=True):
+    """
+    Lê uma rede gravada por save_binary como CompactGraph. Com mmap=True, a
+    estrutura e os atributos numéricos de arestas são mapeados do disco
+    (np.load(mmap_mode="r")) em vez de copiados para a memória.
+    """
+    with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != "cgraph" or manifest.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Formato de rede não suportado em {path}.")
+
+    mode = "r" if mmap else None
+
+    def array(name):
+        return np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+
+    nodes = pd.read_parquet(os.path.join(path, "nodes.parquet"))
+    if manifest["int_ids"]:
+        node_ids = array("node_ids")
+    else:
+        node_ids = [json.loads(n) for n in nodes["node_id"].tolist()]
+    node_attrs = {
+        name: _from_table_column(kind, nodes[name])
+        for name, kind in manifest["node_attrs"].items()
+    }
+
+    edges = None
+    edge_attrs = {}
+    for name, spec in manifest["edge_attrs"].items():
+        if spec["file"] is not None:
+            mask = array(f"{spec['file']}.mask") if spec["mask"] else None
+            edge_attrs[name] = (spec["kind"], array(spec["file"]), mask)
+        else:
+            if edges is None:
+                edges = pd.read_parquet(os.path.join(path, "edges.parquet"))
+            edge_attrs[name] = _from_table_column(spec["kind"], edges[name])
+
+    structure = {name: array(name) for name in _STRUCTURE}
+    return CompactGraph.from_parts(node_ids, node_attrs, edge_attrs, manifest["graph"], **structure)
+
+
+def network_base(path):
+    """
+    Caminho de uma rede sem extensão (.gexf, .gexf.gz ou .cgraph).
+    """
+    if path.endswith(".gz"):
+        path = path[:-3]
+    return os.path.splitext(path)[0]
+
+
+def binary_path(path):
+    """
+    Caminho do formato binário correspondente a uma rede (.gexf → .cgraph).
+    """
+    return network_base(path) + BINARY_SUFFIX
+
+
+def prefer_binary(path):
+    """
+    Caminho da versão binária (.cgraph) de uma rede, se já tiver sido gravada;
+    senão, o próprio path.
+    """
+    binary = binary_path(path)
+    return binary if is_binary_network(binary) else path
+
+
+def write_network(G, path, fmt="gexf", compress=False):
+    """
+    Grava a rede (nx.Graph ou CompactGraph) em GEXF (path, ver write_gexf), no
+    formato binário (binary_path(path)) ou nos dois (fmt="both"). Com compress, o
+    GEXF é gravado com gzip (path + ".gz"). Retorna o caminho principal: o GEXF,
+    se gravado.
+    """
+    if fmt not in NETWORK_FORMATS:
+        raise ValueError(f"Formato inválido: {fmt!r}. Use um de {NETWORK_FORMATS}.")
+    if fmt in ("binary", "both"):
+        save_binary(G, binary_path(path))
+    if fmt in ("gexf", "both"):
+        if compress and not path.endswith(".gz"):
+            path += ".gz"
+        return write_gexf(G, path, compress=compress)
+    return binary_path(path)
+
+
+def read_network(path, node_type=None, compact=False, mmap=True):
+    """
+    Lê uma rede em GEXF ou no formato binário (diretório .cgraph), conforme o
+    caminho. Retorna nx.Graph ou, com compact=True, CompactGraph.
+
+    Do formato binário, compact=True mantém os arrays mapeados do disco; sem
+    ele, to_networkx copia tudo para objetos Python. Quem só precisa de graus,
+    pesos ou da lista de arestas deve usar compact=True (com prefer_binary).
+
+    node_type converte os ids dos nós (ex.: str ou int). Sem ele, o GEXF devolve
+    ids str (como nx.read_gexf) e o formato binário, o tipo gravado.
+    """
+    if is_binary_network(path):
+        graph = load_binary(path, mmap=mmap)
+        if node_type is not None:
+            graph = graph.relabel(node_type)
+        return graph if compact else graph.to_networkx()
+
+    G = nx.read_gexf(path, node_type=node_type)
+    return CompactGraph.from_networkx(G) if compact else G
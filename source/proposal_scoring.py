@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+
+SCORE_COLUMNS = ["siglaTipo", "status", "type_weight", "status_pertinence", "weighted_pertinence", "valid"]
+
+
+def status_pertinence_map(positive_proposal_status):
+    """
+    Código de situação → pertinência positiva. Se um código aparecer mais de uma
+    vez, vale a primeira regra (como na busca linear original).
+    """
+    mapping = {}
+    for status in positive_proposal_status:
+        mapping.setdefault(int(status["status_code"]), status["positive_pertinence"])
+    return mapping
+
+
+def _nullable_dtype(values):
+    # Int64 se todos os pesos forem inteiros, para manter o tipo dos pesos originais
+    values = list(values)
+    return "Int64" if all(isinstance(v, (int, np.integer)) for v in values) else "Float64"
+
+
+def score_proposals(proposals, proposal_weight, positive_proposal_status):
+    """
+    Tabela de pontuação das proposições, indexada pelo id (int), calculada uma vez
+    com operações colunares:
+
+      - siglaTipo, status: tipo e situação (ultimoStatus_idSituacao, Int64)
+      - type_weight: proposal_weight[siglaTipo] (<NA> para tipos fora do dicionário)
+      - status_pertinence: pertinência positiva da situação (0 se não for positiva
+        ou estiver ausente)
+      - weighted_pertinence: type_weight × status_pertinence
+      - valid: o tipo está em proposal_weight
+
+    :param proposals: dicionário de getProposals() ou DataFrame indexado pelo id
+    """
+    if isinstance(proposals, pd.DataFrame):
+        df = proposals
+    else:
+        df = pd.DataFrame.from_dict(proposals, orient="index")
+
+    table = pd.DataFrame(index=pd.Index(df.index.astype(np.int64), name="id"))
+    if len(df) == 0:
+        for col in SCORE_COLUMNS:
+            table[col] = pd.Series(dtype=object)
+        return table
+
+    types = df["siglaTipo"].to_numpy()
+    status = pd.to_numeric(df["ultimoStatus_idSituacao"], errors="coerce").astype("Int64")
+
+    table["siglaTipo"] = types
+    table["status"] = status.to_numpy()
+    pertinence_map = status_pertinence_map(positive_proposal_status)
+    table["type_weight"] = (
+        pd.Series(types).map(proposal_weight).astype(_nullable_dtype(proposal_weight.values())).array
+    )
+    table["status_pertinence"] = (
+        status.map(pertinence_map).fillna(0).astype(_nullable_dtype(pertinence_map.values())).array
+    )
+    table["valid"] = table["type_weight"].notna()
+    table["weighted_pertinence"] = table["type_weight"] * table["status_pertinence"]
+    return table[SCORE_COLUMNS]
@@ -14,6 +14,19 @@ def calculateAge(b_date):
     return today.year - born.year - ((today.month, today.day) < (born.month, born.day))
 
 
+def calculateAges(b_dates):
+    '''
+    Versão vetorizada de calculateAge: idades (Int64) para uma coleção de datas
+    "%Y-%m-%d"; datas ausentes ou inválidas viram <NA>
+    '''
+    born = pd.to_datetime(pd.Series(b_dates), format="%Y-%m-%d", errors="coerce")
+    today = date.today()
+    before_birthday = (born.dt.month > today.month) | (
+        (born.dt.month == today.month) & (born.dt.day > today.day)
+    )
+    return (today.year - born.dt.year - before_birthday).astype("Int64")
+
+
 def getAgeRange(age):
     '''
     Define intervalos de idade para categorizar deputados
@@ -27,15 +40,111 @@ def getAgeRange(age):
     else:
         return 4
 
+def getAgeRanges(ages):
+    '''
+    Versão vetorizada de getAgeRange; idades ausentes viram <NA>
+    '''
+    ages = pd.Series(ages).astype("Float64")
+    values = ages.to_numpy(dtype=float, na_value=np.nan)
+    ranges = pd.Series(
+        np.select([values <= 30, values <= 50, values <= 65], [1, 2, 3], 4),
+        index=ages.index,
+    ).astype("Int64")
+    ranges[ages.isna()] = pd.NA
+    return ranges
+
+def pairIndices(n):
+    '''
+    Índices (i, j), i < j, de todos os pares entre n elementos (triângulo superior)
+    '''
+    return np.triu_indices(n, k=1)
+
+def generatePairs(items):
+    '''
+    Gera os pares não direcionados (items[i], items[j]), i < j, um de cada vez,
+    sem montar a lista de tuplas
+    '''
+    items = list(items)
+    left, right = pairIndices(len(items))
+    for i, j in zip(left, right):
+        yield items[i], items[j]
+
 def generateEdges(collab_list):
     '''
     Com base em um conjuntos de vértices, gera as combinações de arestas possíveis
+
+    Retorna uma lista com os dois sentidos de cada par: primeiro todos os
+    (a, b), depois todos os (b, a). Para cada par uma única vez, sem montar a
+    lista, use generatePairs
     '''
-    edge_list = [(collab_list[i],collab_list[j]) for i in range(len(collab_list)) for j in range(i+1, len(collab_list))]
-    result = edge_list.copy()
-    for element in edge_list:
-        result.append((element[1],element[0]))
-    return result
+    edge_list = list(generatePairs(collab_list))
+    return edge_list + [(b, a) for a, b in edge_list]
+
+def packPairs(u, v):
+    '''
+    Chave int64 de cada par não direcionado de ids inteiros (0 <= id < 2^32):
+    menor id << 32 | maior id
+    '''
+    u = np.asarray(u, dtype=np.int64)
+    v = np.asarray(v, dtype=np.int64)
+    return (np.minimum(u, v) << 32) | np.maximum(u, v)
+
+def unpackPairs(keys):
+    '''
+    Inverso de packPairs: (menor id, maior id)
+    '''
+    keys = np.asarray(keys, dtype=np.int64)
+    return keys >> 32, keys & 0xFFFFFFFF
+
+class PairAccumulator():
+    '''
+    Acumula pesos de pares não direcionados de ids inteiros sem dicionário: cada
+    par vira uma chave int64 (packPairs) e as somas são consolidadas de uma vez
+    (ordenação + np.add.reduceat), preservando o tipo dos valores.
+    '''
+
+    def __init__(self):
+        self._keys = []
+        self._values = []
+
+    def addClique(self, ids, value=1):
+        '''
+        Soma value a todos os pares entre os ids (repetidos contam uma vez)
+        '''
+        ids = np.unique(np.asarray(ids, dtype=np.int64))
+        left, right = pairIndices(len(ids))
+        self._keys.append(packPairs(ids[left], ids[right]))
+        self._values.append(np.full(len(left), value))
+
+    def addPairs(self, u, v, values=1):
+        '''
+        Soma values (escalar ou um valor por par) aos pares (u[k], v[k])
+        '''
+        keys = packPairs(u, v)
+        self._keys.append(keys)
+        self._values.append(np.broadcast_to(np.asarray(values), keys.shape).copy())
+
+    def totals(self):
+        '''
+        Retorna (u, v, total) por par distinto, com u < v, ordenados pela chave
+        '''
+        if not self._keys:
+            empty = np.array([], dtype=np.int64)
+            return empty, empty, empty
+        keys = np.concatenate(self._keys)
+        values = np.concatenate(self._values)
+        order = np.argsort(keys, kind="stable")
+        keys, values = keys[order], values[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], dtype=np.int64)
+        keys = keys[starts]
+        values = np.add.reduceat(values, starts) if len(starts) else values
+        # mantém só o resultado consolidado
+        self._keys, self._values = [keys], [values]
+        u, v = unpackPairs(keys)
+        return u, v, values
+
+    def __len__(self):
+        return len(self.totals()[0])
 
 def reject_outliers(data_dict, m=2):
     '''
@@ -63,8 +172,7 @@ def generateNodePairs(edges):
     '''
     Dada uma lista de arestas, gera todas as combinações possíveis
     '''
-    pairs = [(edges[i], edges[j]) for i in range(len(edges)) for j in range(i + 1, len(edges))]
-    return pairs
+    return generatePairs(edges)
 
 def getThresholdCounts(data, threshold, tolerance=0):
     ret = {"minor": 0, "equal": 0, "bigger": 0}
@@ -77,34 +185,41 @@ def getThresholdCounts(data, threshold, tolerance=0):
             ret["minor"] += 1
     return ret
 
+UF_REGIONS = {
+    "AM": "Norte",
+    "RR": "Norte",
+    "AP": "Norte",
+    "PA": "Norte",
+    "TO": "Norte",
+    "RO": "Norte",
+    "AC": "Norte",
+    "MA": "Nordeste",
+    "PI": "Nordeste",
+    "CE": "Nordeste",
+    "RN": "Nordeste",
+    "PE": "Nordeste",
+    "PB": "Nordeste",
+    "SE": "Nordeste",
+    "AL": "Nordeste",
+    "BA": "Nordeste",
+    "MT": "Centro-Oeste",
+    "MS": "Centro-Oeste",
+    "GO": "Centro-Oeste",
+    "DF": "Distrito Federal",
+    "SP": "Sudeste",
+    "RJ": "Sudeste",
+    "ES": "Sudeste",
+    "MG": "Sudeste",
+    "PR": "Sul",
+    "RS": "Sul",
+    "SC": "Sul"
+}
+
 def getUfRegion(uf):
-    regions_dict = {
-        "AM": "Norte",
-        "RR": "Norte",
-        "AP": "Norte",
-        "PA": "Norte",
-        "TO": "Norte",
-        "RO": "Norte",
-        "AC": "Norte",
-        "MA": "Nordeste",
-        "PI": "Nordeste",
-        "CE": "Nordeste",
-        "RN": "Nordeste",
-        "PE": "Nordeste",
-        "PB": "Nordeste",
-        "SE": "Nordeste",
-        "AL": "Nordeste",
-        "BA": "Nordeste",
-        "MT": "Centro-Oeste",
-        "MS": "Centro-Oeste",
-        "GO": "Centro-Oeste",
-        "DF": "Distrito Federal",
-        "SP": "Sudeste",
-        "RJ": "Sudeste",
-        "ES": "Sudeste",
-        "MG": "Sudeste",
-        "PR": "Sul",
-        "RS": "Sul",
-        "SC": "Sul"
-    }
-    return regions_dict[uf]
\ No newline at end of file
+    return UF_REGIONS[uf]
+
+def getUfRegions(ufs):
+    '''
+    Versão vetorizada de getUfRegion; UFs ausentes ou desconhecidas viram NaN
+    '''
+    return pd.Series(ufs).map(UF_REGIONS)
@@ -0,0 +1,89 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Pacote source (imports relativos) e módulos de source como nos notebooks
+sys.path[:0] = [ROOT, os.path.join(ROOT, "source")]
+
+YEARS = (2017, 2018, 2019, 2020, 2021, 2022)
+
+
+def _write_dataset(data_dir, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1000, 1060)
+    ufs = ["SP", "RJ", "MG", "BA", "PE", "RS"]
+
+    pd.DataFrame({
+        "index": ids[:50],
+        "name": [f"Dep {i}" for i in ids[:50]],
+        "cpf": np.arange(11111, 11161),
+        "party": rng.choice(["PT", "PL", "PSD"], 50),
+        "uf": rng.choice(ufs, 50),
+        "sex": rng.choice(["M", "F"], 50),
+        "education": rng.choice(["Superior", "Médio"], 50),
+        "birthdate": [f"{y}-05-10" for y in rng.integers(1950, 1995, 50)],
+    }).to_csv(os.path.join(data_dir, "deputies_info.csv"), index=False)
+
+    votes = []
+    for year in YEARS:
+        for v in range(12):
+            present = rng.choice(ids, size=rng.integers(5, 25), replace=False)
+            for deputy in present:
+                votes.append({
+                    "idVotacao": f"{year}{v:03d}-1",
+                    "dataHoraVoto": f"{year}-{v + 1:02d}-10T10:00:00",
+                    "deputado_id": deputy,
+                    "voto": rng.choice(["Sim", "Não", "Abstenção"]),
+                    "deputado_nome": f"Dep {deputy}",
+                    "deputado_siglaPartido": "PX",
+                    "deputado_siglaUf": rng.choice(ufs),
+                    "ano_votacao": year,
+                })
+    pd.DataFrame(votes).to_csv(os.path.join(data_dir, "votes_detail_info.csv"), index=False)
+
+    proposals, authors = [], []
+    for year in (2019, 2020):
+        for p in range(60):
+            proposal_id = year * 1000 + p
+            proposals.append({
+                "id": proposal_id,
+                "siglaTipo": rng.choice(["PL", "PEC", "PLP"]),
+                "ultimoStatus_idSituacao": rng.choice([929, 1140, 900, 1150]),
+                "ano": year,
+            })
+            for author in rng.choice(ids, size=rng.integers(1, 6), replace=False):
+                authors.append({"idProposicao": proposal_id, "idAutor": author, "codTipoAutor": 10000, "ano": year})
+    pd.DataFrame(proposals).to_csv(os.path.join(data_dir, "proposals_info.csv"), index=False)
+    pd.DataFrame(authors).to_csv(os.path.join(data_dir, "authors_info.csv"), index=False)
+
+    pd.DataFrame({
+        "index": [1, 2, 3],
+        "name": ["Partido A", "Partido B", "Partido C"],
+        "initials": ["PT", "PL", "PSD"],
+        "leader_name": ["a", "b", "c"],
+        "leader_id": [1001, 1002, 1003],
+        "members_number": [20, 20, 10],
+    }).to_csv(os.path.join(data_dir, "parties_info.csv"), index=False)
+
+    roles = [{"deputy_id": d, "role_name": "Titular", "role_place_id": 500, "role_place_name": "CCJ"} for d in ids[:40]]
+    roles.append({"deputy_id": 1001, "role_name": "Líder do Partido A", "role_place_id": 1, "role_place_name": "Partido A"})
+    pd.DataFrame(roles).to_csv(os.path.join(data_dir, "roles_info.csv"), index=False)
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    """
+    Dados sintéticos em tmp_path/data; o diretório de trabalho é tmp_path/source,
+    como nos scripts (os leitores usam ../data).
+    """
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    _write_dataset(str(data_dir))
+    work = tmp_path / "source"
+    work.mkdir()
+    monkeypatch.chdir(work)
+    return data_dir
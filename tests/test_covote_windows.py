@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from source.CovotingNetworkBuilder import CovotingNetworkBuilder
+
+from conftest import YEARS
+
+
+def _window_edges(deputy_index, matrix):
+    coo = matrix.tocoo()
+    return {
+        tuple(sorted((int(deputy_index[i]), int(deputy_index[j])))): float(w)
+        for i, j, w in zip(coo.row, coo.col, coo.data)
+    }
+
+
+@pytest.mark.parametrize("weighting", ["count", "newman", "hyperbolic"])
+@pytest.mark.parametrize("window,step", [(2, 1), (3, 1), (3, 2)])
+def test_windows_match_direct_build(dataset, weighting, window, step):
+    votes_path = str(dataset / "votes_detail_info.csv")
+    builder = CovotingNetworkBuilder(votes_detail_path=votes_path)
+    windows = builder.build_windows(window, step=step, order_by="ano_votacao", weighting=weighting)
+    assert len(windows) == len(range(0, len(YEARS) - window + 1, step))
+
+    for (label, matrix), start in zip(windows, range(0, len(YEARS), step)):
+        direct = CovotingNetworkBuilder(votes_detail_path=votes_path)
+        direct.build_network(years=YEARS[start:start + window], weighting=weighting)
+        expected = {
+            tuple(sorted((int(u), int(v)))): float(data["weight"])
+            for u, v, data in direct.G.edges(data=True)
+        }
+
+        edges = _window_edges(builder.windows_index, matrix)
+        assert set(edges) == set(expected), label
+        assert all(w > 0 for w in edges.values()), label
+        keys = sorted(expected)
+        np.testing.assert_allclose([edges[k] for k in keys], [expected[k] for k in keys], rtol=1e-6)
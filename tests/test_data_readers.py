@@ -0,0 +1,16 @@
+import pandas as pd
+
+from source.data_readers import getInfoTSE
+
+
+def test_tse_paths_keep_last_record_per_cpf(dataset):
+    pd.DataFrame({
+        "NR_CPF_CANDIDATO": [11111, 11112, 11111],
+        "DS_GRAU_INSTRUCAO": ["MÉDIO", "SUPERIOR COMPLETO", "SUPERIOR COMPLETO"],
+        "DS_COR_RACA": ["PARDA", "BRANCA", "PRETA"],
+    }).to_csv(dataset / "candidates_tse_info.csv", index=False)
+
+    full = getInfoTSE(str(dataset))
+    filtered = getInfoTSE(str(dataset), cpfs=[11111])
+    assert full[11111] == {"DS_GRAU_INSTRUCAO": "SUPERIOR COMPLETO", "DS_COR_RACA": "PRETA"}
+    assert filtered == {11111: full[11111]}
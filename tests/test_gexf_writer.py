@@ -0,0 +1,31 @@
+import networkx as nx
+import pytest
+
+from source.compact_graph import CompactGraph
+from source.gexf_writer import write_gexf
+
+
+def _graph():
+    G = nx.Graph()
+    G.add_node(1, label="A", age=45, age_range=4, education="Superior")
+    G.add_node(2, label="B", age=None, age_range=None, education=None)
+    G.add_node(3, label="C")
+    G.add_edge(1, 2, weight=2.0)
+    G.add_edge(2, 3, weight=1.0)
+    return G
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_none_attributes(tmp_path, compact):
+    G = _graph()
+    path = str(tmp_path / "rede.gexf")
+    write_gexf(CompactGraph.from_networkx(G) if compact else G, path)
+
+    H = nx.read_gexf(path, node_type=int)
+    # Numéricos continuam numéricos: None é omitido, como atributo ausente
+    assert H.nodes[1]["age"] == 45 and H.nodes[1]["age_range"] == 4
+    assert "age" not in H.nodes[2] and "age_range" not in H.nodes[2]
+    # Texto: None vira '' (como no antigo saveNetWork)
+    assert H.nodes[1]["education"] == "Superior" and H.nodes[2]["education"] == ""
+    assert "education" not in H.nodes[3]
+    assert sorted(H.edges(data="weight")) == [(1, 2, 2.0), (2, 3, 1.0)]
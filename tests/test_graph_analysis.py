@@ -0,0 +1,65 @@
+import networkx as nx
+import pytest
+
+from source.NetworkBuilder import NetworkBuilder
+from GraphAnalysis import GraphAnalysis
+
+
+def test_graph_analysis_accepts_builder_compact_graph(dataset):
+    builder = NetworkBuilder()
+    builder.buildNetwork(compact=True)
+    assert builder.G is None
+
+    analysis = GraphAnalysis(builder.compact)
+    # Sem conversão para NetworkX enquanto só se usam os arrays
+    assert analysis.getCompact() is builder.compact
+    assert analysis._graph is None
+    assert analysis.nodes_number == builder.compact.number_of_nodes()
+    assert analysis.edges_number == builder.compact.number_of_edges()
+
+    reference = NetworkBuilder()
+    reference.buildNetwork()
+    expected = GraphAnalysis(reference.G)
+    assert analysis.getSumEdgeWeights() == expected.getSumEdgeWeights()
+    assert analysis._graph is None
+    assert isinstance(analysis.graph, nx.Graph)
+
+
+def test_array_metrics_match_networkx(dataset):
+    builder = NetworkBuilder()
+    builder.buildNetwork()
+    G = builder.G
+    analysis = GraphAnalysis(G)
+
+    degrees = dict(G.degree())
+    info = analysis.getDegreeInfo()
+    assert info["max"]["value"] == max(degrees.values())
+    assert info["min"]["value"] == min(degrees.values())
+    assert info["mean"] == pytest.approx(sum(degrees.values()) / len(degrees))
+    assert info["zeros"] == sum(1 for d in degrees.values() if d == 0)
+    assert analysis.getDegrees() == degrees
+
+    assert analysis.getNumberOfComponents() == nx.number_connected_components(G)
+    assert analysis.getLargestComponentSize() == len(max(nx.connected_components(G), key=len))
+    assert analysis.getGlobalClustering() == pytest.approx(nx.average_clustering(G))
+    assert analysis.getDensity() == pytest.approx(nx.density(G))
+
+    adj_matrix, m_map = analysis.adjMatrix(weighted=True)
+    u, v, weight = next(iter(G.edges(data="weight")))
+    assert adj_matrix[m_map[u]][m_map[v]] == pytest.approx(weight)
+
+
+def test_get_compact_follows_graph_changes(dataset):
+    builder = NetworkBuilder()
+    builder.buildNetwork()
+    analysis = GraphAnalysis(builder.G)
+    compact = analysis.getCompact()
+    assert analysis.getCompact() is compact
+    before = compact.number_of_edges()
+
+    u, v = list(analysis.graph.edges())[0]
+    analysis.graph.remove_edge(u, v)
+    assert analysis.getCompact().number_of_edges() == before - 1
+    assert analysis.getSumEdgeWeights()[u] == sum(
+        analysis.graph[u][n]["weight"] for n in analysis.graph.neighbors(u)
+    )
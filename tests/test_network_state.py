@@ -0,0 +1,21 @@
+import pandas as pd
+
+from source.NetworkBuilder import NetworkBuilder
+
+
+def test_state_recomputes_roles_when_deputies_change(dataset, tmp_path):
+    state_path = str(tmp_path / "state.npz")
+    NetworkBuilder().buildNetwork(True, state_path=state_path)
+
+    # Deputado com cargo sai da rede: cargos e partidos não mudam
+    for name, column in [("deputies_info.csv", "index"), ("authors_info.csv", "idAutor")]:
+        table = pd.read_csv(dataset / name)
+        table[table[column] != 1005].to_csv(dataset / name, index=False)
+
+    incremental = NetworkBuilder()
+    incremental.buildNetwork(True, state_path=state_path)
+    assert 1005 not in incremental.roles_relevance
+
+    reference = NetworkBuilder()
+    reference.buildNetwork(True)
+    assert incremental.roles_relevance == reference.roles_relevance